@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from reminder_scheduler import to_utc
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ["saved", "to-apply", "applied", "interview", "offer", "rejected"]
+APPLIED_STATUSES = {"applied", "interview", "offer"}
+INTERVIEW_STATUSES = {"interview", "offer"}
+# The fields of a job that feed the rollups
+ROLLUP_FIELDS = {"_id": 0, "job_id": 1, "user_id": 1, "source": 1, "status": 1, "date_added": 1, "applied_date": 1, "interview_date": 1}
+
+RollupKey = Tuple[str, str, str]
+
+
+def _day(value) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return to_utc(value).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _week(day: date) -> str:
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def job_contributions(job: Optional[Dict]) -> Dict[RollupKey, Dict[str, float]]:
+    """
+    The counters one job adds to the daily rollups, keyed by (user_id, day, source).
+
+    A job counts towards the day it was added (its cohort: current status and
+    how far it got in the funnel), the day it was applied to (applications and
+    time-to-apply) and the day of its interview (interviews and time-to-interview).
+    """
+    if not job or not job.get("user_id"):
+        return {}
+    user_id = job["user_id"]
+    source = job.get("source") or "Manual"
+    status = job.get("status") or "saved"
+    added = _day(job.get("date_added"))
+    applied = _day(job.get("applied_date"))
+    interviewed = _day(job.get("interview_date"))
+
+    contributions: Dict[RollupKey, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    if added:
+        cohort = contributions[(user_id, added.isoformat(), source)]
+        cohort["added"] += 1
+        cohort[f"status.{status}"] += 1
+        if applied or status in APPLIED_STATUSES:
+            cohort["reached_applied"] += 1
+        if interviewed or status in INTERVIEW_STATUSES:
+            cohort["reached_interview"] += 1
+        if status == "offer":
+            cohort["reached_offer"] += 1
+    if applied:
+        day = contributions[(user_id, applied.isoformat(), source)]
+        day["applied"] += 1
+        if added and applied >= added:
+            day["apply_days_sum"] += (applied - added).days
+            day["apply_days_n"] += 1
+    if interviewed:
+        day = contributions[(user_id, interviewed.isoformat(), source)]
+        day["interviews"] += 1
+        start = applied or added
+        if start and interviewed >= start:
+            day["interview_days_sum"] += (interviewed - start).days
+            day["interview_days_n"] += 1
+    return contributions
+
+
+def _rollup_delta(old: Optional[Dict], new: Optional[Dict]) -> Dict[RollupKey, Dict[str, float]]:
+    delta: Dict[RollupKey, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for job, sign in ((new, 1), (old, -1)):
+        for key, counters in job_contributions(job).items():
+            for name, value in counters.items():
+                delta[key][name] += sign * value
+    return {key: {n: v for n, v in counters.items() if v} for key, counters in delta.items() if any(counters.values())}
+
+
+class JobAnalytics:
+    """
+    Funnel, timing, per-source and weekly analytics served from daily rollups.
+
+    `job_daily_rollups` holds one document per (user, day, source) with
+    counters maintained by `record` on every job write, so reads aggregate at
+    most a few documents per active day no matter how many jobs a user has.
+    A user's rollups are rebuilt from the jobs collection the first time
+    analytics are requested for them (or with `rebuild`), which also repairs
+    drift from writes made outside the API.
+
+    Rebuilds are serialized per user through a claim on the user's
+    analytics_state document; a caller that finds one running waits for it.
+    `record` skips users being rebuilt and marks them dirty instead, and
+    marks dirty any user whose rebuild started while its increments were in
+    flight, so the rebuild runs again rather than losing or double-counting
+    the write.
+    """
+
+    # Rebuild passes before giving up on a user whose jobs keep changing (left dirty for the next summary)
+    MAX_REBUILD_PASSES = 5
+
+    def __init__(self, db, rebuild_timeout: timedelta = timedelta(minutes=5), wait_timeout: float = 10.0):
+        self.db = db
+        # A claim older than this belongs to a process that died mid-rebuild
+        self.rebuild_timeout = rebuild_timeout
+        self.wait_timeout = wait_timeout
+
+    async def ensure_indexes(self):
+        await self.db.analytics_state.create_index("user_id", unique=True)
+        await self.db.job_daily_rollups.create_index([("user_id", 1), ("day", 1), ("source", 1)], unique=True)
+        await self.db.job_daily_rollups.create_index([("user_id", 1), ("week", 1)])
+
+    async def record(self, old: Optional[Dict], new: Optional[Dict]):
+        """
+        Apply the change between two versions of a job (None for insert/delete) to the rollups
+        """
+        await self.record_many([(old, new)])
+
+    async def record_many(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]):
+        merged: Dict[RollupKey, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for old, new in changes:
+            for key, counters in _rollup_delta(old, new).items():
+                for name, value in counters.items():
+                    merged[key][name] += value
+        merged = {key: counters for key, counters in merged.items() if any(counters.values())}
+        if not merged:
+            return
+        user_ids = list({key[0] for key in merged})
+        try:
+            before = await self._states(user_ids)
+            # A running rebuild may or may not have seen this write; have it scan again instead
+            rebuilding = [user_id for user_id, (_, token) in before.items() if token]
+            applied = [user_id for user_id in user_ids if user_id not in rebuilding]
+            operations = [
+                UpdateOne(
+                    {"user_id": user_id, "day": day, "source": source},
+                    {"$inc": dict(counters), "$setOnInsert": {"week": _week(date.fromisoformat(day))}},
+                    upsert=True
+                )
+                for (user_id, day, source), counters in merged.items() if user_id in applied
+            ]
+            if operations:
+                await self.db.job_daily_rollups.bulk_write(operations, ordered=False)
+                after = await self._states(applied)
+                # A rebuild that started after the check above could count this write as well
+                rebuilding += [user_id for user_id in applied if after.get(user_id) != before.get(user_id)]
+            if rebuilding:
+                await self.invalidate(rebuilding)
+        except Exception as e:
+            # Analytics must never fail a job write; the next rebuild repairs the counts
+            logger.error(f"Analytics rollup update failed: {str(e)}")
+            try:
+                await self.invalidate(user_ids)
+            except Exception:
+                pass
+
+    async def _states(self, user_ids: List[str]) -> Dict[str, Tuple[int, Optional[str]]]:
+        """
+        (rebuild count, running rebuild's claim) of each user that has analytics state
+        """
+        states = {}
+        async for doc in self.db.analytics_state.find({"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "version": 1, "rebuilding": 1}):
+            states[doc["user_id"]] = (doc.get("version", 0), doc.get("rebuilding"))
+        return states
+
+    async def invalidate(self, user_ids: List[str]):
+        """
+        Have the next summary rebuild these users' rollups
+        """
+        await self.db.analytics_state.update_many({"user_id": {"$in": user_ids}}, {"$set": {"dirty": True}})
+
+    async def rebuild(self, user_id: str):
+        """
+        Recompute a user's rollups from the jobs collection, or wait for the rebuild another caller is running
+        """
+        token = await self._claim_rebuild(user_id)
+        if token is None:
+            await self._wait_for_rebuild(user_id)
+            return
+        try:
+            for _ in range(self.MAX_REBUILD_PASSES):
+                await self._replace_rollups(user_id)
+                done = await self.db.analytics_state.update_one(
+                    {"user_id": user_id, "rebuilding": token, "dirty": False},
+                    {"$set": {"rebuilt_at": datetime.now(timezone.utc).isoformat(), "rebuilding": None}}
+                )
+                if done.modified_count:
+                    return
+                # A job write arrived during the pass; scan again unless the claim was taken over
+                again = await self.db.analytics_state.update_one({"user_id": user_id, "rebuilding": token}, {"$set": {"dirty": False}})
+                if not again.modified_count:
+                    return
+            logger.warning(f"Analytics rebuild for {user_id} kept racing job writes; left for the next request")
+        finally:
+            # Still dirty unless the last pass finished cleanly; the next summary rebuilds again
+            await self.db.analytics_state.update_one({"user_id": user_id, "rebuilding": token}, {"$set": {"rebuilding": None, "dirty": True}})
+
+    async def _claim_rebuild(self, user_id: str) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        token = uuid.uuid4().hex
+        try:
+            result = await self.db.analytics_state.update_one(
+                {"user_id": user_id, "$or": [
+                    {"rebuilding": None},
+                    {"rebuilding_since": {"$lt": (now - self.rebuild_timeout).isoformat()}},
+                ]},
+                {"$set": {"rebuilding": token, "rebuilding_since": now.isoformat(), "dirty": False}, "$inc": {"version": 1}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The state exists with a live claim, so the upsert tried to insert a second one
+            return None
+        return token if result.modified_count or result.upserted_id is not None else None
+
+    async def _wait_for_rebuild(self, user_id: str):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            state = await self.db.analytics_state.find_one({"user_id": user_id}, {"_id": 0, "rebuilding": 1})
+            if not state or not state.get("rebuilding"):
+                return
+            await asyncio.sleep(0.1)
+        logger.warning(f"Gave up waiting for the analytics rebuild of {user_id}")
+
+    async def _replace_rollups(self, user_id: str):
+        merged: Dict[RollupKey, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        async for job in self.db.jobs.find({"user_id": user_id}, ROLLUP_FIELDS):
+            for key, counters in job_contributions(job).items():
+                for name, value in counters.items():
+                    merged[key][name] += value
+        operations = [DeleteMany({"user_id": user_id})]
+        # Replaced rather than inserted: an increment from a write in flight may have recreated the document
+        for (_, day, source), counters in merged.items():
+            key = {"user_id": user_id, "day": day, "source": source}
+            operations.append(ReplaceOne(key, {**key, "week": _week(date.fromisoformat(day)), **_nest(counters)}, upsert=True))
+        await self.db.job_daily_rollups.bulk_write(operations, ordered=True)
+
+    async def summary(self, user_id: str, weeks: int = 12) -> Dict:
+        state = await self.db.analytics_state.find_one({"user_id": user_id}, {"_id": 0, "rebuilt_at": 1, "dirty": 1, "rebuilding": 1})
+        if not state or state.get("dirty") or state.get("rebuilding") or not state.get("rebuilt_at"):
+            await self.rebuild(user_id)
+
+        totals_stage = {
+            "$group": {
+                "_id": "$source",
+                **{f"status_{s}": {"$sum": f"$status.{s}"} for s in JOB_STATUSES},
+                **{name: {"$sum": f"${name}"} for name in (
+                    "added", "reached_applied", "reached_interview", "reached_offer",
+                    "apply_days_sum", "apply_days_n", "interview_days_sum", "interview_days_n"
+                )}
+            }
+        }
+        since = _week(datetime.now(timezone.utc).date() - timedelta(weeks=weeks - 1))
+        weekly_pipeline = [
+            {"$match": {"user_id": user_id, "week": {"$gte": since}}},
+            {"$group": {
+                "_id": "$week",
+                "added": {"$sum": "$added"},
+                "applied": {"$sum": "$applied"},
+                "interviews": {"$sum": "$interviews"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        by_source, by_week = await asyncio.gather(
+            self.db.job_daily_rollups.aggregate([{"$match": {"user_id": user_id}}, totals_stage]).to_list(None),
+            self.db.job_daily_rollups.aggregate(weekly_pipeline).to_list(None)
+        )
+
+        funnel = {s: 0 for s in JOB_STATUSES}
+        totals = defaultdict(float)
+        sources = []
+        for row in by_source:
+            for s in JOB_STATUSES:
+                funnel[s] += int(row.get(f"status_{s}", 0))
+            for name, value in row.items():
+                if name != "_id" and not name.startswith("status_"):
+                    totals[name] += value
+            added = int(row.get("added", 0))
+            if not added:
+                continue
+            sources.append({
+                "source": row["_id"],
+                "added": added,
+                "applied": int(row.get("reached_applied", 0)),
+                "interviews": int(row.get("reached_interview", 0)),
+                "offers": int(row.get("reached_offer", 0)),
+                "apply_rate": round(row.get("reached_applied", 0) / added, 3),
+                "interview_rate": round(row.get("reached_interview", 0) / added, 3),
+            })
+        sources.sort(key=lambda s: s["added"], reverse=True)
+
+        return {
+            "total_jobs": int(totals["added"]),
+            "funnel": funnel,
+            "stages": {
+                "added": int(totals["added"]),
+                "applied": int(totals["reached_applied"]),
+                "interview": int(totals["reached_interview"]),
+                "offer": int(totals["reached_offer"]),
+            },
+            "avg_days_to_apply": _average(totals["apply_days_sum"], totals["apply_days_n"]),
+            "avg_days_to_interview": _average(totals["interview_days_sum"], totals["interview_days_n"]),
+            "sources": sources,
+            "weekly": [
+                {"week": row["_id"], "added": int(row["added"]), "applied": int(row["applied"]), "interviews": int(row["interviews"])}
+                for row in by_week
+            ],
+        }
+
+
+def _nest(counters: Dict[str, float]) -> Dict:
+    # "status.applied" is a path for $inc but must be a nested document when inserting
+    document: Dict = {}
+    for name, value in counters.items():
+        if "." in name:
+            parent, child = name.split(".", 1)
+            document.setdefault(parent, {})[child] = value
+        else:
+            document[name] = value
+    return document
+
+
+def _average(total: float, count: float) -> Optional[float]:
+    return round(total / count, 1) if count else None
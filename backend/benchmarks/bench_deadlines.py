@@ -0,0 +1,155 @@
+"""
+Query deadlines under injected database latency
+
+Runs the API in-process against mongomock-motor behind a fake connection pool
+of --pool-size connections, and stalls a fraction of job reads for
+--stall-ms. With deadlines the stalled read is cut off at its route's
+maxTimeMS (emulating the server's ExecutionTimeout) and the request gets a
+503; without them (`--no-deadlines`, the behaviour before the data-access
+layer) the stalled reads hold pooled connections and healthy requests queue
+behind them. Prints status counts and latency percentiles for both runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_deadlines --requests 400 --concurrency 16 --stall-fraction 0.05 --stall-ms 8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from pymongo.errors import ExecutionTimeout
+
+from benchmarks.load_test import percentile, seed
+
+
+class SlowDatabase:
+    """
+    Wraps a Motor database: every read takes a connection from a bounded pool and some reads stall
+    """
+
+    def __init__(self, database, pool_size, stall_fraction, stall_ms, honour_deadlines):
+        self.database = database
+        self.pool = asyncio.Semaphore(pool_size)
+        self.stall_fraction = stall_fraction
+        self.stall_ms = stall_ms
+        self.honour_deadlines = honour_deadlines
+        self.stalled = 0
+
+    def __getitem__(self, name):
+        return SlowCollection(self, self.database[name], name)
+
+    def get_collection(self, name, **kwargs):
+        return SlowCollection(self, self.database.get_collection(name, **kwargs), name)
+
+    def command(self, *args, **kwargs):
+        return self.database.command(*args, **kwargs)
+
+    async def read(self, name, max_time_ms, operation):
+        async with self.pool:
+            if name == "jobs" and random.random() < self.stall_fraction:
+                self.stalled += 1
+                if self.honour_deadlines and max_time_ms and max_time_ms < self.stall_ms:
+                    await asyncio.sleep(max_time_ms / 1000)
+                    raise ExecutionTimeout("operation exceeded time limit", 50)
+                await asyncio.sleep(self.stall_ms / 1000)
+            return await operation()
+
+
+class SlowCollection:
+    def __init__(self, owner, collection, name):
+        self.owner = owner
+        self.collection = collection
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(self.collection, attr)
+
+    def find(self, *args, **kwargs):
+        return SlowCursor(self, self.collection.find(*args, **kwargs), kwargs.get("max_time_ms"))
+
+    async def find_one(self, *args, max_time_ms=None, **kwargs):
+        return await self.owner.read(self.name, max_time_ms, lambda: self.collection.find_one(*args, **kwargs))
+
+
+class SlowCursor:
+    def __init__(self, collection, cursor, max_time_ms):
+        self.collection = collection
+        self.cursor = cursor
+        self.max_time = max_time_ms
+
+    def max_time_ms(self, ms):
+        self.max_time = ms
+        return self
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    async def to_list(self, length):
+        return await self.collection.owner.read(self.collection.name, self.max_time, lambda: self.cursor.to_list(length))
+
+
+async def run(args, honour_deadlines):
+    import httpx
+    import server
+    from mongomock_motor import AsyncMongoMockClient
+
+    raw = AsyncMongoMockClient()["jobflow_deadlines"]
+    random.seed(args.seed)
+    sessions, job_ids = await seed(raw, args.users, args.jobs_per_user, 0, 0)
+    slow = SlowDatabase(raw, args.pool_size, args.stall_fraction, args.stall_ms, honour_deadlines)
+    server.bind_database(slow)
+
+    statuses = {}
+    latencies = []
+    counter = iter(range(args.requests))
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        async def worker():
+            for _ in counter:
+                token = random.choice(sessions)
+                headers = {"Cookie": f"session_token={token}"}
+                if random.random() < 0.5:
+                    path = "/api/jobs"
+                else:
+                    path = f"/api/jobs/{random.choice(job_ids[token])}"
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "deadlines": honour_deadlines,
+        "stalled_reads": slow.stalled,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "wall_seconds": round(wall, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--jobs-per-user", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--stall-fraction", type=float, default=0.05)
+    parser.add_argument("--stall-ms", type=float, default=8000)
+    parser.add_argument("--no-deadlines", action="store_true", help="Only run without deadlines")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    modes = [False] if args.no_deadlines else [False, True]
+    print(json.dumps({"runs": [asyncio.run(run(args, mode)) for mode in modes]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Job list latency and working-set size with job texts inline vs in the side collection
+
+Builds --jobs-per-user jobs for one user with realistic text fields
+(description, and for some jobs a cover letter, notes and an AI summary),
+stores them inline, splits them, and compares the two layouts:
+
+- BSON bytes of the job documents, i.e. the data a list query has to keep in
+  cache, and the stored size of the texts with and without compression
+- the list payload (up to --list-limit jobs, as GET /api/jobs returns) and
+  the time to decode and validate it into Job models
+- with --mongo-url: end-to-end list and single-job read latency, collection
+  storage sizes, and the migration itself. mongomock scans and deep-copies
+  whole collections on every query, so its query timings say nothing about
+  document size and are not reported; the split layout is written directly.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_text --jobs-per-user 10000
+    python -m benchmarks.bench_job_text --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import bson
+
+from benchmarks.fixtures import job_documents
+from benchmarks.load_test import percentile
+
+WORDS = (
+    "build scalable services python api design own features across backend frontend teams ship reliable "
+    "customer data platform experience years strong communication cloud infrastructure testing review "
+    "mentor engineers product roadmap distributed systems observability security performance collaborate "
+    "remote benefits equity salary health learning budget growth stakeholders requirements deliver "
+    "kubernetes postgres react typescript golang kafka airflow pipelines analytics machine learning models"
+).split()
+
+
+def prose(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def benchmark_jobs(user_id, count):
+    rng = random.Random(3)
+    jobs = job_documents(user_id, count)
+    for job in jobs:
+        job["description"] = f"{job['title']}. " + " ".join(prose(rng, rng.randint(12, 30)) for _ in range(rng.randint(15, 60)))
+        if rng.random() < 0.3:
+            job["cover_letter"] = " ".join(prose(rng, rng.randint(15, 25)) for _ in range(rng.randint(8, 14)))
+        if rng.random() < 0.4:
+            job["notes"] = prose(rng, rng.randint(5, 40))
+        if rng.random() < 0.5:
+            job["ai_summary"] = [prose(rng, rng.randint(8, 16)) for _ in range(3)]
+    return jobs
+
+
+async def timed(operation, runs):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {"p50_ms": round(statistics.median(latencies) * 1000, 2), "p95_ms": round(percentile(latencies, 0.95) * 1000, 2)}
+
+
+def timed_sync(operation, runs):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {"p50_ms": round(statistics.median(latencies) * 1000, 2), "p95_ms": round(percentile(latencies, 0.95) * 1000, 2)}
+
+
+async def collection_bytes(collection):
+    total = 0
+    async for doc in collection.find({}):
+        total += len(bson.encode(doc))
+    return total
+
+
+async def run(args):
+    import server
+    from job_text import JobTextStore, TEXT_FIELDS, WITHOUT_TEXT, split_text
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        await client.drop_database(args.db_name)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    db = client[args.db_name]
+    store = JobTextStore(db)
+    await store.ensure_indexes()
+    await db.jobs.create_index([("user_id", 1), ("job_id", 1)])
+
+    user_id = "user_bench000000"
+    jobs = benchmark_jobs(user_id, args.jobs_per_user)
+    raw_text_bytes = sum(len(json.dumps(job[f], ensure_ascii=False).encode()) for job in jobs for f in TEXT_FIELDS if job.get(f))
+    await db.jobs.insert_many([dict(job) for job in jobs])
+    sample = [job["job_id"] for job in random.Random(5).sample(jobs, min(args.queries, len(jobs)))]
+
+    def validate(docs):
+        return [server.Job(**doc) for doc in docs]
+
+    async def list_client(projection):
+        # What the driver receives for the list, decoded and validated as the handler does
+        docs = await db.jobs.find({"user_id": user_id}, projection).limit(args.list_limit).to_list(args.list_limit)
+        payload = b"".join(bson.encode(doc) for doc in docs)
+        return len(payload), timed_sync(lambda: validate(bson.decode_all(payload)), args.runs)
+
+    async def list_inline():
+        validate(await db.jobs.find({"user_id": user_id}, {"_id": 0}).limit(args.list_limit).to_list(args.list_limit))
+
+    async def list_split():
+        validate(await db.jobs.find({"user_id": user_id}, WITHOUT_TEXT).limit(args.list_limit).to_list(args.list_limit))
+
+    picks = iter(sample * args.runs)
+
+    async def detail_inline():
+        server.Job(**await db.jobs.find_one({"job_id": next(picks), "user_id": user_id}, {"_id": 0}))
+
+    async def detail_split():
+        job_id = next(picks)
+        job, texts = await asyncio.gather(
+            db.jobs.find_one({"job_id": job_id, "user_id": user_id}, {"_id": 0}),
+            store.load(user_id, job_id)
+        )
+        server.Job(**{**job, **texts})
+
+    report = {"backend": "mongod" if args.mongo_url else "mongomock", "jobs": len(jobs), "list_limit": args.list_limit}
+    inline_bytes = await collection_bytes(db.jobs)
+    payload_bytes, decode = await list_client({"_id": 0})
+    report["inline"] = {
+        "jobs_collection_bytes": inline_bytes,
+        "avg_job_doc_bytes": round(inline_bytes / len(jobs)),
+        "list_payload_bytes": payload_bytes,
+        "list_decode_validate": decode,
+    }
+    if args.mongo_url:
+        report["inline"]["list"] = await timed(list_inline, args.runs)
+        report["inline"]["detail"] = await timed(detail_inline, len(sample))
+        start = time.perf_counter()
+        migrated = await store.migrate()
+        report["migration"] = {**migrated, "seconds": round(time.perf_counter() - start, 2)}
+    else:
+        await db.jobs.drop()
+        await db.jobs.insert_many([split_text(job)[0] for job in jobs])
+        await store.save_many(user_id, [(job["job_id"], split_text(job)[1]) for job in jobs])
+
+    split_bytes = await collection_bytes(db.jobs)
+    text_bytes = await collection_bytes(db.job_texts)
+    payload_bytes, decode = await list_client(WITHOUT_TEXT)
+    report["split"] = {
+        "jobs_collection_bytes": split_bytes,
+        "avg_job_doc_bytes": round(split_bytes / len(jobs)),
+        "job_texts_collection_bytes": text_bytes,
+        "text_bytes_uncompressed": raw_text_bytes,
+        "list_payload_bytes": payload_bytes,
+        "list_decode_validate": decode,
+    }
+    report["list_working_set_reduction"] = round(inline_bytes / split_bytes, 1)
+    report["list_decode_speedup"] = round(report["inline"]["list_decode_validate"]["p50_ms"] / decode["p50_ms"], 2)
+    if args.mongo_url:
+        picks = iter(sample * args.runs)
+        report["split"]["list"] = await timed(list_split, args.runs)
+        report["split"]["detail"] = await timed(detail_split, len(sample))
+        report["list_p50_speedup"] = round(report["inline"]["list"]["p50_ms"] / report["split"]["list"]["p50_ms"], 2)
+        for name in ("jobs", "job_texts"):
+            stats = await db.command("collStats", name)
+            report["split"][f"{name}_storage_bytes"] = stats.get("storageSize")
+        await client.drop_database(args.db_name)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs-per-user", type=int, default=10000)
+    parser.add_argument("--list-limit", type=int, default=1000, help="GET /api/jobs returns at most this many")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--mongo-url", help="Use a real mongod instead of mongomock-motor")
+    parser.add_argument("--db-name", default="jobflow_job_text_benchmark")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
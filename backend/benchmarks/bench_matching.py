@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the precompiled query/experience matchers over a 10k-job feed
+
+Usage (from backend/): python -m benchmarks.bench_matching [--jobs 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.fixtures import remoteok_feed, scraped_postings
+from job_matching import LEVEL_KEYWORDS, KeywordMatcher, query_matcher, matches_experience
+
+QUERIES = ['python', 'react', 'Senior', 'machine learning']
+LEVELS = ['entry', 'mid', 'senior']
+
+
+def legacy_query_filter(feed, query):
+    query_lower = query.lower()
+    hits = 0
+    for job in feed[1:]:
+        title = job.get('position', '')
+        description = job.get('description', '')
+        tags = ' '.join(job.get('tags', []))
+        if (query_lower in title.lower() or
+                query_lower in description.lower() or
+                query_lower in tags.lower()):
+            hits += 1
+    return hits
+
+
+def compiled_query_filter(feed, query):
+    matcher = query_matcher(query)
+    hits = 0
+    for job in feed[1:]:
+        if matcher.search(job.get('position', ''), job.get('description', ''), ' '.join(job.get('tags', []))):
+            hits += 1
+    return hits
+
+
+def legacy_experience_filter(jobs, level):
+    hits = 0
+    for job in jobs:
+        combined = f"{job.title.lower()} {job.description.lower()}"
+        level_keywords = dict(LEVEL_KEYWORDS)
+        if any(keyword in combined for keyword in level_keywords[level]):
+            hits += 1
+    return hits
+
+
+def compiled_experience_filter(jobs, level):
+    return sum(1 for job in jobs if matches_experience(job, level))
+
+
+def substring_experience_filter(jobs, level):
+    # Same matching semantics as the legacy filter, for a like-for-like comparison
+    matcher = KeywordMatcher(LEVEL_KEYWORDS[level], word_boundaries=False)
+    return sum(1 for job in jobs if matcher.search(job.title, job.description))
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    feed = remoteok_feed(args.jobs)
+    jobs = scraped_postings(args.jobs)
+    report = {'jobs': args.jobs, 'query': {}, 'experience': {}}
+
+    for query in QUERIES:
+        legacy = best_of(lambda: legacy_query_filter(feed, query), args.repeat)
+        compiled = best_of(lambda: compiled_query_filter(feed, query), args.repeat)
+        report['query'][query] = {
+            'hits': compiled_query_filter(feed, query),
+            'legacy_jobs_per_s': round(args.jobs / legacy),
+            'compiled_jobs_per_s': round(args.jobs / compiled),
+            'speedup': round(legacy / compiled, 2),
+        }
+
+    for level in LEVELS:
+        legacy = best_of(lambda: legacy_experience_filter(jobs, level), args.repeat)
+        substring = best_of(lambda: substring_experience_filter(jobs, level), args.repeat)
+        compiled = best_of(lambda: compiled_experience_filter(jobs, level), args.repeat)
+        report['experience'][level] = {
+            'legacy_jobs_per_s': round(args.jobs / legacy),
+            'legacy_hits': legacy_experience_filter(jobs, level),
+            'compiled_substring_jobs_per_s': round(args.jobs / substring),
+            'substring_speedup': round(legacy / substring, 2),
+            'compiled_word_boundary_jobs_per_s': round(args.jobs / compiled),
+            'word_boundary_hits': compiled_experience_filter(jobs, level),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Memory and throughput of JobPosting records vs the 11-key dicts the scrapers used to build
+
+Pushes --postings RemoteOK feed items through the scraper pipeline twice: once
+with the former dict code (copied here) and once through JobScraper's parser,
+_filter_and_dedupe, the search response serialization and the conversion to
+Job that bulk-save does. Memory is what a list of parsed postings keeps alive,
+measured with tracemalloc.
+
+Usage (from backend/): python -m benchmarks.bench_postings [--postings 50000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "jobflow_benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from benchmarks.fixtures import remoteok_feed  # noqa: E402
+from job_matching import experience_matcher  # noqa: E402
+from job_posting import postings_to_dicts  # noqa: E402
+from job_scraper import JobScraper  # noqa: E402
+from server import Job, JobCreate  # noqa: E402
+
+LEVEL = 'senior'
+USER_ID = 'user_benchmark'
+
+
+def legacy_parse(scraper, feed):
+    results = []
+    for job in feed[1:]:
+        description = job.get('description', '')
+        results.append({
+            'title': job.get('position', ''),
+            'company': job.get('company', 'Unknown'),
+            'location': 'Remote',
+            'description': description[:500] + '...' if len(description) > 500 else description,
+            'posted_date': scraper._parse_date(job.get('date')),
+            'job_url': job.get('url', ''),
+            'company_url': job.get('company_logo', ''),
+            'salary_range': job.get('salary_max', ''),
+            'is_remote': True,
+            'source': 'RemoteOK',
+            'tags': job.get('tags', [])[:5]
+        })
+    return results
+
+
+def legacy_matches_experience(job, level):
+    matcher = experience_matcher(level)
+    if matcher is None:
+        return True
+    return matcher.search(job.get('title', ''), job.get('description', ''))
+
+
+def legacy_filter_and_dedupe(jobs, remote_only, experience_level, seen):
+    if remote_only:
+        jobs = [job for job in jobs if job.get('is_remote', False)]
+    if experience_level:
+        jobs = [job for job in jobs if legacy_matches_experience(job, experience_level)]
+    unique_results = []
+    for job in jobs:
+        key = (job.get('title', '').lower(), job.get('company', '').lower())
+        if key not in seen and key[0] and key[1]:
+            seen.add(key)
+            unique_results.append(job)
+    return unique_results
+
+
+def legacy_save(jobs):
+    # What bulk-save did with scraped results sent back to it: validate, then build Job
+    creates = TypeAdapter(list[JobCreate]).validate_python(jobs)
+    return [Job(user_id=USER_ID, **job.model_dump()) for job in creates]
+
+
+def posting_parse(scraper, feed):
+    return [scraper.parse_remoteok_item(job) for job in feed[1:]]
+
+
+def posting_save(postings):
+    return [Job.from_posting(USER_ID, posting) for posting in postings]
+
+
+def retained_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return records, size
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def stages(scraper, feed, records, parse, filter_and_dedupe, serialize, save, repeat):
+    count = len(records)
+    return {
+        'parse_per_s': round(count / best_of(lambda: parse(scraper, feed), repeat)),
+        'filter_dedupe_per_s': round(count / best_of(lambda: filter_and_dedupe(records, True, LEVEL, set()), repeat)),
+        'serialize_per_s': round(count / best_of(lambda: serialize(records), repeat)),
+        'to_job_per_s': round(count / best_of(lambda: save(records), repeat)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--postings', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    scraper = JobScraper()
+    feed = remoteok_feed(args.postings)
+    dicts, dict_bytes = retained_bytes(lambda: legacy_parse(scraper, feed))
+    postings, posting_bytes = retained_bytes(lambda: posting_parse(scraper, feed))
+    # Keep collections of the inputs from landing in whichever stage happens to trigger them
+    gc.collect()
+    gc.freeze()
+
+    # Same survivors in the same order, and the same response body
+    legacy_kept = legacy_filter_and_dedupe(dicts, True, LEVEL, set())
+    kept = scraper._filter_and_dedupe(postings, True, LEVEL, set())
+    assert [job['job_url'] for job in legacy_kept] == [job.job_url for job in kept]
+    assert postings_to_dicts(postings[:100]) == [dict(job, salary_range=str(job['salary_range'])) for job in dicts[:100]]
+
+    report = {
+        'postings': len(postings),
+        'dict': {
+            'retained_bytes_per_posting': round(dict_bytes / len(dicts)),
+            **stages(scraper, feed, dicts, legacy_parse, legacy_filter_and_dedupe, json.dumps, legacy_save, args.repeat),
+        },
+        'job_posting': {
+            'retained_bytes_per_posting': round(posting_bytes / len(postings)),
+            **stages(
+                scraper, feed, postings, posting_parse, scraper._filter_and_dedupe,
+                lambda records: json.dumps(postings_to_dicts(records)), posting_save, args.repeat
+            ),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-request overhead of the rate limiting middleware
+
+Drives RateLimitMiddleware directly with ASGI scopes (a mix of CRUD, search
+and AI paths from --users users, cookie- and bearer-authenticated) around a
+no-op app, and compares it to calling the app without the middleware. Limits
+are set high enough that every request is allowed, which is the path every
+real request pays for. Exits non-zero if the added overhead per request
+exceeds --budget-us, so it can run as a CI step.
+
+With --mongo-url it also times the shared store's atomic bucket update
+(a network round trip; only the search/AI/bulk classes use it).
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit --requests 200000 --budget-us 50
+    python -m benchmarks.bench_rate_limit --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+
+from rate_limit import DEFAULT_LIMITS, MongoRateLimitStore, RateLimiter, RateLimitMiddleware
+
+PATHS = [
+    ("GET", "/api/jobs"), ("GET", "/api/jobs/job_0123456789ab"), ("PATCH", "/api/jobs/job_0123456789ab"),
+    ("GET", "/api/goals"), ("GET", "/api/tasks"), ("GET", "/api/reminders"),
+    ("POST", "/api/jobs/search"), ("POST", "/api/ai/analyze-job"),
+]
+
+
+def scopes(users, count, seed=7):
+    rng = random.Random(seed)
+    tokens = [f"{i:032x}" for i in range(users)]
+    result = []
+    for _ in range(count):
+        method, path = rng.choice(PATHS)
+        token = rng.choice(tokens)
+        if rng.random() < 0.8:
+            auth = (b"cookie", f"theme=dark; session_token={token}".encode())
+        else:
+            auth = (b"authorization", f"Bearer {token}".encode())
+        result.append({
+            "type": "http", "method": method, "path": path, "client": ("10.0.0.1", 50000),
+            "headers": [(b"host", b"api.example.com"), (b"accept", b"application/json"), auth],
+        })
+    return result, tokens
+
+
+async def noop_app(scope, receive, send):
+    pass
+
+
+async def per_request_us(app, requests, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for scope in requests:
+            await app(scope, None, None)
+        samples.append((time.perf_counter() - start) / len(requests) * 1e6)
+    return statistics.median(samples)
+
+
+async def run(args):
+    requests, tokens = scopes(args.users, args.requests)
+    unlimited = {name: (1e9, 1e9) for name in DEFAULT_LIMITS}
+    limiter = RateLimiter(unlimited)
+    # Half the users are known (their token was resolved by get_current_user before)
+    for i, token in enumerate(tokens[::2]):
+        limiter.remember_session(token, f"user_{i:012x}")
+    middleware = RateLimitMiddleware(noop_app, limiter)
+
+    baseline = await per_request_us(noop_app, requests, args.runs)
+    limited = await per_request_us(middleware, requests, args.runs)
+    report = {
+        "requests": args.requests,
+        "users": args.users,
+        "baseline_us": round(baseline, 2),
+        "with_rate_limit_us": round(limited, 2),
+        "overhead_us": round(limited - baseline, 2),
+        "budget_us": args.budget_us,
+    }
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        store = MongoRateLimitStore(client[args.db_name])
+        await store.ensure_indexes()
+        latencies = []
+        for i in range(args.mongo_requests):
+            start = time.perf_counter()
+            await store.acquire(f"search:user_{i % args.users}", 1e9, 1e9)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        report["mongo_acquire_p50_us"] = round(statistics.median(latencies), 1)
+        await client.drop_database(args.db_name)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-us", type=float, default=50)
+    parser.add_argument("--mongo-url", help="Also time the shared Mongo store")
+    parser.add_argument("--mongo-requests", type=int, default=2000)
+    parser.add_argument("--db-name", default="jobflow_rate_limit_benchmark")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if report["overhead_us"] > args.budget_us:
+        print(f"Rate limiting adds {report['overhead_us']:.1f}us per request (budget {args.budget_us:.0f}us)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
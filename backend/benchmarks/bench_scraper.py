@@ -0,0 +1,166 @@
+"""
+Offline search_jobs benchmark over recorded responses, and response cache hits vs misses
+
+Runs the full JobScraper.search_jobs pipeline (fetch, parse, match, dedupe)
+with the fetch layer in replay mode, so no request leaves the machine. By
+default it writes synthetic fixtures for the exact URLs the scrapers request
+(a RemoteOK API feed plus We Work Remotely and Indeed result pages); pass
+--fixtures to replay responses recorded with SCRAPER_HTTP_MODE=record instead.
+
+It then runs the same searches in live mode against a fake network with
+--network-ms of latency per request: once with an empty response cache
+(every fetch is a miss) and once warm (served from disk while max-age holds).
+
+Usage (from backend/):
+    python -m benchmarks.bench_scraper --queries python react golang --runs 20
+    python -m benchmarks.bench_scraper --fixtures data/http_fixtures --queries python
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from html import escape
+from urllib.parse import quote_plus
+
+from benchmarks.fixtures import remoteok_feed
+from benchmarks.load_test import percentile
+from http_fetch import FixtureStore, HttpFetcher, ResponseCache, request_key, request_url
+
+JSON_HEADERS = {"content-type": "application/json; charset=utf-8", "cache-control": "max-age=600"}
+HTML_HEADERS = {"content-type": "text/html; charset=utf-8", "cache-control": "max-age=600"}
+
+
+def wwr_page(feed):
+    items = "".join(
+        f'<li class="feature"><a class="preventLink" href="/remote-jobs/{job["id"]}">'
+        f'<span class="company">{escape(job["company"])}</span><span class="title">{escape(job["position"])}</span></a></li>'
+        for job in feed
+    )
+    return f"<html><body><section class=\"jobs\"><ul>{items}</ul></section></body></html>"
+
+
+def indeed_page(feed):
+    cards = "".join(
+        f'<div class="job_seen_beacon"><h2 class="jobTitle"><a href="/viewjob?jk={job["id"]}">{escape(job["position"])}</a></h2>'
+        f'<span class="companyName">{escape(job["company"])}</span><div class="companyLocation">Remote</div></div>'
+        for job in feed
+    )
+    return f"<html><body><div id=\"mosaic-jobResults\">{cards}</div></body></html>"
+
+
+def synthetic_responses(queries, location, feed_size, page_size):
+    """
+    {url: (headers, body)} for every request search_jobs makes for these queries
+    """
+    feed = remoteok_feed(feed_size)
+    responses = {"https://remoteok.com/api": (JSON_HEADERS, json.dumps(feed).encode())}
+    for i, query in enumerate(queries):
+        page = feed[1 + i * page_size:1 + (i + 1) * page_size]
+        wwr = request_url("https://weworkremotely.com/remote-jobs/search", {"term": query})
+        indeed = f"https://www.indeed.com/jobs?q={quote_plus(query)}&l={quote_plus(location or 'United States')}"
+        responses[wwr] = (HTML_HEADERS, wwr_page(page).encode())
+        responses[indeed] = (HTML_HEADERS, indeed_page(page).encode())
+    return responses
+
+
+class FakeNetwork:
+    """
+    Stands in for the aiohttp session: serves canned responses after a fixed delay
+    """
+
+    def __init__(self, responses, delay_ms):
+        self.responses = responses
+        self.delay = delay_ms / 1000
+        self.requests = 0
+
+    @asynccontextmanager
+    async def session(self, url=None):
+        yield self
+
+    @asynccontextmanager
+    async def get(self, url, headers=None, timeout=None, allow_redirects=True):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        response_headers, body = self.responses[url]
+        yield FakeResponse(200, response_headers, body)
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+
+async def timed_searches(scraper, queries, location, runs):
+    latencies = []
+    found = 0
+    for _ in range(runs):
+        for query in queries:
+            start = time.perf_counter()
+            found += len(await scraper.search_jobs(query, location=location, max_results=30))
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "searches": len(latencies),
+        "jobs_returned": found,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+    }
+
+
+async def run(args):
+    from job_scraper import JobScraper
+
+    workdir = tempfile.mkdtemp(prefix="jobflow_scraper_bench_")
+    responses = synthetic_responses(args.queries, args.location, args.feed_size, args.page_size)
+    if args.fixtures:
+        fixtures = FixtureStore(args.fixtures)
+    else:
+        fixtures = FixtureStore(f"{workdir}/fixtures")
+        for url, (headers, body) in responses.items():
+            fixtures.save(url, request_key("GET", url), 200, headers, body)
+
+    scraper = JobScraper()
+    report = {"queries": args.queries, "fixtures": "recorded" if args.fixtures else "synthetic"}
+    scraper.fetcher = HttpFetcher("replay", fixtures=fixtures)
+    report["replay"] = await timed_searches(scraper, args.queries, args.location, args.runs)
+
+    if not args.fixtures:
+        network = FakeNetwork(responses, args.network_ms)
+        scraper._client_session = network.session
+        scraper.fetcher = HttpFetcher("live")
+        report["no_cache"] = await timed_searches(scraper, args.queries, args.location, args.runs)
+        report["no_cache"]["network_requests"] = network.requests
+
+        network.requests = 0
+        scraper.fetcher = HttpFetcher("live", cache=ResponseCache(f"{workdir}/cache"))
+        await timed_searches(scraper, args.queries, args.location, 1)
+        warmed = network.requests
+        report["cache_warm"] = await timed_searches(scraper, args.queries, args.location, args.runs)
+        report["cache_warm"]["network_requests"] = network.requests - warmed
+        report["cache_speedup"] = round(report["no_cache"]["p50_ms"] / report["cache_warm"]["p50_ms"], 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", nargs="+", default=["python", "react", "golang"])
+    parser.add_argument("--location")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--feed-size", type=int, default=2000, help="Jobs in the synthetic RemoteOK feed")
+    parser.add_argument("--page-size", type=int, default=25, help="Jobs on each synthetic result page")
+    parser.add_argument("--network-ms", type=float, default=150, help="Fake round trip per uncached request")
+    parser.add_argument("--fixtures", help="Directory of recorded fixtures to replay instead of synthetic ones")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for the similar-jobs index: vectorizing, top-k query latency and snapshot save/load
+
+Queries are timed both for a typical inbox (jobs spread over many users) and
+for the worst case of one user owning every posting in the index.
+
+Usage (from backend/): python -m benchmarks.bench_similarity [--jobs 100000] [--users 200] [--queries 500]
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import scraped_jobs
+from similarity_index import SimilarityIndex
+
+
+def query_latencies(index, user_id, job_ids, queries, rng):
+    latencies = []
+    for job_id in rng.choice(job_ids, size=queries):
+        start = time.perf_counter()
+        index.query(user_id, index.vector(job_id), k=10, exclude=job_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+    rng = np.random.default_rng(1)
+
+    jobs = scraped_jobs(args.jobs)
+    for i, job in enumerate(jobs):
+        job["job_id"] = f"job_{i:012x}"
+        job["user_id"] = f"user_{i % args.users:06d}"
+
+    report = {"jobs": len(jobs), "users": args.users, "dim": args.dim}
+    with tempfile.TemporaryDirectory() as path:
+        index = SimilarityIndex(path, dim=args.dim)
+        start = time.perf_counter()
+        for i in range(0, len(jobs), 1000):
+            index.add_jobs(jobs[i:i + 1000])
+        report["vectorize_jobs_per_second"] = round(len(jobs) / (time.perf_counter() - start))
+
+        user_jobs = [job["job_id"] for job in jobs if job["user_id"] == "user_000000"]
+        report["query_inbox"] = query_latencies(index, "user_000000", user_jobs, args.queries, rng)
+
+        start = time.perf_counter()
+        index.save()
+        report["save_seconds"] = round(time.perf_counter() - start, 3)
+        start = time.perf_counter()
+        reloaded = SimilarityIndex(path, dim=args.dim)
+        reloaded.load()
+        report["load_seconds"] = round(time.perf_counter() - start, 3)
+        report["query_inbox_memmap"] = query_latencies(reloaded, "user_000000", user_jobs, args.queries, rng)
+
+        # Worst case: a single owner, so every query scores the whole index
+        solo = SimilarityIndex(None, dim=args.dim)
+        solo.add_vectors([job["job_id"] for job in jobs], ["user_solo"] * len(jobs), reloaded._row_vectors(np.arange(len(jobs))))
+        report["query_single_owner"] = query_latencies(solo, "user_solo", [job["job_id"] for job in jobs], args.queries, rng)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Throughput scaling of the serving entry point from 1 to N worker processes
+
+Seeds a MongoDB database, then for each worker count starts `serve.py` on a
+local port, waits for /readyz, and drives GET /api/jobs (auth plus a
+list of --jobs-per-user documents, mostly CPU-bound serialization) from
+several load-generator processes. Prints requests/second per worker count
+and the speedup over one worker. Needs a running mongod; the machine needs
+enough cores for both the workers and the load generators.
+
+Usage (from backend/):
+    python -m benchmarks.bench_workers --mongo-url mongodb://localhost:27017 --max-workers 4 --duration 15
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.load_test import seed  # noqa: E402
+
+
+async def seed_database(mongo_url, db_name, users, jobs_per_user):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(mongo_url)
+    await client.drop_database(db_name)
+    sessions, _ = await seed(client[db_name], users, jobs_per_user, 0, 0)
+    client.close()
+    return sessions
+
+
+async def wait_until_up(base_url, timeout=60):
+    import httpx
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as http:
+        while time.monotonic() < deadline:
+            try:
+                if (await http.get(f"{base_url}/readyz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+def generate_load(base_url, sessions, duration, concurrency, results):
+    import httpx
+
+    async def run():
+        done = errors = 0
+        deadline = time.monotonic() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+            async def worker(i):
+                nonlocal done, errors
+                headers = {"Cookie": f"session_token={sessions[i % len(sessions)]}"}
+                while time.monotonic() < deadline:
+                    response = await http.get("/api/jobs", headers=headers)
+                    done += 1
+                    errors += response.status_code != 200
+            await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        results.put((done, errors))
+
+    asyncio.run(run())
+
+
+def measure(workers, args, sessions):
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "MONGO_URL": args.mongo_url,
+        "DB_NAME": args.db_name,
+        "REMINDER_SCHEDULER_ENABLED": "false",
+        "TASK_GENERATION_ENABLED": "false",
+        "SIMILARITY_INDEX_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        # Multi-worker live events need a replica set; the benchmark runs against a standalone mongod
+        "EVENT_SOURCE": "off",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        asyncio.run(wait_until_up(base_url))
+        # Give every worker time to finish its warm-up, not just the first one
+        time.sleep(1 + workers * 0.5)
+        results = multiprocessing.Queue()
+        generators = [
+            multiprocessing.Process(target=generate_load, args=(base_url, sessions, args.duration, args.concurrency, results))
+            for _ in range(args.load_processes)
+        ]
+        for process in generators:
+            process.start()
+        totals = [results.get() for _ in generators]
+        for process in generators:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    done = sum(t[0] for t in totals)
+    return {"workers": workers, "requests": done, "errors": sum(t[1] for t in totals), "rps": round(done / args.duration, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-url", required=True)
+    parser.add_argument("--db-name", default="jobflow_worker_benchmark")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--jobs-per-user", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=32, help="Connections per load-generator process")
+    parser.add_argument("--load-processes", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sessions = asyncio.run(seed_database(args.mongo_url, args.db_name, args.users, args.jobs_per_user))
+    runs = []
+    worker_counts = sorted({1, *[n for n in (2, 4, 8, 16) if n < args.max_workers], args.max_workers})
+    for workers in worker_counts:
+        runs.append(measure(workers, args, sessions))
+        print(json.dumps(runs[-1]), file=sys.stderr)
+    baseline = runs[0]["rps"] or 1
+    for run in runs:
+        run["speedup"] = round(run["rps"] / baseline, 2)
+    print(json.dumps({"users": args.users, "jobs_per_user": args.jobs_per_user, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Deterministic synthetic fixtures shared by the benchmark scripts
+"""
+import random
+from datetime import datetime, timezone, timedelta
+
+from job_posting import JobPosting
+
+TITLES = [
+    'Software Engineer', 'Senior Backend Developer', 'Junior Frontend Engineer', 'Staff Data Scientist',
+    'Python Developer', 'Lead DevOps Engineer', 'Product Designer', 'Mid-level React Developer',
+    'Principal Architect', 'Graduate Software Engineer', 'Machine Learning Engineer', 'QA Analyst',
+]
+COMPANIES = [
+    'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+    'Soylent', 'Vandelay', 'Pied Piper', 'Cyberdyne', 'Tyrell',
+]
+TAGS = ['python', 'react', 'aws', 'golang', 'kubernetes', 'django', 'fastapi', 'sql', 'typescript', 'ml']
+FILLER = (
+    'We are looking for a motivated engineer to join our growing team. You will work on middleware, '
+    'distributed systems and customer-facing features. Experience with cloud platforms is a plus. '
+    'Our leadership team values ownership, collaboration and continuous learning. '
+)
+STATUSES = ['saved', 'applied', 'interview', 'offer', 'rejected']
+SOURCES = ['RemoteOK', 'We Work Remotely', 'Indeed', 'LinkedIn', 'Referral']
+
+
+def remoteok_feed(count: int = 10000, seed: int = 42) -> list:
+    """
+    A RemoteOK-shaped API payload: a metadata item followed by `count` job dicts
+    """
+    rng = random.Random(seed)
+    feed = [{'legal': 'metadata'}]
+    for i in range(count):
+        title = rng.choice(TITLES)
+        years = rng.choice(['0-2 years', '3-5 years', '5+ years', ''])
+        feed.append({
+            'id': str(i),
+            'position': title,
+            'company': rng.choice(COMPANIES),
+            'description': f"{title}. {FILLER * rng.randint(2, 8)} {years}",
+            'date': '2026-01-15',
+            'url': f"https://remoteok.com/remote-jobs/{i}",
+            'company_logo': '',
+            'salary_max': rng.choice(['', '120000', '180000']),
+            'tags': rng.sample(TAGS, 4),
+        })
+    return feed
+
+
+def scraped_jobs(count: int = 10000, seed: int = 42) -> list:
+    """
+    Jobs in the dict shape produced by the JobScraper parsers
+    """
+    jobs = []
+    for item in remoteok_feed(count, seed)[1:]:
+        jobs.append({
+            'title': item['position'],
+            'company': item['company'],
+            'location': 'Remote',
+            'description': item['description'][:500],
+            'posted_date': datetime(2026, 1, 15, tzinfo=timezone.utc).isoformat(),
+            'job_url': item['url'],
+            'company_url': '',
+            'salary_range': item['salary_max'],
+            'is_remote': True,
+            'source': 'RemoteOK',
+            'tags': item['tags'][:5],
+        })
+    return jobs
+
+
+def scraped_postings(count: int = 10000, seed: int = 42) -> list:
+    """
+    The same jobs as scraped_jobs, as the JobPosting records the scrapers now return
+    """
+    return [JobPosting.from_dict(job) for job in scraped_jobs(count, seed)]
+
+
+def job_documents(user_id: str, count: int, seed: int = 7) -> list:
+    """
+    Documents in the shape stored in `db.jobs`
+    """
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    docs = []
+    for i in range(count):
+        added = base + timedelta(hours=rng.randint(0, 24 * 180))
+        status = rng.choice(STATUSES)
+        applied = added + timedelta(days=rng.randint(0, 10)) if status != 'saved' else None
+        interview = applied + timedelta(days=rng.randint(3, 20)) if status in ('interview', 'offer') else None
+        title = rng.choice(TITLES)
+        docs.append({
+            'job_id': f"job_{user_id[-4:]}{i:08x}",
+            'user_id': user_id,
+            'title': title,
+            'company': rng.choice(COMPANIES),
+            'location': 'Remote',
+            'job_url': f"https://example.com/jobs/{user_id}/{i}",
+            'source': rng.choice(SOURCES),
+            'description': f"{title}. {FILLER * rng.randint(4, 16)}",
+            'date_added': added.isoformat(),
+            'salary_range': None,
+            'status': status,
+            'notes': None,
+            'resume_version': None,
+            'cover_letter': None,
+            'contact_person': None,
+            'applied_date': applied.isoformat() if applied else None,
+            'interview_date': interview.isoformat() if interview else None,
+            'ai_match_score': None,
+            'ai_keywords': None,
+            'ai_summary': None,
+        })
+    return docs
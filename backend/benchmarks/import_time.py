@@ -0,0 +1,94 @@
+"""
+Import-time budget check for the API module
+
+Imports `server` in a fresh interpreter under `python -X importtime` (best of
+--runs, so the first run's bytecode compilation does not count), prints the
+slowest direct imports, and exits non-zero if the import takes longer than
+--budget-ms or pulls in a module that must only be loaded on first use (the
+LLM SDK and the scraper stack). Suitable as a CI step.
+
+Usage (from backend/):
+    python -m benchmarks.import_time --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Loaded by the handlers that need them, never by `import server`
+LAZY_MODULES = ("emergentintegrations", "job_scraper", "bs4", "aiohttp", "requests")
+
+
+def import_profile(module):
+    """
+    (name, self_us, cumulative_us, depth) for every module imported by `import module`
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def eager_imports(rows):
+    """
+    The LAZY_MODULES (or their submodules) that appear in an import_profile
+    """
+    imported = {r[0] for r in rows}
+    return sorted(m for m in LAZY_MODULES if m in imported or any(name.startswith(f"{m}.") for name in imported))
+
+
+def import_ms(rows, module):
+    return next(r[2] for r in rows if r[0] == module) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    rows = min(profiles, key=lambda p: import_ms(p, args.module))
+    total_ms = import_ms(rows, args.module)
+    eager = eager_imports(rows)
+    # Depth 1 = imported directly by the module (or first reached through it)
+    direct = sorted((r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True)
+
+    report = {
+        "module": args.module,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "modules_imported": len(rows),
+        "eagerly_imported_lazy_modules": eager,
+        "slowest_imports_ms": {name: round(cumulative / 1000, 1) for name, _, cumulative, _ in direct[:args.top]},
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {total_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    if eager:
+        failures.append(f"import {args.module} loaded {', '.join(eager)}; these must be imported on first use")
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
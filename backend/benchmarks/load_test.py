@@ -0,0 +1,359 @@
+"""
+Reproducible in-process load test for the JobFlow API
+
+Boots `server.app` against mongomock-motor (default) or a local mongod, seeds
+users, sessions, jobs, tasks and reminders, stubs the LLM and the scrapers, and
+drives weighted request mixes through httpx's ASGI transport. Results
+(throughput and p50/p95/p99 per scenario) are printed as JSON so runs can be
+compared between commits.
+
+Usage (from backend/):
+    pip install httpx mongomock-motor
+    python -m benchmarks.load_test --users 20 --jobs-per-user 500 --concurrency 32 --requests 2000
+    python -m benchmarks.load_test --mongo-url mongodb://localhost:27017 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+# The server reads these at import time; background services are not part of the measured paths
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "jobflow_benchmark")
+os.environ["REMINDER_SCHEDULER_ENABLED"] = "false"
+os.environ["TASK_GENERATION_ENABLED"] = "false"
+# Measures throughput, so every request must reach its handler
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import job_documents, scraped_jobs  # noqa: E402
+from job_posting import JobPosting  # noqa: E402
+from job_text import JobTextStore, split_text  # noqa: E402
+
+MIXES = {
+    "dashboard": {"dashboard": 1},
+    "dashboard_batch": {"dashboard_batch": 1},
+    "inbox": {"inbox_scroll": 1},
+    "bulk_save": {"bulk_save": 1},
+    "search": {"search": 1},
+    "realistic": {"dashboard": 4, "inbox_scroll": 4, "job_detail": 6, "update_job": 3, "bulk_save": 1, "search": 1},
+}
+
+ANALYSIS_RESPONSE = """MATCH_SCORE: 82
+KEYWORDS: Python, FastAPI, MongoDB, AWS, Docker
+SUMMARY:
+- Build backend services
+- Own the data model
+- Work with product"""
+
+
+class StubLlmChat:
+    """
+    Stands in for emergentintegrations' LlmChat with a fixed latency and canned reply
+    """
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def with_model(self, provider, model):
+        return self
+
+    async def send_message(self, message):
+        await asyncio.sleep(self.latency)
+        return ANALYSIS_RESPONSE
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+async def seed(db, users, jobs_per_user, tasks_per_user, reminders_per_user):
+    now = datetime.now(timezone.utc)
+    today = now.date().isoformat()
+    sessions = []
+    job_ids = {}
+    for u in range(users):
+        user_id = f"user_bench{u:06d}"
+        token = f"bench_session_{u:06d}"
+        await db.users.insert_one({
+            "user_id": user_id,
+            "email": f"bench{u}@example.com",
+            "name": f"Bench User {u}",
+            "picture": None,
+            "created_at": now.isoformat()
+        })
+        await db.user_sessions.insert_one({
+            "user_id": user_id,
+            "session_token": token,
+            "expires_at": (now + timedelta(days=7)).isoformat(),
+            "created_at": now.isoformat()
+        })
+        jobs = job_documents(user_id, jobs_per_user, seed=u)
+        if jobs:
+            # Stored the way the API writes them: texts in their side collection
+            await db.jobs.insert_many([split_text(job)[0] for job in jobs])
+            await JobTextStore(db).save_many(user_id, [(job["job_id"], split_text(job)[1]) for job in jobs])
+        job_ids[token] = [job["job_id"] for job in jobs]
+        tasks = [{
+            "task_id": f"task_b{u:05d}{i:06d}",
+            "user_id": user_id,
+            "date": today,
+            "task_type": random.choice(["application", "networking", "skills"]),
+            "job_id": None,
+            "description": f"Benchmark task {i}",
+            "completed": i % 3 == 0,
+            "created_at": now.isoformat()
+        } for i in range(tasks_per_user)]
+        if tasks:
+            await db.daily_tasks.insert_many(tasks)
+        reminders = [{
+            "reminder_id": f"reminder_b{u:05d}{i:06d}",
+            "user_id": user_id,
+            "job_id": job_ids[token][i % len(job_ids[token])] if job_ids[token] else "job_none",
+            "reminder_date": (now + timedelta(hours=i)).isoformat(),
+            "message": f"Follow up {i}",
+            "completed": False,
+            "created_at": now.isoformat()
+        } for i in range(reminders_per_user)]
+        if reminders:
+            await db.reminders.insert_many(reminders)
+        await db.daily_goals.insert_one({
+            "goal_id": f"goal_bench{u:06d}",
+            "user_id": user_id,
+            "applications_per_day": 3,
+            "networking_per_day": 2,
+            "skills_per_day": 2,
+            "updated_at": now.isoformat()
+        })
+        sessions.append(token)
+    await db.user_sessions.create_index("session_token")
+    await db.users.create_index("user_id")
+    await db.jobs.create_index([("user_id", 1), ("job_id", 1)])
+    return sessions, job_ids
+
+
+class Scenarios:
+    def __init__(self, client, job_ids, search_pool):
+        self.client = client
+        self.job_ids = job_ids
+        self.search_pool = search_pool
+        self.today = datetime.now(timezone.utc).date().isoformat()
+
+    def _auth(self, token):
+        return {"Cookie": f"session_token={token}"}
+
+    async def dashboard(self, token):
+        headers = self._auth(token)
+        responses = await asyncio.gather(
+            self.client.get("/api/goals", headers=headers),
+            self.client.get("/api/tasks", params={"date": self.today}, headers=headers),
+            self.client.get("/api/reminders", headers=headers),
+            self.client.get("/api/jobs", headers=headers),
+        )
+        return all(r.status_code == 200 for r in responses)
+
+    async def dashboard_batch(self, token):
+        # The same four reads as `dashboard`, in one request
+        response = await self.client.post("/api/batch", json={"requests": [
+            {"path": "/goals"},
+            {"path": "/tasks", "params": {"date": self.today}},
+            {"path": "/reminders"},
+            {"path": "/jobs"},
+        ]}, headers=self._auth(token))
+        return response.status_code == 200 and all(r["status"] == 200 for r in response.json()["results"].values())
+
+    async def inbox_scroll(self, token):
+        response = await self.client.get("/api/jobs", headers=self._auth(token))
+        return response.status_code == 200
+
+    async def job_detail(self, token):
+        job_id = random.choice(self.job_ids[token])
+        response = await self.client.get(f"/api/jobs/{job_id}", headers=self._auth(token))
+        return response.status_code == 200
+
+    async def update_job(self, token):
+        job_id = random.choice(self.job_ids[token])
+        status = random.choice(["saved", "applied", "interview"])
+        response = await self.client.patch(f"/api/jobs/{job_id}", json={"status": status}, headers=self._auth(token))
+        return response.status_code == 200
+
+    async def bulk_save(self, token):
+        batch = random.sample(self.search_pool, 20)
+        payload = [{k: job[k] for k in ("title", "company", "location", "job_url", "source", "description")} for job in batch]
+        response = await self.client.post("/api/jobs/bulk-save", json=payload, headers=self._auth(token))
+        return response.status_code == 200
+
+    async def search(self, token):
+        response = await self.client.post(
+            "/api/jobs/search",
+            json={"query": random.choice(["python", "react", "engineer"]), "max_results": 20},
+            headers=self._auth(token)
+        )
+        return response.status_code == 200
+
+
+def stub_scrapers(scraper, pool, latency):
+    """
+    Replace network fetches with fixture results so the search path runs offline
+    """
+    postings = [JobPosting.from_dict(job) for job in pool[:2000]]
+
+    async def fake_source(query, *args):
+        await asyncio.sleep(latency)
+        query_lower = query.lower()
+        return [job for job in postings if query_lower in job.title.lower()][:7]
+
+    scraper.scrape_remoteok = fake_source
+    scraper.scrape_weworkremotely = fake_source
+    scraper.scrape_indeed = fake_source
+
+
+async def run(args):
+    import httpx
+    import server
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo_client = AsyncIOMotorClient(args.mongo_url)
+        await mongo_client.drop_database(args.db_name)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient()
+    db = mongo_client[args.db_name]
+    server.bind_database(db)
+
+    StubLlmChat.latency = args.llm_latency
+    server.llm_client.chat_factory = StubLlmChat
+    search_pool = scraped_jobs(5000)
+    job_scraper = await server.get_job_scraper()
+    stub_scrapers(job_scraper, search_pool, args.scraper_latency)
+
+    random.seed(args.seed)
+    seed_start = time.perf_counter()
+    sessions, job_ids = await seed(db, args.users, args.jobs_per_user, args.tasks_per_user, args.reminders_per_user)
+    seed_seconds = time.perf_counter() - seed_start
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        scenarios = Scenarios(client, job_ids, search_pool)
+        weights = MIXES[args.mix]
+        names = list(weights)
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        counter = iter(range(args.requests))
+
+        async def worker():
+            for _ in counter:
+                name = random.choices(names, weights=[weights[n] for n in names])[0]
+                token = random.choice(sessions)
+                start = time.perf_counter()
+                try:
+                    ok = await getattr(scenarios, name)(token)
+                except Exception:
+                    ok = False
+                latencies[name].append(time.perf_counter() - start)
+                if not ok:
+                    errors[name] += 1
+
+        # Warm up caches and lazily-built state before measuring
+        for name in names:
+            await getattr(scenarios, name)(sessions[0])
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - wall_start
+    await job_scraper.close()
+
+    report = {
+        "revision": git_revision(),
+        "backend": "mongod" if args.mongo_url else "mongomock",
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seed_seconds": round(seed_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(args.requests / wall, 1),
+        "scenarios": {},
+    }
+    for name in names:
+        values = sorted(latencies[name])
+        report["scenarios"][name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / wall, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2) if values else None,
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2) if values else None,
+        }
+    if args.mongo_url:
+        await mongo_client.drop_database(args.db_name)
+    return report
+
+
+def compare(report, baseline):
+    """
+    Per-scenario relative change against a previous report (positive = slower)
+    """
+    deltas = {}
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        deltas[name] = {
+            key: round((current[key] - previous[key]) / previous[key] * 100, 1)
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+            if current.get(key) and previous.get(key)
+        }
+    return {"baseline_revision": baseline.get("revision"), "percent_change": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="realistic")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--jobs-per-user", type=int, default=200)
+    parser.add_argument("--tasks-per-user", type=int, default=10)
+    parser.add_argument("--reminders-per-user", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--scraper-latency", type=float, default=0.0)
+    parser.add_argument("--mongo-url", help="Use a real mongod instead of mongomock-motor")
+    parser.add_argument("--db-name", default="jobflow_benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
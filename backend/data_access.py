@@ -0,0 +1,144 @@
+import os
+from contextvars import ContextVar
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Depends
+from pymongo.errors import ExecutionTimeout, NetworkTimeout, WaitQueueTimeoutError
+from pymongo.read_preferences import SecondaryPreferred
+
+# Raised when a read hits its deadline or no pooled connection frees up in time; served as 503
+QUERY_TIMEOUT_ERRORS = (ExecutionTimeout, NetworkTimeout, WaitQueueTimeoutError)
+
+
+class QueryPolicy(NamedTuple):
+    # Server-side deadline for each read (0 = none)
+    max_time_ms: int
+    # Lists and analytics tolerate replication lag, so they may be served by a secondary
+    secondary_reads: bool = False
+
+
+SECONDARY_READS_ENABLED = os.environ.get('MONGO_SECONDARY_READS', 'true').lower() == 'true'
+# -1 = any secondary; otherwise at least 90
+MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '-1'))
+# Read-your-writes state: a session written at login is looked up on the very next request
+PRIMARY_ONLY_COLLECTIONS = {"users", "user_sessions"}
+
+QUERY_POLICIES: Dict[str, QueryPolicy] = {
+    "default": QueryPolicy(int(os.environ.get('QUERY_TIMEOUT_MS', '2000'))),
+    "list": QueryPolicy(int(os.environ.get('LIST_QUERY_TIMEOUT_MS', '3000')), secondary_reads=True),
+    "analytics": QueryPolicy(int(os.environ.get('ANALYTICS_QUERY_TIMEOUT_MS', '5000')), secondary_reads=True),
+    # Streams the whole account; the deadline would cover every getMore of the export
+    "export": QueryPolicy(0, secondary_reads=True),
+    # Dedupe reads run between written chunks; timing out there would fail an import that is already partly applied
+    "import": QueryPolicy(0),
+}
+
+# Set per request by the route's policy dependency; background work runs without one
+current_policy: ContextVar[Optional[QueryPolicy]] = ContextVar("current_policy", default=None)
+
+
+def query_policy(name: str):
+    """
+    Route dependency applying a named policy to every read made while handling the request
+    """
+    policy = QUERY_POLICIES[name]
+
+    async def apply_query_policy():
+        current_policy.set(policy)
+
+    return Depends(apply_query_policy)
+
+
+def mongo_client_options(max_pool_size: int) -> Dict:
+    """
+    Connection pool settings for one worker's MongoClient
+    """
+    return {
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": min(int(os.environ.get('MONGO_MIN_POOL_SIZE', '2')), max_pool_size),
+        "maxIdleTimeMS": int(os.environ.get('MONGO_MAX_IDLE_MS', '60000')),
+        # A request waiting this long for a free connection fails fast instead of queueing
+        "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    }
+
+
+class Collection:
+    """
+    A Motor collection whose reads follow the current query policy.
+
+    find, find_one, aggregate and count_documents get the policy's maxTimeMS
+    (unless the caller passes one). Only the list-shaped reads (find,
+    aggregate, count_documents) go to a secondary when the policy allows it:
+    find_one serves auth lookups and read-before-write checks, which must see
+    the latest write, so it always reads the primary, as do all reads of
+    PRIMARY_ONLY_COLLECTIONS. Everything else, including all writes, goes to
+    the primary collection unchanged.
+    """
+
+    def __init__(self, database, name: str):
+        self._database = database
+        self._name = name
+        self._primary = database[name]
+        self._secondary = None
+        self._secondary_allowed = name not in PRIMARY_ONLY_COLLECTIONS
+
+    def __getattr__(self, attr):
+        return getattr(self._primary, attr)
+
+    def _reader(self, policy: Optional[QueryPolicy]):
+        if policy is None or not policy.secondary_reads or not SECONDARY_READS_ENABLED or not self._secondary_allowed:
+            return self._primary
+        if self._secondary is None:
+            read_preference = SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS)
+            self._secondary = self._database.get_collection(self._name, read_preference=read_preference)
+        return self._secondary
+
+    def find(self, *args, **kwargs):
+        policy = current_policy.get()
+        cursor = self._reader(policy).find(*args, **kwargs)
+        if policy is not None and policy.max_time_ms and "max_time_ms" not in kwargs:
+            cursor = cursor.max_time_ms(policy.max_time_ms)
+        return cursor
+
+    def find_one(self, *args, **kwargs):
+        policy = current_policy.get()
+        if policy is not None and policy.max_time_ms:
+            kwargs.setdefault("max_time_ms", policy.max_time_ms)
+        return self._primary.find_one(*args, **kwargs)
+
+    def aggregate(self, pipeline, **kwargs):
+        policy = current_policy.get()
+        if policy is not None and policy.max_time_ms:
+            kwargs.setdefault("maxTimeMS", policy.max_time_ms)
+        return self._reader(policy).aggregate(pipeline, **kwargs)
+
+    def count_documents(self, filter, **kwargs):
+        policy = current_policy.get()
+        if policy is not None and policy.max_time_ms:
+            kwargs.setdefault("maxTimeMS", policy.max_time_ms)
+        return self._reader(policy).count_documents(filter, **kwargs)
+
+
+class Database:
+    """
+    The data-access layer handed to handlers and services in place of the Motor database
+    """
+
+    def __init__(self, database):
+        self.motor = database
+        self._collections: Dict[str, Collection] = {}
+
+    def __getitem__(self, name: str) -> Collection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = Collection(self.motor, name)
+        return collection
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if getattr(type(self.motor), name, None) is not None:
+            # Database methods and properties (command, watch, name, client, ...)
+            return getattr(self.motor, name)
+        return self[name]
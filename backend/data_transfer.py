@@ -0,0 +1,303 @@
+import codecs
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import InsertOne
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from job_text import JobTextStore, split_text
+
+# Export name -> (collection, record type, id field)
+COLLECTIONS = {
+    "jobs": ("jobs", "job", "job_id"),
+    "tasks": ("daily_tasks", "task", "task_id"),
+    "reminders": ("reminders", "reminder", "reminder_id"),
+    "goals": ("daily_goals", "goals", "goal_id"),
+}
+RECORD_TYPES = {record_type: name for name, (_, record_type, _) in COLLECTIONS.items()}
+
+CSV_COLUMNS = {
+    "jobs": [
+        "job_id", "title", "company", "location", "job_url", "source", "status", "date_added", "applied_date",
+        "interview_date", "salary_range", "resume_version", "contact_person", "notes", "tags", "description",
+        "cover_letter", "ai_match_score", "ai_keywords", "ai_summary"
+    ],
+    "tasks": ["task_id", "date", "task_type", "job_id", "description", "completed", "created_at"],
+    "reminders": ["reminder_id", "job_id", "reminder_date", "message", "completed", "created_at"],
+    "goals": ["goal_id", "applications_per_day", "networking_per_day", "skills_per_day", "updated_at"],
+}
+LIST_SEPARATOR = " | "
+LIST_FIELDS = {"tags", "ai_keywords", "ai_summary"}
+BOOL_FIELDS = {"completed"}
+INT_FIELDS = {"ai_match_score", "applications_per_day", "networking_per_day", "skills_per_day"}
+
+EXPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 50
+
+
+async def export_ndjson(db, user_id: str, names: List[str]) -> AsyncIterator[str]:
+    """
+    One {"type", "data"} line per document, read straight off the cursors
+    """
+    for name in names:
+        collection, record_type, _ = COLLECTIONS[name]
+        async for docs in _export_batches(db, user_id, name, {"_id": 0, "user_id": 0}):
+            yield "".join(json.dumps({"type": record_type, "data": doc}, default=str) + "\n" for doc in docs)
+
+
+async def _export_batches(db, user_id: str, name: str, projection: Dict) -> AsyncIterator[List[Dict]]:
+    """
+    A user's documents in batches; job batches get their texts from the side collection
+    """
+    collection = COLLECTIONS[name][0]
+    texts = JobTextStore(db) if name == "jobs" else None
+    batch = []
+    async for doc in db[collection].find({"user_id": user_id}, projection).batch_size(EXPORT_BATCH_SIZE):
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield await texts.attach(user_id, batch) if texts else batch
+            batch = []
+    if batch:
+        yield await texts.attach(user_id, batch) if texts else batch
+
+
+async def export_csv(db, user_id: str, name: str) -> AsyncIterator[str]:
+    columns = CSV_COLUMNS[name]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    projection = {"_id": 0, **{column: 1 for column in columns}}
+    async for docs in _export_batches(db, user_id, name, projection):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(doc.get(column)) for column in columns] for doc in docs)
+        yield buffer.getvalue()
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    return value
+
+
+def _from_csv(column: str, value: str) -> Any:
+    if value == "":
+        return None
+    if column in LIST_FIELDS:
+        return [item.strip() for item in value.split(LIST_SEPARATOR.strip()) if item.strip()]
+    if column in BOOL_FIELDS:
+        return value.strip().lower() in ("true", "1", "yes")
+    if column in INT_FIELDS:
+        return int(float(value))
+    return value
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into text lines without holding more than one partial line
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[str], Any]]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None, "Invalid JSON"
+            continue
+        if not isinstance(item, dict) or item.get("type") not in RECORD_TYPES or not isinstance(item.get("data"), dict):
+            yield line_number, None, "Expected {\"type\": ..., \"data\": {...}}"
+            continue
+        yield line_number, item["type"], item["data"]
+
+
+async def iter_csv_records(lines: AsyncIterator[str], name: str) -> AsyncIterator[Tuple[int, Optional[str], Any]]:
+    """
+    Rows of a CSV export; a quoted field may span lines, so a record ends at a line with balanced quotes
+    """
+    record_type = COLLECTIONS[name][1]
+    header = None
+    record_lines: List[str] = []
+    line_number = start_line = 0
+    async for line in lines:
+        line_number += 1
+        if not record_lines:
+            start_line = line_number
+        record_lines.append(line)
+        record = "\n".join(record_lines)
+        if record.count('"') % 2:
+            continue
+        record_lines = []
+        if not record.strip():
+            continue
+        row = next(csv.reader([record]))
+        if header is None:
+            header = [column.strip() for column in row]
+            continue
+        try:
+            yield start_line, record_type, {column: _from_csv(column, value) for column, value in zip(header, row) if column}
+        except ValueError as e:
+            yield start_line, None, str(e)
+    if record_lines:
+        yield start_line, None, "Unterminated quoted field"
+
+
+class DataImporter:
+    """
+    Writes a stream of exported records for one user in chunked bulk_writes.
+
+    Records are validated by per-type normalizers, deduplicated against the
+    user's existing data (by id, and jobs also by job_url) and against earlier
+    records of the same import. An id that already belongs to another user is
+    replaced by one derived from it and the importing user, so importing the
+    same file twice still deduplicates; references to re-keyed jobs from later
+    tasks and reminders are rewritten. Goals are upserted, since a user has a single goals document.
+    """
+
+    def __init__(self, db, user_id: str, normalizers: Dict[str, Callable[[Dict, str], Dict]], chunk_size: int = 500):
+        self.db = db
+        self.user_id = user_id
+        self.normalizers = normalizers
+        self.chunk_size = chunk_size
+        self.imported = {name: 0 for name in COLLECTIONS}
+        self.skipped = {name: 0 for name in COLLECTIONS}
+        self.errors: List[Dict] = []
+        self.error_count = 0
+        self._pending: Dict[str, List[Dict]] = {name: [] for name in COLLECTIONS}
+        self._seen_ids: Dict[str, Set[str]] = {name: set() for name in COLLECTIONS}
+        self._seen_urls: Set[str] = set()
+        self._id_map: Dict[str, str] = {}
+        self.on_jobs_inserted: Optional[Callable[[List[Dict]], Any]] = None
+
+    def _error(self, line_number: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    async def run(self, records: AsyncIterator[Tuple[int, Optional[str], Any]]) -> Dict:
+        async for line_number, record_type, data in records:
+            if record_type is None:
+                self._error(line_number, data)
+                continue
+            name = RECORD_TYPES[record_type]
+            if name != "jobs" and self._pending["jobs"]:
+                # Jobs are written first so references to re-keyed jobs can be rewritten
+                await self._flush("jobs")
+            if "job_id" in data and data["job_id"] in self._id_map:
+                data = {**data, "job_id": self._id_map[data["job_id"]]}
+            try:
+                document = self.normalizers[record_type](data, self.user_id)
+            except ValidationError as e:
+                problems = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+                self._error(line_number, f"Invalid {record_type}: {problems}")
+                continue
+            except Exception as e:
+                self._error(line_number, f"Invalid {record_type}: {str(e)}")
+                continue
+            self._pending[name].append(document)
+            if len(self._pending[name]) >= self.chunk_size:
+                await self._flush(name)
+        for name in COLLECTIONS:
+            await self._flush(name)
+        return {"imported": self.imported, "skipped": self.skipped, "error_count": self.error_count, "errors": self.errors}
+
+    def _rekey(self, doc_id: str) -> str:
+        digest = hashlib.sha1(f"{self.user_id}:{doc_id}".encode()).hexdigest()[:12]
+        return f"{doc_id.split('_', 1)[0]}_{digest}"
+
+    async def _flush(self, name: str):
+        documents = self._pending[name]
+        if not documents:
+            return
+        self._pending[name] = []
+        collection, _, id_field = COLLECTIONS[name]
+
+        if name == "goals":
+            goals = {k: v for k, v in documents[-1].items() if k not in ("goal_id", "user_id")}
+            await self.db[collection].update_one(
+                {"user_id": self.user_id},
+                {"$set": goals, "$setOnInsert": {"goal_id": documents[-1]["goal_id"]}},
+                upsert=True
+            )
+            self.imported[name] += 1
+            self.skipped[name] += len(documents) - 1
+            return
+
+        ids = [doc[id_field] for doc in documents]
+        ids += [self._rekey(doc_id) for doc_id in ids]
+        existing = {}
+        async for doc in self.db[collection].find({id_field: {"$in": ids}}, {"_id": 0, id_field: 1, "user_id": 1}):
+            existing[doc[id_field]] = doc["user_id"]
+        existing_urls = set()
+        if name == "jobs":
+            urls = [doc["job_url"] for doc in documents if doc.get("job_url")]
+            if urls:
+                async for doc in self.db.jobs.find({"user_id": self.user_id, "job_url": {"$in": urls}}, {"_id": 0, "job_url": 1}):
+                    existing_urls.add(doc["job_url"])
+
+        inserts = []
+        for doc in documents:
+            doc_id = doc[id_field]
+            url = doc.get("job_url") if name == "jobs" else None
+            if doc_id in existing and existing[doc_id] != self.user_id:
+                original_id, doc_id = doc_id, self._rekey(doc_id)
+                doc[id_field] = doc_id
+                if name == "jobs":
+                    self._id_map[original_id] = doc_id
+            if existing.get(doc_id) == self.user_id or doc_id in self._seen_ids[name] or (url and (url in existing_urls or url in self._seen_urls)):
+                self.skipped[name] += 1
+                continue
+            self._seen_ids[name].add(doc[id_field])
+            if url:
+                self._seen_urls.add(url)
+            inserts.append(doc)
+
+        if not inserts:
+            return
+        rows = inserts
+        if name == "jobs":
+            # Texts first, so a reader that sees the job also finds its description
+            rows = [split_text(doc)[0] for doc in inserts]
+            await JobTextStore(self.db).save_many(self.user_id, [(doc["job_id"], split_text(doc)[1]) for doc in inserts])
+        try:
+            await self.db[collection].bulk_write([InsertOne(row) for row in rows], ordered=False)
+            inserted = len(inserts)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            self.skipped[name] += len(inserts) - inserted
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            if name == "jobs":
+                await JobTextStore(self.db).delete([doc["job_id"] for i, doc in enumerate(inserts) if i in failed])
+            inserts = [doc for i, doc in enumerate(inserts) if i not in failed]
+        self.imported[name] += inserted
+        if name == "jobs" and self.on_jobs_inserted:
+            self.on_jobs_inserted(inserts)
+
+
+def stored_document(model) -> Dict:
+    """
+    A model as the API stores it: datetimes as ISO strings
+    """
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in model.model_dump().items()}
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """
+    In-process pub/sub keyed by user_id.
+
+    Each connected client owns a bounded queue; when a slow client's queue is
+    full the oldest event is dropped so publishers never block. Listeners are
+    called synchronously with every event, for in-process state that has to
+    follow all users' writes.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listeners: List[Callable[[str, str, Optional[Dict[str, Any]]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, str, Optional[Dict[str, Any]]], None]):
+        self._listeners.append(listener)
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def notify(self, user_id: str, event_type: str, data: Optional[Dict[str, Any]] = None):
+        """
+        Call the listeners only; for events that are internal to the server
+        """
+        for listener in self._listeners:
+            try:
+                listener(user_id, event_type, data)
+            except Exception as e:
+                logger.error(f"Event listener failed on {event_type}: {str(e)}")
+
+    def publish(self, user_id: str, event_type: str, data: Optional[Dict[str, Any]] = None):
+        self.notify(user_id, event_type, data)
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        event = {
+            "type": event_type,
+            "data": data or {},
+            "published_at": datetime.now(timezone.utc).isoformat()
+        }
+        for queue in list(queues):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                logger.debug(f"Dropped oldest event for slow subscriber of {user_id}")
+            queue.put_nowait(event)
+
+
+class ChangeStreamRelay:
+    """
+    Feeds the event bus from MongoDB change streams instead of from the API handlers.
+
+    Every worker watches the collections itself, so a client connected to one
+    worker also sees writes made through another. Requires a replica set;
+    delete events need pre-images enabled on the collection
+    (changeStreamPreAndPostImages) to know which user to notify. Writes to
+    `job_texts` reach listeners only, as `job.text_updated` with the job_id,
+    since job events carry no texts.
+    """
+
+    COLLECTIONS = {
+        "jobs": "job",
+        "daily_tasks": "task",
+        "reminders": "reminder",
+        "daily_goals": "goals",
+    }
+    OPERATIONS = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+
+    def __init__(self, db, bus: EventBus, retry_delay: float = 5.0):
+        self.db = db
+        self.bus = bus
+        self.retry_delay = retry_delay
+        self._tasks = []
+
+    async def start(self):
+        hello = await self.db.command("hello")
+        # Change streams exist on replica sets and sharded clusters only; a standalone server would fail every watch
+        if not hello.get("setName") and hello.get("msg") != "isdbgrid":
+            raise RuntimeError("EVENT_SOURCE=changestream needs MongoDB running as a replica set or sharded cluster")
+        for collection, prefix in self.COLLECTIONS.items():
+            self._tasks.append(asyncio.create_task(self._watch(collection, partial(self._dispatch, prefix))))
+        self._tasks.append(asyncio.create_task(self._watch("job_texts", self._dispatch_text)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _watch(self, collection: str, dispatch: Callable[[Dict[str, Any]], None]):
+        resume_token = None
+        while True:
+            try:
+                async with self.db[collection].watch(
+                    full_document="updateLookup",
+                    full_document_before_change="whenAvailable",
+                    resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change stream error on {collection}: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+
+    def _dispatch(self, prefix: str, change: Dict[str, Any]):
+        action = self.OPERATIONS.get(change.get("operationType"))
+        if not action:
+            return
+        document = change.get("fullDocument") or change.get("fullDocumentBeforeChange")
+        if not document or "user_id" not in document:
+            logger.debug(f"Skipping {prefix}.{action} change without a user_id")
+            return
+        document = {k: v for k, v in document.items() if k != "_id"}
+        user_id = document["user_id"]
+
+        if prefix == "goals":
+            self.bus.publish(user_id, "goals.updated", document)
+            return
+        self.bus.publish(user_id, f"{prefix}.{action}", document)
+
+        updated_fields = (change.get("updateDescription") or {}).get("updatedFields") or {}
+        if prefix == "reminder" and updated_fields.get("notified_at"):
+            self.bus.publish(user_id, "reminder.due", document)
+
+    def _dispatch_text(self, change: Dict[str, Any]):
+        if self.OPERATIONS.get(change.get("operationType")) not in ("created", "updated"):
+            return
+        document = change.get("fullDocument") or {}
+        if "job_id" in document and "user_id" in document:
+            self.bus.notify(document["user_id"], "job.text_updated", {"job_id": document["job_id"]})
+
+
+# Create singleton instance
+event_bus = EventBus()
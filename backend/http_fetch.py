@@ -0,0 +1,422 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Statuses a cache may store without explicit freshness information (RFC 7234 4.2.2)
+CACHEABLE_STATUSES = {200, 203, 204, 300, 301, 404, 405, 410, 414, 501}
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_SECONDS = 24 * 3600
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class FixtureMissing(Exception):
+    """
+    Raised in replay mode for a request that has no recorded response
+    """
+
+
+class ResponseTooLarge(Exception):
+    """
+    Raised when a response body exceeds the caller's max_bytes
+    """
+
+
+class TooManyRedirects(Exception):
+    pass
+
+
+class FetchResponse:
+    __slots__ = ("url", "status", "headers", "body", "from_cache")
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, from_cache: str = ""):
+        self.url = url
+        self.status = status
+        # Lower-cased names; repeated headers are joined with ", "
+        self.headers = headers
+        self.body = body
+        # "", "hit", "revalidated" or "replay"
+        self.from_cache = from_cache
+
+    def text(self) -> str:
+        charset = "utf-8"
+        for part in self.headers.get("content-type", "").split(";")[1:]:
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "charset" and value:
+                charset = value.strip('"')
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def request_url(url: str, params: Optional[Dict] = None) -> str:
+    if not params:
+        return url
+    separator = "&" if urlsplit(url).query else "?"
+    return f"{url}{separator}{urlencode(sorted(params.items()))}"
+
+
+async def read_body(response, max_bytes: Optional[int] = None) -> bytes:
+    """
+    The body of an aiohttp response, aborting as soon as it grows past max_bytes
+    """
+    if max_bytes is None:
+        return await response.read()
+    length = response.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise ResponseTooLarge(f"Response of {length} bytes exceeds {max_bytes}")
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def request_key(method: str, url: str) -> str:
+    return hashlib.sha256(f"{method.upper()} {url}".encode()).hexdigest()
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(int(value), 0) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], heuristic_ttl: float = 0) -> float:
+    """
+    How long a stored response stays fresh, from s-maxage, max-age, Expires or the Last-Modified heuristic
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    for name in ("s-maxage", "max-age"):
+        seconds = _seconds(directives.get(name))
+        if seconds is not None:
+            return seconds
+    if "expires" in headers:
+        expires = _http_date(headers["expires"])
+        date = _http_date(headers.get("date")) or time.time()
+        # An invalid Expires (e.g. "0") means already expired
+        return max(expires - date, 0) if expires is not None else 0
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        date = _http_date(headers.get("date")) or time.time()
+        return min(max(date - last_modified, 0) * HEURISTIC_FRACTION, HEURISTIC_MAX_SECONDS)
+    return heuristic_ttl
+
+
+def is_storable(status: int, headers: Dict[str, str]) -> bool:
+    """
+    Whether a shared cache may store the response (RFC 7234 3)
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives or "private" in directives or headers.get("vary", "").strip() == "*":
+        return False
+    if status in CACHEABLE_STATUSES:
+        return True
+    return any(name in directives for name in ("max-age", "s-maxage", "public")) or "expires" in headers
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache following RFC 7234 for a shared cache.
+
+    Entries are one file per request key: a JSON header line (status,
+    headers, request headers named by Vary, when it was stored) followed by
+    the body. Fresh entries are served directly; stale ones with an ETag or
+    Last-Modified are revalidated with a conditional request, and a 304
+    refreshes the stored headers. Writes go through a temp file and rename,
+    so several workers can share the directory. The oldest entries are
+    evicted once the directory exceeds max_bytes. Fetches store from
+    `asyncio.to_thread` workers, so the size bookkeeping is under a lock.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024, heuristic_ttl: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.heuristic_ttl = heuristic_ttl
+        self._sizes: Optional[Dict[str, int]] = None
+        self._sizes_lock = threading.Lock()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def load(self, key: str) -> Optional[Tuple[Dict, bytes]]:
+        try:
+            with open(self._file(key), "rb") as f:
+                meta = json.loads(f.readline())
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, status: int, headers: Dict[str, str], body: bytes, request_headers: Dict[str, str]):
+        vary = {
+            name.strip().lower(): request_headers.get(name.strip().lower(), "")
+            for name in headers.get("vary", "").split(",") if name.strip()
+        }
+        meta = {"status": status, "headers": headers, "vary": vary, "stored_at": time.time()}
+        file = self._file(key)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        temp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        header = json.dumps(meta).encode() + b"\n"
+        with open(temp, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(temp, file)
+        # Not os.path.getsize: another thread may already have evicted the file
+        self._track(key, len(header) + len(body))
+
+    def refresh(self, key: str, meta: Dict, body: bytes, headers: Dict[str, str], request_headers: Dict[str, str]):
+        """
+        Apply the headers of a 304 to a stored entry (RFC 7234 4.3.4)
+        """
+        merged = {**meta["headers"], **{k: v for k, v in headers.items() if k not in ("content-length", "content-encoding")}}
+        self.store(key, meta["status"], merged, body, request_headers)
+
+    def current_age(self, meta: Dict) -> float:
+        headers = meta["headers"]
+        date = _http_date(headers.get("date")) or meta["stored_at"]
+        initial_age = max(meta["stored_at"] - date, _seconds(headers.get("age")) or 0, 0)
+        return initial_age + time.time() - meta["stored_at"]
+
+    def is_fresh(self, meta: Dict) -> bool:
+        directives = parse_cache_control(meta["headers"].get("cache-control", ""))
+        if "no-cache" in directives:
+            return False
+        return self.current_age(meta) < freshness_lifetime(meta["headers"], self.heuristic_ttl)
+
+    def _track(self, key: str, size: int):
+        with self._sizes_lock:
+            self._track_locked(key, size)
+
+    def _track_locked(self, key: str, size: int):
+        if self._sizes is None:
+            self._sizes = {}
+            for root, _, files in os.walk(self.path):
+                for name in files:
+                    if not name.endswith(".tmp"):
+                        try:
+                            self._sizes[name] = os.path.getsize(os.path.join(root, name))
+                        except OSError:
+                            pass
+        self._sizes[key] = size
+        if sum(self._sizes.values()) > self.max_bytes:
+            self._evict()
+
+    def _mtime(self, key: str) -> float:
+        try:
+            return os.path.getmtime(self._file(key))
+        except OSError:
+            return 0
+
+    def _evict(self):
+        by_age = sorted(self._sizes, key=self._mtime)
+        total = sum(self._sizes.values())
+        for key in by_age:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+            total -= self._sizes.pop(key)
+
+
+class FixtureStore:
+    """
+    Recorded responses, one readable JSON file per request, for offline replay
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, url: str, key: str) -> str:
+        host = urlsplit(url).hostname or "unknown"
+        return os.path.join(self.path, f"{host}-{key[:16]}.json")
+
+    def save(self, url: str, key: str, status: int, headers: Dict[str, str], body: bytes):
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            content = {"body": body.decode("utf-8")}
+        except UnicodeDecodeError:
+            content = {"body_base64": base64.b64encode(body).decode()}
+        with open(self._file(url, key), "w", encoding="utf-8") as f:
+            json.dump({"url": url, "status": status, "headers": headers, **content}, f, indent=1, ensure_ascii=False)
+
+    def load(self, url: str, key: str) -> FetchResponse:
+        try:
+            with open(self._file(url, key), encoding="utf-8") as f:
+                fixture = json.load(f)
+        except OSError:
+            raise FixtureMissing(f"No recorded response for GET {url}")
+        body = base64.b64decode(fixture["body_base64"]) if "body_base64" in fixture else fixture["body"].encode("utf-8")
+        return FetchResponse(url, fixture["status"], fixture["headers"], body, from_cache="replay")
+
+
+class HttpFetcher:
+    """
+    The GET layer under every scraper.
+
+    Modes: "live" fetches from the network through the response cache (when
+    a cache is configured); "record" always fetches and saves each response
+    as a fixture; "replay" serves fixtures only and never opens a connection,
+    so the whole scraping pipeline runs deterministically offline.
+
+    Redirects are followed here, one request (and one cache entry or
+    fixture) per hop, rather than inside aiohttp, so the session factory
+    sees every URL before a connection is made to it.
+    """
+
+    MODES = ("live", "record", "replay")
+
+    def __init__(self, mode: str = "live", cache: Optional[ResponseCache] = None, fixtures: Optional[FixtureStore] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.MODES)}")
+        if mode != "live" and fixtures is None:
+            raise ValueError(f"{mode} mode needs a fixtures directory")
+        self.mode = mode
+        self.cache = cache
+        self.fixtures = fixtures
+
+    async def get(
+        self,
+        session_factory: Callable,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10,
+        max_bytes: Optional[int] = None,
+        max_redirects: int = 10
+    ) -> FetchResponse:
+        """
+        GET a URL, following redirects. `session_factory(url)` is an async context manager yielding an
+        aiohttp session for that URL, entered only for network requests; it may raise to refuse the URL.
+        Raises ResponseTooLarge when a body exceeds max_bytes and TooManyRedirects.
+        """
+        full_url = request_url(url, params)
+        for _ in range(max_redirects + 1):
+            response = await self._get_one(session_factory, full_url, headers, timeout, max_bytes)
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            full_url = urljoin(full_url, location)
+        raise TooManyRedirects(f"More than {max_redirects} redirects from {url}")
+
+    async def _get_one(
+        self,
+        session_factory: Callable,
+        full_url: str,
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+        max_bytes: Optional[int]
+    ) -> FetchResponse:
+        response = await self._fetch(session_factory, full_url, headers, timeout, max_bytes)
+        # Also covers cache entries and fixtures stored by callers without a limit
+        if max_bytes is not None and len(response.body) > max_bytes:
+            raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes")
+        return response
+
+    async def _fetch(
+        self,
+        session_factory: Callable,
+        full_url: str,
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+        max_bytes: Optional[int]
+    ) -> FetchResponse:
+        key = request_key("GET", full_url)
+        request_headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+        if self.mode == "replay":
+            return await asyncio.to_thread(self.fixtures.load, full_url, key)
+
+        cached = None
+        if self.cache is not None and self.mode == "live":
+            cached = await asyncio.to_thread(self.cache.load, key)
+            if cached and any(request_headers.get(name, "") != value for name, value in cached[0]["vary"].items()):
+                cached = None
+            if cached and self.cache.is_fresh(cached[0]):
+                meta, body = cached
+                return FetchResponse(full_url, meta["status"], meta["headers"], body, from_cache="hit")
+
+        conditional = dict(request_headers)
+        if cached:
+            stored = cached[0]["headers"]
+            if "etag" in stored:
+                conditional["if-none-match"] = stored["etag"]
+            if "last-modified" in stored:
+                conditional["if-modified-since"] = stored["last-modified"]
+
+        async with session_factory(full_url) as session:
+            async with session.get(full_url, headers=conditional, timeout=timeout, allow_redirects=False) as response:
+                body = await read_body(response, max_bytes)
+                status = response.status
+                response_headers = {}
+                for name, value in response.headers.items():
+                    name = name.lower()
+                    response_headers[name] = f"{response_headers[name]}, {value}" if name in response_headers else value
+
+        if status == 304 and cached:
+            meta, cached_body = cached
+            await asyncio.to_thread(self.cache.refresh, key, meta, cached_body, response_headers, request_headers)
+            return FetchResponse(full_url, meta["status"], {**meta["headers"], **response_headers}, cached_body, from_cache="revalidated")
+
+        if self.mode == "record":
+            await asyncio.to_thread(self.fixtures.save, full_url, key, status, response_headers, body)
+        elif self.cache is not None and is_storable(status, response_headers):
+            try:
+                await asyncio.to_thread(self.cache.store, key, status, response_headers, body, request_headers)
+            except OSError as e:
+                logger.warning(f"HTTP cache write failed for {full_url}: {str(e)}")
+        return FetchResponse(full_url, status, response_headers, body)
+
+
+def fetcher_from_env() -> HttpFetcher:
+    """
+    SCRAPER_HTTP_MODE=live|record|replay, SCRAPER_CACHE_ENABLED, SCRAPER_CACHE_DIR, SCRAPER_CACHE_MAX_MB, SCRAPER_FIXTURES_DIR
+    """
+    mode = os.environ.get('SCRAPER_HTTP_MODE', 'live').lower()
+    cache = None
+    if os.environ.get('SCRAPER_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        cache = ResponseCache(
+            os.environ.get('SCRAPER_CACHE_DIR', os.path.join(DATA_DIR, "http_cache")),
+            max_bytes=int(os.environ.get('SCRAPER_CACHE_MAX_MB', '200')) * 1024 * 1024,
+            heuristic_ttl=float(os.environ.get('SCRAPER_CACHE_DEFAULT_TTL_SECONDS', '0'))
+        )
+    fixtures = FixtureStore(os.environ.get('SCRAPER_FIXTURES_DIR', os.path.join(DATA_DIR, "http_fixtures")))
+    return HttpFetcher(mode, cache=cache, fixtures=fixtures)
@@ -0,0 +1,199 @@
+import html
+import json
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from llm_client import count_tokens
+
+DESCRIPTION_TOKEN_BUDGET = 1200
+RESUME_TOKEN_BUDGET = 800
+
+ANALYSIS_SYSTEM_MESSAGE = "You are a career advisor AI. Analyze job descriptions and provide match scores, missing keywords, and tailored summaries. Reply with JSON only."
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "keywords": {"type": "array", "items": {"type": "string"}, "minItems": 5, "maxItems": 8},
+        "summary": {"type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 5}
+    },
+    "required": ["match_score", "keywords", "summary"],
+    "additionalProperties": False
+}
+
+# Paragraphs that rarely say anything about the role itself
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in [
+        r"equal (employment )?opportunity",
+        r"without regard to (race|color|religion)",
+        r"reasonable accommodation",
+        r"e-?verify",
+        r"background check",
+        r"privacy (policy|notice)",
+        r"(we|this site) use[s]? cookies",
+        r"^(apply|click) (now|here)",
+        r"recruit(ment|ing) agencies",
+        r"^share this (job|posting)",
+    ]
+]
+TAG_RE = re.compile(r"<[^>]+>")
+BLOCK_TAG_RE = re.compile(r"<\s*(br|/p|/li|/div|/h\d)\s*/?\s*>", re.IGNORECASE)
+INLINE_SPACE_RE = re.compile(r"[ \t\u00a0]+")
+SENTENCE_END_RE = re.compile(r"[.!?](\s|$)")
+
+
+class AnalysisParseError(ValueError):
+    pass
+
+
+class JobAnalysis(BaseModel):
+    match_score: int = Field(ge=0, le=100)
+    keywords: List[str] = Field(min_length=1)
+    summary: List[str] = Field(min_length=1)
+
+    @field_validator("keywords", "summary")
+    @classmethod
+    def strip_items(cls, items: List[str]) -> List[str]:
+        return [str(item).strip() for item in items if str(item).strip()]
+
+
+def compact_text(text: Optional[str], token_budget: int) -> str:
+    """
+    Strip markup and boilerplate paragraphs, drop repeated lines, then truncate to the token budget
+    """
+    if not text:
+        return ""
+    text = html.unescape(TAG_RE.sub(" ", BLOCK_TAG_RE.sub("\n", text)))
+
+    lines = []
+    seen = set()
+    for raw_line in text.splitlines():
+        line = INLINE_SPACE_RE.sub(" ", raw_line).strip()
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen or any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS):
+            continue
+        seen.add(key)
+        lines.append(line)
+    compacted = "\n".join(lines)
+    return truncate_to_tokens(compacted, token_budget)
+
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    if count_tokens(text) <= token_budget:
+        return text
+    # Binary search on character length, then back off to the last sentence end
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    last_sentence = None
+    for last_sentence in SENTENCE_END_RE.finditer(cut):
+        pass
+    if last_sentence and last_sentence.end() > len(cut) * 0.6:
+        cut = cut[:last_sentence.end()]
+    return cut.rstrip()
+
+
+def build_analysis_prompt(job_description: str, user_resume: Optional[str] = None, resume_is_compact: bool = False) -> str:
+    description = compact_text(job_description, DESCRIPTION_TOKEN_BUDGET)
+    # Stored resumes are compacted once on upload
+    resume = (user_resume or "") if resume_is_compact else compact_text(user_resume, RESUME_TOKEN_BUDGET)
+    resume_block = f"\nCandidate resume:\n{resume}\n" if resume else ""
+    return f"""Analyze this job description. Score 0-100 how well {"the candidate" if resume else "a typical applicant"} fits, list the 5-8 most important skills/keywords, and summarize the role in 3-5 short bullets.
+
+Job description:
+{description}
+{resume_block}
+Reply with a single JSON object matching this JSON schema, and nothing else:
+{json.dumps(ANALYSIS_SCHEMA, separators=(",", ":"))}"""
+
+
+def _extract_json_object(text: str) -> str:
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        raise AnalysisParseError("No JSON object in response")
+    return text[start:end + 1]
+
+
+def _repair_json(candidate: str) -> str:
+    """
+    Fix the mistakes models make most often: trailing commas, smart quotes and single-quoted strings
+    """
+    repaired = candidate.replace("\u201c", '"').replace("\u201d", '"').replace("\u2019", "'")
+    repaired = re.sub(r",\s*([}\]])", r"\1", repaired)
+    if '"' not in repaired:
+        repaired = repaired.replace("'", '"')
+    return repaired
+
+
+def _parse_legacy_format(text: str) -> dict:
+    """
+    The MATCH_SCORE/KEYWORDS/SUMMARY line format the endpoint used to request
+    """
+    data = {"keywords": [], "summary": []}
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        upper = line.upper()
+        if upper.startswith("MATCH_SCORE:"):
+            match = re.search(r"\d+", line)
+            if match:
+                data["match_score"] = int(match.group())
+        elif upper.startswith("KEYWORDS:"):
+            data["keywords"] = [k.strip() for k in line.split(":", 1)[1].split(",")]
+            section = "keywords"
+        elif upper.startswith("SUMMARY:"):
+            section = "summary"
+        elif line.startswith(("-", "*", "\u2022")) and section == "summary":
+            data["summary"].append(line[1:].strip())
+    if "match_score" not in data:
+        raise AnalysisParseError("No match score in response")
+    return data
+
+
+def parse_analysis(text: str) -> JobAnalysis:
+    """
+    Strictly validate the model's JSON reply, repairing it locally before giving up
+    """
+    data = None
+    try:
+        candidate = _extract_json_object(text)
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            data = json.loads(_repair_json(candidate))
+    except (AnalysisParseError, json.JSONDecodeError):
+        data = _parse_legacy_format(text)
+    if not isinstance(data, dict):
+        raise AnalysisParseError("Response is not a JSON object")
+
+    if isinstance(data.get("match_score"), (float, str)):
+        try:
+            data["match_score"] = round(float(data["match_score"]))
+        except ValueError:
+            raise AnalysisParseError("match_score is not a number")
+    if isinstance(data.get("match_score"), int):
+        data["match_score"] = min(max(data["match_score"], 0), 100)
+    if isinstance(data.get("keywords"), str):
+        data["keywords"] = [k.strip() for k in data["keywords"].split(",")]
+
+    try:
+        analysis = JobAnalysis(**{k: data.get(k) for k in ("match_score", "keywords", "summary")})
+    except (ValidationError, TypeError) as e:
+        raise AnalysisParseError(str(e))
+    analysis.keywords = analysis.keywords[:8]
+    analysis.summary = analysis.summary[:5]
+    return analysis
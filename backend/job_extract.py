@@ -0,0 +1,398 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import re
+import socket
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from http_fetch import ResponseTooLarge
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_TTL_SECONDS = int(os.environ.get('JOB_EXTRACT_TTL_SECONDS', str(7 * 24 * 3600)))
+# Failed extractions are remembered briefly, so a broken link is not refetched on every click
+EXTRACT_ERROR_TTL_SECONDS = int(os.environ.get('JOB_EXTRACT_ERROR_TTL_SECONDS', '600'))
+MAX_DESCRIPTION_CHARS = 20000
+MAX_PAGE_BYTES = int(os.environ.get('JOB_EXTRACT_MAX_PAGE_MB', '5')) * 1024 * 1024
+
+# JobCreate fields filled from a page
+FIELDS = ("title", "company", "location", "job_url", "source", "description", "salary_range")
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer", "refid", "trk", "trackingid", "src", "from"}
+# Hosts whose job pages are identified by a few query parameters; everything else in the query is dropped
+ID_PARAMS = {"indeed.com": {"jk", "vjk"}, "linkedin.com": {"currentjobid"}, "glassdoor.com": {"jl"}}
+SOURCES = {
+    "remoteok.com": "RemoteOK",
+    "weworkremotely.com": "We Work Remotely",
+    "indeed.com": "Indeed",
+    "linkedin.com": "LinkedIn",
+    "glassdoor.com": "Glassdoor",
+    "greenhouse.io": "Greenhouse",
+    "lever.co": "Lever",
+}
+# Detail-page selectors per source, tried after JSON-LD
+SOURCE_RULES = {
+    "indeed.com": {
+        "title": ["h1.jobsearch-JobInfoHeader-title", "h2.jobTitle"],
+        "company": ["[data-company-name]", "span.companyName"],
+        "location": ["[data-testid=inlineHeader-companyLocation]", "div.companyLocation"],
+        "description": ["#jobDescriptionText"],
+    },
+    "weworkremotely.com": {
+        "title": ["div.listing-header-container h1", "span.title"],
+        "company": ["div.company-card h2", "span.company"],
+        "description": ["div.listing-container", "div.lis-container__job__content"],
+    },
+    "remoteok.com": {
+        "title": ["td.company h2", "h2[itemprop=title]"],
+        "company": ["td.company h3", "h3[itemprop=name]"],
+        "description": ["div.description", "div.markdown"],
+    },
+    "linkedin.com": {
+        "title": ["h1.top-card-layout__title", "h1"],
+        "company": ["a.topcard__org-name-link", "span.topcard__flavor"],
+        "location": ["span.topcard__flavor--bullet"],
+        "description": ["div.show-more-less-html__markup", "div.description__text"],
+    },
+}
+
+
+class ExtractionError(Exception):
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _site(host: str) -> str:
+    """
+    The registrable part of a host for the lookup tables: "uk.indeed.com" -> "indeed.com"
+    """
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+def canonical_url(url: str) -> str:
+    """
+    One key per posting: lower-cased scheme and host, no fragment, default port, trailing slash or tracking parameters
+    """
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        raise ExtractionError("Only http(s) job URLs are supported", 400)
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[scheme]:
+        host = f"{host}:{parts.port}"
+    keep = ID_PARAMS.get(_site(parts.hostname.lower()))
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if (k.lower() in keep if keep is not None else k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_"))
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+async def ensure_public_host(url: str) -> List[str]:
+    """
+    The addresses an http(s) URL's host resolves to; refuses hosts with any loopback, private or link-local
+    address, so the endpoint cannot probe internal services
+    """
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        raise ExtractionError("Only http(s) job URLs are supported", 400)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, None, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise ExtractionError("Could not resolve the job URL's host", 400)
+    addresses = []
+    for *_, sockaddr in infos:
+        # Scoped IPv6 addresses come back as "fe80::1%eth0"
+        address = sockaddr[0].split("%")[0]
+        if not ipaddress.ip_address(address).is_global:
+            raise ExtractionError("Job URL must point to a public host", 400)
+        if address not in addresses:
+            addresses.append(address)
+    return addresses
+
+
+def public_session(scraper):
+    """
+    A session factory for HttpFetcher that vets every URL it is asked to connect to, including each
+    redirect hop, and connects to the addresses it vetted rather than resolving the host again
+    """
+    @asynccontextmanager
+    async def session(url: str):
+        addresses = await ensure_public_host(url)
+        async with scraper.pinned_session(urlsplit(url).hostname, addresses) as pinned:
+            yield pinned
+
+    return session
+
+
+BLOCK_TAGS = ["p", "div", "li", "br", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "section"]
+
+
+def _html_text(element) -> str:
+    # Line breaks between block elements only, so inline markup does not split sentences
+    for block in element.find_all(BLOCK_TAGS):
+        block.insert_after("\n")
+    return element.get_text()
+
+
+def _text(value: Any) -> Optional[str]:
+    """
+    Plain text of a JSON-LD value or an HTML fragment, whitespace collapsed
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        value = value.get("name")
+        if value is None:
+            return None
+    if isinstance(value, list):
+        value = ", ".join(v for v in (_text(item) for item in value) if v)
+    value = str(value)
+    if "<" in value:
+        from bs4 import BeautifulSoup
+        value = _html_text(BeautifulSoup(value, "html.parser"))
+    value = re.sub(r"[ \t\r\f\v]+", " ", value)
+    value = re.sub(r"\s*\n\s*", "\n", value).strip()
+    return value[:MAX_DESCRIPTION_CHARS] or None
+
+
+def _json_ld_postings(soup) -> List[Dict]:
+    postings = []
+    nodes = {}
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "", strict=False)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                if isinstance(item.get("@id"), str) and len(item) > 1:
+                    nodes[item["@id"]] = item
+                kind = item.get("@type")
+                if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+                    postings.append(item)
+                elif "@graph" in item:
+                    stack.append(item["@graph"])
+    # Sites that publish a @graph often point hiringOrganization and jobLocation at other nodes by @id
+    return [_resolve(posting, nodes) for posting in postings]
+
+
+def _resolve(value: Any, nodes: Dict[str, Dict], depth: int = 3) -> Any:
+    if isinstance(value, list):
+        return [_resolve(item, nodes, depth) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if set(value) == {"@id"}:
+        value = nodes.get(value["@id"], value)
+    if depth == 0:
+        return value
+    return {key: _resolve(item, nodes, depth - 1) for key, item in value.items()}
+
+
+def _location(posting: Dict) -> Optional[str]:
+    if str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        return "Remote"
+    locations = posting.get("jobLocation")
+    places = []
+    for place in locations if isinstance(locations, list) else [locations]:
+        address = place.get("address") if isinstance(place, dict) else None
+        if isinstance(address, dict):
+            country = address.get("addressCountry")
+            parts = [address.get("addressLocality"), address.get("addressRegion"), _text(country)]
+            places.append(", ".join(str(p) for p in parts if p))
+        elif address:
+            places.append(str(address))
+    return "; ".join(p for p in places if p) or None
+
+
+def _salary(posting: Dict) -> Optional[str]:
+    salary = posting.get("baseSalary") or posting.get("estimatedSalary")
+    if isinstance(salary, list):
+        salary = salary[0] if salary else None
+    if not isinstance(salary, dict):
+        return _text(salary)
+    value = salary.get("value", salary)
+    currency = salary.get("currency") or ""
+    if isinstance(value, dict):
+        low, high = value.get("minValue"), value.get("maxValue")
+        amount = value.get("value")
+        unit = value.get("unitText")
+    else:
+        low = high = None
+        amount, unit = value, None
+
+    def number(n):
+        try:
+            return f"{float(n):,.0f}"
+        except (TypeError, ValueError):
+            return str(n)
+
+    if low is not None and high is not None:
+        text = f"{number(low)} - {number(high)}"
+    elif amount is not None or low is not None or high is not None:
+        text = number(next(v for v in (amount, low, high) if v is not None))
+    else:
+        return None
+    text = f"{currency} {text}".strip()
+    return f"{text} / {str(unit).lower()}" if unit else text
+
+
+def _from_json_ld(posting: Dict) -> Dict[str, Optional[str]]:
+    return {
+        "title": _text(posting.get("title")),
+        "company": _text(posting.get("hiringOrganization")),
+        "location": _location(posting),
+        "description": _text(posting.get("description")),
+        "salary_range": _salary(posting),
+    }
+
+
+def _select(soup, selectors: List[str]) -> Optional[str]:
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element is not None:
+            text = _text(_html_text(element))
+            if text:
+                return text
+    return None
+
+
+def _from_meta(soup) -> Dict[str, Optional[str]]:
+    def meta(*names):
+        for name in names:
+            tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+            if tag and tag.get("content"):
+                return _text(tag["content"])
+        return None
+
+    title = meta("og:title", "twitter:title")
+    if not title and soup.title:
+        title = _text(soup.title.get_text())
+    return {"title": title, "company": meta("og:site_name"), "description": meta("og:description", "description")}
+
+
+def extract_job(html: str, url: str) -> Dict[str, Optional[str]]:
+    """
+    JobCreate fields from a job page: JSON-LD JobPosting first, then the source's selectors and the scraper's
+    listing parsers, then OpenGraph/meta tags. Each step only fills fields the previous ones left empty.
+    CPU-bound; callers run it in a thread.
+    """
+    from bs4 import BeautifulSoup
+    from job_scraper import job_scraper
+
+    soup = BeautifulSoup(html, "html.parser")
+    site = _site(urlsplit(url).hostname or "")
+    fields: Dict[str, Optional[str]] = {name: None for name in FIELDS}
+
+    def fill(found: Dict[str, Any]):
+        for name, value in found.items():
+            if name in fields and not fields[name] and value and value != "Unknown":
+                fields[name] = value
+
+    for posting in _json_ld_postings(soup):
+        fill(_from_json_ld(posting))
+    rules = SOURCE_RULES.get(site, {})
+    fill({name: _select(soup, selectors) for name, selectors in rules.items()})
+    # A pasted search or listing page: take its first result, parsed exactly as the scrapers do
+    if site == "weworkremotely.com":
+        listing = soup.find("li", class_="feature")
+        posting = job_scraper.parse_wwr_listing(listing) if listing else None
+        fill(posting.to_dict() if posting else {})
+    elif site == "indeed.com":
+        card = soup.find("div", class_="job_seen_beacon") or soup.find("td", class_="resultContent")
+        posting = job_scraper.parse_indeed_card(card, None) if card else None
+        fill(posting.to_dict() if posting else {})
+    fill(_from_meta(soup))
+
+    if fields["description"] == "View full description at source":
+        fields["description"] = None
+    fields["job_url"] = url
+    fields["source"] = SOURCES.get(site, site.split(".")[0].capitalize() if site else None)
+    return fields
+
+
+class JobExtractor:
+    """
+    Pre-fills jobs from their posting URL.
+
+    Results are cached in `job_extracts` by canonical URL for all users, so
+    a posting many people save is fetched and parsed once per TTL; concurrent
+    requests for the same URL in a worker share one in-flight extraction, and
+    the page fetch itself goes through the scraper's HTTP cache. Parsing runs
+    in a thread to keep the event loop free.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def ensure_indexes(self):
+        await self.db.job_extracts.create_index([("url", 1)], unique=True)
+        await self.db.job_extracts.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+    async def extract(self, url: str, scraper) -> Tuple[Dict[str, Optional[str]], bool]:
+        """
+        (fields, served_from_cache); raises ExtractionError
+        """
+        key = canonical_url(url)
+        cached = await self.db.job_extracts.find_one({"url": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}, {"_id": 0})
+        if cached:
+            if cached.get("error"):
+                raise ExtractionError(cached["error"], cached.get("status_code", 422))
+            return cached["fields"], True
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._extract_and_store(key, scraper))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # One caller disconnecting must not cancel the extraction the others are waiting on
+        return await asyncio.shield(future), False
+
+    async def _extract_and_store(self, key: str, scraper) -> Dict[str, Optional[str]]:
+        try:
+            fields = await self._extract(key, scraper)
+        except ExtractionError as e:
+            await self._store(key, {"error": str(e), "status_code": e.status_code}, EXTRACT_ERROR_TTL_SECONDS)
+            raise
+        await self._store(key, {"fields": fields}, EXTRACT_TTL_SECONDS)
+        return fields
+
+    async def _extract(self, key: str, scraper) -> Dict[str, Optional[str]]:
+        try:
+            response = await scraper.fetch_page(key, session_factory=public_session(scraper), max_bytes=MAX_PAGE_BYTES)
+        except ExtractionError:
+            raise
+        except ResponseTooLarge:
+            raise ExtractionError("The job page is too large", 422)
+        except Exception as e:
+            logger.warning(f"Job page fetch failed for {key}: {str(e)}")
+            raise ExtractionError("Could not fetch the job page", 502)
+        if response.status != 200:
+            raise ExtractionError(f"The job page returned HTTP {response.status}", 502 if response.status >= 500 else 422)
+        if "html" not in response.headers.get("content-type", "text/html"):
+            raise ExtractionError("The job URL is not an HTML page")
+        fields = await asyncio.to_thread(extract_job, response.text(), response.url)
+        if not fields["title"]:
+            raise ExtractionError("No job details found on this page")
+        return fields
+
+    async def _store(self, key: str, result: Dict, ttl: int):
+        now = datetime.now(timezone.utc)
+        await self.db.job_extracts.replace_one(
+            {"url": key},
+            {"url": key, **result, "extracted_at": now, "expires_at": now + timedelta(seconds=ttl)},
+            upsert=True
+        )
@@ -0,0 +1,106 @@
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from job_posting import JobPosting
+
+# Matched as whole words, so inflected forms ('internship', 'graduates') are listed explicitly
+LEVEL_KEYWORDS = {
+    'entry': [
+        'entry', 'junior', 'graduate', 'graduates', 'new grad', 'new grads',
+        'intern', 'interns', 'internship', 'internships', '0-2 years'
+    ],
+    'mid': ['mid', 'intermediate', '2-5 years', '3-5 years'],
+    'senior': ['senior', 'lead', 'principal', '5+ years', 'experienced', 'staff']
+}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _find_bounded(text: str, keyword: str, check_start: bool, check_end: bool) -> bool:
+    """
+    Find keyword in text as a whole word, using str.find to jump between candidates
+    """
+    length = len(keyword)
+    index = text.find(keyword)
+    while index != -1:
+        end = index + length
+        if ((not check_start or index == 0 or not _is_word_char(text[index - 1])) and
+                (not check_end or end == len(text) or not _is_word_char(text[end]))):
+            return True
+        index = text.find(keyword, index + 1)
+    return False
+
+
+class KeywordMatcher:
+    """
+    A set of keywords prepared once and reused for every job.
+
+    Matching is a C-level substring scan of the lowercased text; with word
+    boundaries enabled, candidate hits are confirmed by checking the characters
+    around them (so 'mid' no longer matches 'middleware').
+    """
+
+    def __init__(self, keywords: Iterable[str], word_boundaries: bool = True):
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords))
+        # Per keyword: whether its first/last character needs a word boundary
+        self.bounds = {
+            k: (word_boundaries and _is_word_char(k[:1]), word_boundaries and _is_word_char(k[-1:]))
+            for k in self.keywords if k
+        }
+        # Single keyword without boundary checks reduces to a plain substring test
+        self.literal = self.keywords[0] if len(self.keywords) == 1 and not any(self.bounds.get(self.keywords[0], ())) else None
+
+    def search_lower(self, text: str) -> bool:
+        """
+        Match against text that is already lowercased
+        """
+        for keyword in self.keywords:
+            if keyword not in text:
+                continue
+            check_start, check_end = self.bounds.get(keyword, (False, False))
+            if not (check_start or check_end) or _find_bounded(text, keyword, check_start, check_end):
+                return True
+        return False
+
+    def search(self, *texts: Optional[str]) -> bool:
+        literal = self.literal
+        if literal is not None:
+            for text in texts:
+                if text and literal in text.lower():
+                    return True
+            return False
+        for text in texts:
+            if text and self.search_lower(text.lower()):
+                return True
+        return False
+
+
+@lru_cache(maxsize=256)
+def query_matcher(query: str) -> KeywordMatcher:
+    """
+    Matcher for a free-text search query (substring semantics, like the original `in` checks)
+    """
+    return KeywordMatcher([query], word_boundaries=False)
+
+
+@lru_cache(maxsize=None)
+def experience_matcher(level: str) -> Optional[KeywordMatcher]:
+    """
+    Matcher for an experience level, or None when the level is unknown
+    """
+    keywords = LEVEL_KEYWORDS.get(level.lower())
+    if keywords is None:
+        return None
+    return KeywordMatcher(keywords)
+
+
+def matches_experience(job: JobPosting, level: str) -> bool:
+    """
+    Check if job matches experience level
+    """
+    matcher = experience_matcher(level)
+    if matcher is None:
+        return True
+    return matcher.search(job.title, job.description)
@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, Optional, Sequence
+
+# Field order is the order of the keys in API responses
+FIELDS = (
+    "title", "company", "location", "description", "posted_date", "job_url",
+    "company_url", "salary_range", "is_remote", "source", "tags",
+)
+
+
+class JobPosting:
+    """
+    One scraped job, from the source parsers through filtering, dedup and the API response.
+
+    Slots instead of an 11-key dict: a fraction of the memory per posting and
+    attribute access on the filter/dedupe hot path. Parsers normalise values
+    when building it (salary as text, tags as a tuple), so saving a posting
+    needs no second round of validation.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        title: str,
+        company: str,
+        location: str = "",
+        description: str = "",
+        posted_date: str = "",
+        job_url: str = "",
+        company_url: str = "",
+        salary_range: str = "",
+        is_remote: bool = False,
+        source: str = "",
+        tags: Sequence[str] = ()
+    ):
+        self.title = title
+        self.company = company
+        self.location = location
+        self.description = description
+        self.posted_date = posted_date
+        self.job_url = job_url
+        self.company_url = company_url
+        self.salary_range = salary_range
+        self.is_remote = is_remote
+        self.source = source
+        self.tags = tuple(tags)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "JobPosting":
+        """
+        From the dict shape of to_dict(); unknown keys are ignored
+        """
+        return cls(**{name: data[name] for name in FIELDS if name in data})
+
+    def to_dict(self) -> Dict:
+        """
+        The JSON shape search responses have always used
+        """
+        return {
+            "title": self.title,
+            "company": self.company,
+            "location": self.location,
+            "description": self.description,
+            "posted_date": self.posted_date,
+            "job_url": self.job_url,
+            "company_url": self.company_url,
+            "salary_range": self.salary_range,
+            "is_remote": self.is_remote,
+            "source": self.source,
+            "tags": list(self.tags),
+        }
+
+    def job_fields(self) -> Dict[str, Optional[str]]:
+        """
+        JobCreate keyword arguments; empty optional fields become None like an unset form field
+        """
+        return {
+            "title": self.title,
+            "company": self.company,
+            "location": self.location or None,
+            "job_url": self.job_url or None,
+            "source": self.source or None,
+            "description": self.description or None,
+            "salary_range": self.salary_range or None,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, JobPosting):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    def __repr__(self):
+        return f"JobPosting(title={self.title!r}, company={self.company!r}, source={self.source!r})"
+
+
+def postings_to_dicts(postings: Iterable[JobPosting]) -> list:
+    return [posting.to_dict() for posting in postings]
@@ -1,19 +1,96 @@
 import aiohttp
 import asyncio
+import socket
+from aiohttp.abc import AbstractResolver
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Awaitable, List, Dict, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 import logging
 import re
+from contextlib import asynccontextmanager
 from urllib.parse import quote_plus
+from job_matching import query_matcher, matches_experience
+from metrics import observe
+from http_fetch import FetchResponse, fetcher_from_env
+from job_posting import JobPosting
 
 logger = logging.getLogger(__name__)
 
+class PinnedResolver(AbstractResolver):
+    """
+    Resolves one host to addresses that were vetted before the request, so DNS cannot change between the check and the connect
+    """
+    
+    def __init__(self, host: str, addresses: List[str]):
+        self.host = host
+        self.addresses = addresses
+    
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict]:
+        if host != self.host:
+            raise OSError(f"Connection to unvetted host {host} refused")
+        return [
+            {
+                'hostname': host, 'host': address, 'port': port,
+                'family': socket.AF_INET6 if ':' in address else socket.AF_INET,
+                'proto': 0, 'flags': socket.AI_NUMERICHOST,
+            }
+            for address in self.addresses
+        ]
+    
+    async def close(self):
+        pass
+
 class JobScraper:
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Response cache and record/replay, see http_fetch
+        self.fetcher = fetcher_from_env()
+    
+    async def start(self, connection_limit: int = 100):
+        """
+        Open this worker's pooled HTTP session; keep-alive connections are reused across searches
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=connection_limit, limit_per_host=max(connection_limit // 4, 2), ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector)
+    
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    @asynccontextmanager
+    async def _client_session(self, url: Optional[str] = None):
+        # Outside a started worker (scripts, tests) fall back to a one-off session
+        if self.session is not None and not self.session.closed:
+            yield self.session
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+    
+    async def _get(self, url: str, params: Optional[Dict] = None) -> FetchResponse:
+        return await self.fetcher.get(self._client_session, url, params=params, headers=self.headers, timeout=10)
+    
+    @asynccontextmanager
+    async def pinned_session(self, host: str, addresses: List[str]):
+        """
+        A one-off session whose connections to `host` go to exactly `addresses`
+        """
+        connector = aiohttp.TCPConnector(resolver=PinnedResolver(host, addresses), force_close=True)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            yield session
+    
+    async def fetch_page(self, url: str, session_factory=None, max_bytes: Optional[int] = None) -> FetchResponse:
+        """
+        GET a single job page through the same cache and record/replay layer as the scrapers;
+        `session_factory(url)` replaces the pooled session for every hop that goes to the network
+        """
+        return await self.fetcher.get(
+            session_factory or self._client_session, url, headers=self.headers, timeout=10, max_bytes=max_bytes
+        )
     
     async def search_jobs(
         self,
@@ -22,21 +99,15 @@ class JobScraper:
         remote_only: bool = False,
         experience_level: Optional[str] = None,
         max_results: int = 20
-    ) -> List[Dict]:
+    ) -> List[JobPosting]:
         """
         Search for jobs across multiple sources
         """
         results = []
         
-        # Create tasks for parallel scraping
-        tasks = [
-            self.scrape_remoteok(query, max_results // 3),
-            self.scrape_weworkremotely(query, max_results // 3),
-            self.scrape_indeed(query, location, max_results // 3),
-        ]
-        
         # Execute all scrapers in parallel
-        scraper_results = await asyncio.gather(*tasks, return_exceptions=True)
+        sources = self._source_coroutines(query, location, max_results)
+        scraper_results = await asyncio.gather(*sources.values(), return_exceptions=True)
         
         # Combine results
         for result in scraper_results:
@@ -45,25 +116,75 @@ class JobScraper:
             elif isinstance(result, Exception):
                 logger.error(f"Scraper error: {str(result)}")
         
-        # Apply filters
+        unique_results = self._filter_and_dedupe(results, remote_only, experience_level, set())
+        return unique_results[:max_results]
+    
+    async def stream_jobs(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        remote_only: bool = False,
+        experience_level: Optional[str] = None,
+        max_results: int = 20
+    ) -> AsyncIterator[Tuple[str, List[JobPosting]]]:
+        """
+        Yield (source, jobs) as each scraper completes, filtered and deduplicated
+        against everything yielded before
+        """
+        sources = self._source_coroutines(query, location, max_results)
+        tasks = [asyncio.ensure_future(self._run_source(name, coro)) for name, coro in sources.items()]
+        seen = set()
+        remaining = max_results
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                source, jobs = await next_done
+                batch = self._filter_and_dedupe(jobs, remote_only, experience_level, seen)[:max(remaining, 0)]
+                remaining -= len(batch)
+                yield source, batch
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _source_coroutines(self, query: str, location: Optional[str], max_results: int) -> Dict[str, Awaitable[List[JobPosting]]]:
+        """
+        One scraper coroutine per source, each asked for an equal share of max_results
+        """
+        coroutines = {
+            'RemoteOK': self.scrape_remoteok(query, max_results // 3),
+            'We Work Remotely': self.scrape_weworkremotely(query, max_results // 3),
+            'Indeed': self.scrape_indeed(query, location, max_results // 3),
+        }
+        return {source: observe('scraper', source, coro) for source, coro in coroutines.items()}
+    
+    async def _run_source(self, source: str, coro: Awaitable[List[JobPosting]]) -> Tuple[str, List[JobPosting]]:
+        try:
+            return source, await coro
+        except Exception as e:
+            logger.error(f"Scraper error: {str(e)}")
+            return source, []
+    
+    def _filter_and_dedupe(self, jobs: List[JobPosting], remote_only: bool, experience_level: Optional[str], seen: set) -> List[JobPosting]:
+        """
+        Apply remote/experience filters and drop jobs whose title + company is already in seen
+        """
         if remote_only:
-            results = [job for job in results if job.get('is_remote', False)]
+            jobs = [job for job in jobs if job.is_remote]
         
         if experience_level:
-            results = [job for job in results if self._matches_experience(job, experience_level)]
+            jobs = [job for job in jobs if self._matches_experience(job, experience_level)]
         
         # Deduplicate by title + company
-        seen = set()
         unique_results = []
-        for job in results:
-            key = (job.get('title', '').lower(), job.get('company', '').lower())
+        for job in jobs:
+            key = (job.title.lower(), job.company.lower())
             if key not in seen and key[0] and key[1]:
                 seen.add(key)
                 unique_results.append(job)
         
-        return unique_results[:max_results]
+        return unique_results
     
-    async def scrape_remoteok(self, query: str, limit: int = 10) -> List[Dict]:
+    async def scrape_remoteok(self, query: str, limit: int = 10) -> List[JobPosting]:
         """
         Scrape jobs from RemoteOK
         """
@@ -71,48 +192,32 @@ class JobScraper:
         try:
             url = f"https://remoteok.com/api"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            response = await self._get(url)
+            if response.status == 200:
+                data = response.json()
+                
+                # Filter jobs matching query
+                matcher = query_matcher(query)
+                for job in data[1:]:  # First item is metadata
+                    if not isinstance(job, dict):
+                        continue
+                    
+                    title = job.get('position', '')
+                    description = job.get('description', '')
+                    tags = ' '.join(job.get('tags', []))
+                    
+                    # Check if query matches title, description, or tags
+                    if matcher.search(title, description, tags):
+                        results.append(self.parse_remoteok_item(job))
                         
-                        # Filter jobs matching query
-                        query_lower = query.lower()
-                        for job in data[1:]:  # First item is metadata
-                            if not isinstance(job, dict):
-                                continue
-                            
-                            title = job.get('position', '')
-                            description = job.get('description', '')
-                            tags = ' '.join(job.get('tags', []))
-                            
-                            # Check if query matches title, description, or tags
-                            if (query_lower in title.lower() or 
-                                query_lower in description.lower() or 
-                                query_lower in tags.lower()):
-                                
-                                results.append({
-                                    'title': title,
-                                    'company': job.get('company', 'Unknown'),
-                                    'location': 'Remote',
-                                    'description': description[:500] + '...' if len(description) > 500 else description,
-                                    'posted_date': self._parse_date(job.get('date')),
-                                    'job_url': job.get('url', ''),
-                                    'company_url': job.get('company_logo', ''),
-                                    'salary_range': job.get('salary_max', ''),
-                                    'is_remote': True,
-                                    'source': 'RemoteOK',
-                                    'tags': job.get('tags', [])[:5]
-                                })
-                                
-                                if len(results) >= limit:
-                                    break
+                        if len(results) >= limit:
+                            break
         except Exception as e:
             logger.error(f"RemoteOK scraping error: {str(e)}")
         
         return results
     
-    async def scrape_weworkremotely(self, query: str, limit: int = 10) -> List[Dict]:
+    async def scrape_weworkremotely(self, query: str, limit: int = 10) -> List[JobPosting]:
         """
         Scrape jobs from We Work Remotely
         """
@@ -121,45 +226,27 @@ class JobScraper:
             url = "https://weworkremotely.com/remote-jobs/search"
             params = {'term': query}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, headers=self.headers, timeout=10) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        job_listings = soup.find_all('li', class_='feature')[:limit]
-                        
-                        for job in job_listings:
-                            try:
-                                title_elem = job.find('span', class_='title')
-                                company_elem = job.find('span', class_='company')
-                                link_elem = job.find('a', class_='preventLink')
-                                
-                                if title_elem and company_elem:
-                                    job_url = f"https://weworkremotely.com{link_elem['href']}" if link_elem else ""
-                                    
-                                    results.append({
-                                        'title': title_elem.text.strip(),
-                                        'company': company_elem.text.strip(),
-                                        'location': 'Remote',
-                                        'description': 'View full description at source',
-                                        'posted_date': datetime.now(timezone.utc).isoformat(),
-                                        'job_url': job_url,
-                                        'company_url': '',
-                                        'salary_range': '',
-                                        'is_remote': True,
-                                        'source': 'We Work Remotely',
-                                        'tags': []
-                                    })
-                            except Exception as e:
-                                logger.debug(f"Error parsing WWR job: {str(e)}")
-                                continue
+            response = await self._get(url, params=params)
+            if response.status == 200:
+                html = response.text()
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                job_listings = soup.find_all('li', class_='feature')[:limit]
+                
+                for job in job_listings:
+                    try:
+                        parsed = self.parse_wwr_listing(job)
+                        if parsed:
+                            results.append(parsed)
+                    except Exception as e:
+                        logger.debug(f"Error parsing WWR job: {str(e)}")
+                        continue
         except Exception as e:
             logger.error(f"WeWorkRemotely scraping error: {str(e)}")
         
         return results
     
-    async def scrape_indeed(self, query: str, location: Optional[str], limit: int = 10) -> List[Dict]:
+    async def scrape_indeed(self, query: str, location: Optional[str], limit: int = 10) -> List[JobPosting]:
         """
         Scrape jobs from Indeed (simplified)
         """
@@ -170,57 +257,106 @@ class JobScraper:
             location_encoded = quote_plus(location) if location else quote_plus("United States")
             url = f"https://www.indeed.com/jobs?q={query_encoded}&l={location_encoded}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Find job cards (Indeed structure may vary)
-                        job_cards = soup.find_all('div', class_='job_seen_beacon')[:limit]
-                        
-                        if not job_cards:
-                            job_cards = soup.find_all('td', class_='resultContent')[:limit]
-                        
-                        for card in job_cards:
-                            try:
-                                title_elem = card.find('h2', class_='jobTitle')
-                                if not title_elem:
-                                    title_elem = card.find('a')
-                                
-                                company_elem = card.find('span', class_='companyName')
-                                location_elem = card.find('div', class_='companyLocation')
-                                
-                                if title_elem:
-                                    title = title_elem.get_text(strip=True)
-                                    company = company_elem.get_text(strip=True) if company_elem else 'Unknown'
-                                    loc = location_elem.get_text(strip=True) if location_elem else location or 'Unknown'
-                                    
-                                    # Try to get job link
-                                    link = title_elem.find('a')
-                                    job_url = f"https://www.indeed.com{link['href']}" if link and link.get('href') else ""
-                                    
-                                    results.append({
-                                        'title': title,
-                                        'company': company,
-                                        'location': loc,
-                                        'description': 'View full description at source',
-                                        'posted_date': datetime.now(timezone.utc).isoformat(),
-                                        'job_url': job_url,
-                                        'company_url': '',
-                                        'salary_range': '',
-                                        'is_remote': 'remote' in loc.lower(),
-                                        'source': 'Indeed',
-                                        'tags': []
-                                    })
-                            except Exception as e:
-                                logger.debug(f"Error parsing Indeed job: {str(e)}")
-                                continue
+            response = await self._get(url)
+            if response.status == 200:
+                html = response.text()
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Find job cards (Indeed structure may vary)
+                job_cards = soup.find_all('div', class_='job_seen_beacon')[:limit]
+                
+                if not job_cards:
+                    job_cards = soup.find_all('td', class_='resultContent')[:limit]
+                
+                for card in job_cards:
+                    try:
+                        parsed = self.parse_indeed_card(card, location)
+                        if parsed:
+                            results.append(parsed)
+                    except Exception as e:
+                        logger.debug(f"Error parsing Indeed job: {str(e)}")
+                        continue
         except Exception as e:
             logger.error(f"Indeed scraping error: {str(e)}")
         
         return results
     
+    def parse_remoteok_item(self, job: Dict) -> JobPosting:
+        """
+        One item of the RemoteOK API feed
+        """
+        description = job.get('description', '')
+        salary = job.get('salary_max')
+        return JobPosting(
+            title=job.get('position', ''),
+            company=job.get('company', 'Unknown'),
+            location='Remote',
+            description=description[:500] + '...' if len(description) > 500 else description,
+            posted_date=self._parse_date(job.get('date')),
+            job_url=job.get('url', ''),
+            company_url=job.get('company_logo', ''),
+            # The feed sends numbers or empty strings
+            salary_range=str(salary) if salary else '',
+            is_remote=True,
+            source='RemoteOK',
+            tags=job.get('tags', [])[:5]
+        )
+    
+    def parse_wwr_listing(self, job) -> Optional[JobPosting]:
+        """
+        One We Work Remotely listing element; also used to pre-fill jobs from pasted URLs
+        """
+        title_elem = job.find('span', class_='title')
+        company_elem = job.find('span', class_='company')
+        link_elem = job.find('a', class_='preventLink')
+        
+        if not (title_elem and company_elem):
+            return None
+        job_url = f"https://weworkremotely.com{link_elem['href']}" if link_elem else ""
+        
+        return JobPosting(
+            title=title_elem.text.strip(),
+            company=company_elem.text.strip(),
+            location='Remote',
+            description='View full description at source',
+            posted_date=datetime.now(timezone.utc).isoformat(),
+            job_url=job_url,
+            is_remote=True,
+            source='We Work Remotely'
+        )
+    
+    def parse_indeed_card(self, card, location: Optional[str]) -> Optional[JobPosting]:
+        """
+        One Indeed result card; also used to pre-fill jobs from pasted URLs
+        """
+        title_elem = card.find('h2', class_='jobTitle')
+        if not title_elem:
+            title_elem = card.find('a')
+        
+        company_elem = card.find('span', class_='companyName')
+        location_elem = card.find('div', class_='companyLocation')
+        
+        if not title_elem:
+            return None
+        title = title_elem.get_text(strip=True)
+        company = company_elem.get_text(strip=True) if company_elem else 'Unknown'
+        loc = location_elem.get_text(strip=True) if location_elem else location or 'Unknown'
+        
+        # Try to get job link
+        link = title_elem.find('a')
+        job_url = f"https://www.indeed.com{link['href']}" if link and link.get('href') else ""
+        
+        return JobPosting(
+            title=title,
+            company=company,
+            location=loc,
+            description='View full description at source',
+            posted_date=datetime.now(timezone.utc).isoformat(),
+            job_url=job_url,
+            is_remote='remote' in loc.lower(),
+            source='Indeed'
+        )
+    
     def _parse_date(self, date_str) -> str:
         """
         Parse various date formats to ISO format
@@ -249,25 +385,11 @@ class JobScraper:
         
         return datetime.now(timezone.utc).isoformat()
     
-    def _matches_experience(self, job: Dict, level: str) -> bool:
+    def _matches_experience(self, job: JobPosting, level: str) -> bool:
         """
         Check if job matches experience level
         """
-        title_lower = job.get('title', '').lower()
-        desc_lower = job.get('description', '').lower()
-        combined = f"{title_lower} {desc_lower}"
-        
-        level_keywords = {
-            'entry': ['entry', 'junior', 'graduate', 'intern', '0-2 years'],
-            'mid': ['mid', 'intermediate', '2-5 years', '3-5 years'],
-            'senior': ['senior', 'lead', 'principal', '5+ years', 'experienced', 'staff']
-        }
-        
-        if level.lower() in level_keywords:
-            keywords = level_keywords[level.lower()]
-            return any(keyword in combined for keyword in keywords)
-        
-        return True
+        return matches_experience(job, level)
 
 # Create singleton instance
 job_scraper = JobScraper()
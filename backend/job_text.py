@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson import Binary
+from pymongo import DeleteMany, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Large free-text fields of a job, kept in `job_texts` instead of the job document
+TEXT_FIELDS = ("description", "cover_letter", "notes", "ai_summary")
+# Projection that leaves them out of job reads
+WITHOUT_TEXT = {"_id": 0, **{field: 0 for field in TEXT_FIELDS}}
+
+COMPRESS_MIN_BYTES = int(os.environ.get('JOB_TEXT_COMPRESS_MIN_BYTES', '512'))
+ZLIB_LEVEL = 6
+# User-defined BSON binary subtype marking a zlib-compressed JSON value
+ZLIB_SUBTYPE = 0x80
+
+
+def encode_text(value: Any) -> Any:
+    """
+    Store a text value as-is, or zlib-compressed once its JSON encoding reaches COMPRESS_MIN_BYTES
+    """
+    raw = json.dumps(value, ensure_ascii=False).encode("utf-8")
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return value
+    compressed = zlib.compress(raw, ZLIB_LEVEL)
+    # Already-compressed or very short input is not worth the decode cost
+    if len(compressed) >= len(raw) * 0.9:
+        return value
+    return Binary(compressed, ZLIB_SUBTYPE)
+
+
+def decode_text(value: Any) -> Any:
+    if isinstance(value, Binary) and value.subtype == ZLIB_SUBTYPE:
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+    return value
+
+
+def split_text(doc: Dict) -> Tuple[Dict, Dict]:
+    """
+    (job fields, text fields) of a job document or update; text fields that are None are dropped
+    """
+    row = {k: v for k, v in doc.items() if k not in TEXT_FIELDS}
+    texts = {k: doc[k] for k in TEXT_FIELDS if doc.get(k) is not None}
+    return row, texts
+
+
+class JobTextStore:
+    """
+    Side collection holding the large text fields of jobs, one document per job.
+
+    Job list reads never touch it, so their working set and wire size stay
+    proportional to the short fields; `GET /api/jobs/{job_id}`, scoring,
+    the similarity index and exports load texts for the jobs they need.
+    Values over COMPRESS_MIN_BYTES are stored zlib-compressed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def ensure_indexes(self):
+        await self.db.job_texts.create_index([("job_id", 1)], unique=True)
+        await self.db.job_texts.create_index([("user_id", 1)])
+
+    def write_model(self, user_id: str, job_id: str, texts: Dict) -> UpdateOne:
+        return UpdateOne(
+            {"job_id": job_id},
+            {"$set": {name: encode_text(value) for name, value in texts.items()}, "$setOnInsert": {"user_id": user_id}},
+            upsert=True
+        )
+
+    async def save(self, user_id: str, job_id: str, texts: Dict):
+        if texts:
+            await self.db.job_texts.bulk_write([self.write_model(user_id, job_id, texts)], ordered=False)
+
+    async def save_many(self, user_id: str, items: Iterable[Tuple[str, Dict]]):
+        operations = [self.write_model(user_id, job_id, texts) for job_id, texts in items if texts]
+        if operations:
+            await self.db.job_texts.bulk_write(operations, ordered=False)
+
+    async def load(self, user_id: str, job_id: str, fields: Optional[Sequence[str]] = None) -> Dict:
+        return (await self.load_many(user_id, [job_id], fields)).get(job_id, {})
+
+    async def load_many(self, user_id: Optional[str], job_ids: List[str], fields: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+        """
+        Decoded texts by job_id; `user_id=None` is for background work across users
+        """
+        if not job_ids:
+            return {}
+        query: Dict[str, Any] = {"job_id": {"$in": job_ids}}
+        if user_id is not None:
+            query["user_id"] = user_id
+        projection = {"_id": 0, "job_id": 1, **{field: 1 for field in (fields or TEXT_FIELDS)}}
+        texts = {}
+        async for doc in self.db.job_texts.find(query, projection):
+            job_id = doc.pop("job_id")
+            texts[job_id] = {name: decode_text(value) for name, value in doc.items()}
+        return texts
+
+    async def attach(self, user_id: Optional[str], jobs: List[Dict], fields: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Merge texts into job documents in place; texts from the side collection win over inline leftovers
+        """
+        texts = await self.load_many(user_id, [job["job_id"] for job in jobs], fields)
+        for job in jobs:
+            job.update(texts.get(job["job_id"], {}))
+        return jobs
+
+    def delete_model(self, job_ids: List[str]) -> DeleteMany:
+        return DeleteMany({"job_id": {"$in": job_ids}})
+
+    async def delete(self, job_ids: List[str]):
+        if job_ids:
+            await self.db.job_texts.bulk_write([self.delete_model(job_ids)])
+
+    async def migrate(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Move text fields still stored inline on job documents into the side collection.
+
+        Idempotent and resumable: each batch writes the texts before unsetting
+        them on the jobs, and a value already in the side collection (written
+        by the API after the split) is never overwritten by the older inline one.
+        """
+        counts = {"jobs": 0, "fields_moved": 0}
+        inline = {"$or": [{field: {"$exists": True}} for field in TEXT_FIELDS]}
+        projection = {"_id": 0, "job_id": 1, "user_id": 1, **{field: 1 for field in TEXT_FIELDS}}
+        batch = []
+        async for job in self.db.jobs.find(inline, projection).batch_size(batch_size):
+            batch.append(job)
+            if len(batch) >= batch_size:
+                await self._migrate_batch(batch, counts)
+                batch = []
+        if batch:
+            await self._migrate_batch(batch, counts)
+        return counts
+
+    async def _migrate_batch(self, batch: List[Dict], counts: Dict[str, int]):
+        # Conditional writes rather than a read-then-$set, so a value the API writes meanwhile is kept
+        text_writes = []
+        for job in batch:
+            _, texts = split_text(job)
+            if not texts:
+                continue
+            text_writes.append(UpdateOne({"job_id": job["job_id"]}, {"$setOnInsert": {"user_id": job["user_id"]}}, upsert=True))
+            text_writes.extend(
+                UpdateOne({"job_id": job["job_id"], name: {"$exists": False}}, {"$set": {name: encode_text(value)}})
+                for name, value in texts.items()
+            )
+        if text_writes:
+            # Ordered: each job's document exists before its fields are filled in
+            result = await self.db.job_texts.bulk_write(text_writes)
+            counts["fields_moved"] += result.modified_count
+        await self.db.jobs.bulk_write([
+            UpdateOne({"job_id": job["job_id"]}, {"$unset": {field: "" for field in TEXT_FIELDS}})
+            for job in batch
+        ], ordered=False)
+        counts["jobs"] += len(batch)
+        logger.info(f"Job text migration: {counts['jobs']} jobs processed")
+
+
+async def _main():
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Move inline job text fields into the job_texts collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    store = JobTextStore(client[os.environ['DB_NAME']])
+    await store.ensure_indexes()
+    print(await store.migrate(batch_size=args.batch_size))
+    client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(_main())
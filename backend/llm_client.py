@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+from metrics import Histogram, HISTOGRAMS, observe
+
+logger = logging.getLogger(__name__)
+
+LLM_TOKENS = Histogram(
+    "jobflow_llm_tokens", "LLM tokens per call", ["provider", "model", "direction"],
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+LLM_QUEUE_WAIT = Histogram("jobflow_llm_queue_wait_seconds", "Time LLM calls waited for a concurrency slot", ["purpose"])
+HISTOGRAMS.extend([LLM_TOKENS, LLM_QUEUE_WAIT])
+
+
+class LLMRateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class LLMOverloaded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("LLM capacity exhausted")
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) used for accounting
+    """
+    return max(1, len(text) // 4) if text else 0
+
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count with tiktoken when its encoding is available, else the character estimate
+    """
+    global _encoding
+    if not text:
+        return 0
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self, amount: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take `amount` tokens if available; otherwise return the seconds until they would be
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True, 0.0
+        return False, (amount - self.tokens) / self.refill_per_second
+
+
+class LLMClient:
+    """
+    Shared entry point for every LLM call the API makes.
+
+    Enforces a global concurrency cap with a bounded wait queue (callers beyond
+    it fail fast with LLMOverloaded) and a per-user token bucket (LLMRateLimited),
+    and records latency and estimated token usage per provider/model.
+
+    LlmChat keeps conversation history on the instance, so a fresh session
+    object is created per call to keep users' prompts isolated; the underlying
+    HTTP connections are pooled by the provider SDK.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        chat_factory: Callable,
+        message_factory: Callable,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 30.0,
+        user_burst: float = 5,
+        user_refill_per_minute: float = 10
+    ):
+        self.api_key = api_key
+        self.chat_factory = chat_factory
+        self.message_factory = message_factory
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_burst = user_burst
+        self.user_refill_per_second = user_refill_per_minute / 60
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _check_rate(self, user_id: str):
+        if len(self._buckets) > 10000:
+            self._prune_buckets()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_burst, self.user_refill_per_second)
+        allowed, retry_after = bucket.try_acquire()
+        if not allowed:
+            raise LLMRateLimited(retry_after)
+
+    def _prune_buckets(self):
+        # Buckets that would have refilled completely carry no state worth keeping
+        now = time.monotonic()
+        full_after = self.user_burst / self.user_refill_per_second
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b.updated < full_after}
+
+    async def _acquire_slot(self, purpose: str):
+        if self._waiting >= self.max_queue:
+            raise LLMOverloaded(self.queue_timeout)
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise LLMOverloaded(self.queue_timeout)
+        finally:
+            self._waiting -= 1
+            LLM_QUEUE_WAIT.observe(time.perf_counter() - start, purpose)
+
+    async def complete(
+        self,
+        user_id: str,
+        purpose: str,
+        system_message: str,
+        prompt: str,
+        provider: str = "openai",
+        model: str = "gpt-5.2",
+        rate_limited: bool = True
+    ) -> str:
+        """
+        Send one prompt and return the text response; `rate_limited=False` is for fallbacks of a call already charged
+        """
+        if rate_limited:
+            self._check_rate(user_id)
+        await self._acquire_slot(purpose)
+        try:
+            chat = self.chat_factory(
+                api_key=self.api_key,
+                session_id=f"{purpose}_{user_id}_{uuid.uuid4().hex[:8]}",
+                system_message=system_message
+            ).with_model(provider, model)
+            response = await observe("llm", f"{provider}/{model}", chat.send_message(self.message_factory(text=prompt)))
+        finally:
+            self._semaphore.release()
+
+        LLM_TOKENS.observe(count_tokens(system_message) + count_tokens(prompt), provider, model, "prompt")
+        LLM_TOKENS.observe(count_tokens(response), provider, model, "completion")
+        return response
@@ -0,0 +1,250 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Canonical skill -> aliases that mean the same thing in postings and resumes
+SKILL_ALIASES: Dict[str, Sequence[str]] = {
+    "Python": ["python"], "Java": ["java"], "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript"], "Go": ["golang"], "Rust": ["rust"], "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"], "Ruby": ["ruby"], "PHP": ["php"], "Kotlin": ["kotlin"], "Swift": ["swift"],
+    "Scala": ["scala"], "R": ["r programming"], "SQL": ["sql"], "Bash": ["bash", "shell scripting"],
+    "React": ["react", "react.js", "reactjs"], "Vue": ["vue", "vue.js", "vuejs"], "Angular": ["angular"],
+    "Next.js": ["next.js", "nextjs"], "Node.js": ["node.js", "nodejs"], "Django": ["django"],
+    "Flask": ["flask"], "FastAPI": ["fastapi"], "Spring": ["spring boot", "spring framework"], "Rails": ["rails", "ruby on rails"],
+    ".NET": ["dotnet", "asp.net"], "GraphQL": ["graphql"], "REST": ["restful", "rest api", "rest apis"],
+    "gRPC": ["grpc"], "HTML": ["html", "html5"], "CSS": ["css", "css3"], "Tailwind": ["tailwind", "tailwindcss"],
+    "PostgreSQL": ["postgres", "postgresql"], "MySQL": ["mysql"], "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"], "Elasticsearch": ["elasticsearch", "opensearch"], "Kafka": ["kafka"],
+    "RabbitMQ": ["rabbitmq"], "Snowflake": ["snowflake"], "BigQuery": ["bigquery"], "Spark": ["spark", "pyspark"],
+    "Airflow": ["airflow"], "dbt": ["dbt"], "Hadoop": ["hadoop"], "Pandas": ["pandas"], "NumPy": ["numpy"],
+    "AWS": ["aws", "amazon web services"], "GCP": ["gcp", "google cloud"], "Azure": ["azure"],
+    "Docker": ["docker"], "Kubernetes": ["kubernetes", "k8s"], "Terraform": ["terraform"], "Ansible": ["ansible"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery"], "Jenkins": ["jenkins"],
+    "GitHub Actions": ["github actions"], "Linux": ["linux"], "Git": ["git"], "Microservices": ["microservices"],
+    "Distributed Systems": ["distributed systems"], "System Design": ["system design"],
+    "Machine Learning": ["machine learning", "ml"], "Deep Learning": ["deep learning"], "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"], "PyTorch": ["pytorch"], "TensorFlow": ["tensorflow"],
+    "scikit-learn": ["scikit-learn", "sklearn"], "LLM": ["llm", "llms", "large language models"],
+    "Data Analysis": ["data analysis", "data analytics"], "Statistics": ["statistics", "statistical"],
+    "Tableau": ["tableau"], "Power BI": ["power bi", "powerbi"], "Excel": ["microsoft excel", "ms excel", "excel spreadsheets"], "ETL": ["etl"],
+    "Figma": ["figma"], "UX": ["ux", "user experience"], "UI Design": ["ui design", "user interface"],
+    "Agile": ["agile", "scrum", "kanban"], "Jira": ["jira"], "Product Management": ["product management"],
+    "Project Management": ["project management"], "Stakeholder Management": ["stakeholder management", "stakeholders"],
+    "Communication": ["communication", "communicator"], "Leadership": ["leadership", "mentoring", "mentorship"],
+    "Security": ["security", "appsec", "infosec"], "OAuth": ["oauth", "oidc"], "Testing": ["testing", "unit tests", "tdd"],
+    "Selenium": ["selenium"], "Cypress": ["cypress"], "Playwright": ["playwright"], "iOS": ["ios"], "Android": ["android"],
+    "React Native": ["react native"], "Flutter": ["flutter"], "Salesforce": ["salesforce"], "SAP": ["sap"],
+    "SEO": ["seo"], "Marketing": ["marketing"], "Sales": ["sales"], "Customer Success": ["customer success"],
+}
+MAX_PHRASE_WORDS = 3
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by can
+could did do does doing down during each few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not now of off on once only or other our ours out over own same she
+should so some such than that the their theirs them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours role team work working experience
+years year including strong ability skills join looking company job position candidate responsibilities requirements
+preferred required plus bonus etc new using use help across within well like
+""".split())
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def _build_alias_index() -> Dict[str, str]:
+    index = {}
+    for skill, aliases in SKILL_ALIASES.items():
+        for alias in aliases:
+            index[" ".join(tokenize(alias))] = skill
+    return index
+
+
+ALIAS_INDEX = _build_alias_index()
+# First words of multi-word aliases; longer windows are only joined when they start with one
+PHRASE_PREFIXES = frozenset(alias.split(" ")[0] for alias in ALIAS_INDEX if " " in alias)
+
+
+def extract_skills(tokens: Sequence[str], token_counts: Optional[Counter] = None) -> Counter:
+    """
+    Count vocabulary skills in a token sequence.
+
+    Single-word aliases come straight from the token counts; multi-word windows
+    are only built at positions whose token can start a phrase.
+    """
+    if token_counts is None:
+        token_counts = Counter(tokens)
+    found = Counter()
+    for token in token_counts.keys() & ALIAS_INDEX.keys():
+        found[ALIAS_INDEX[token]] += token_counts[token]
+    if token_counts.keys() & PHRASE_PREFIXES:
+        for i, token in enumerate(tokens):
+            if token in PHRASE_PREFIXES:
+                for n in range(2, MAX_PHRASE_WORDS + 1):
+                    skill = ALIAS_INDEX.get(" ".join(tokens[i:i + n]))
+                    if skill:
+                        found[skill] += 1
+    return found
+
+
+class ResumeProfile:
+    """
+    Term counts and skills of a resume, computed once and reused for every job it is scored against
+    """
+
+    def __init__(self, term_counts: Dict[str, int], skills: Iterable[str]):
+        self.term_counts = Counter(term_counts)
+        self.skills: Set[str] = set(skills)
+
+    @classmethod
+    def from_text(cls, text: str) -> "ResumeProfile":
+        tokens = tokenize(text)
+        return cls(Counter(t for t in tokens if t not in STOPWORDS), extract_skills(tokens))
+
+    @classmethod
+    def from_features(cls, features: Dict) -> "ResumeProfile":
+        return cls(dict(zip(features["terms"], features["counts"])), features["skills"])
+
+    def to_features(self) -> Dict:
+        # Parallel arrays rather than a mapping: terms like "node.js" are not safe Mongo field names
+        terms = list(self.term_counts)
+        return {"terms": terms, "counts": [self.term_counts[t] for t in terms], "skills": sorted(self.skills)}
+
+
+def _job_text(job: Dict) -> str:
+    return f"{job.get('title') or ''}\n{job.get('description') or ''}"
+
+
+class Corpus:
+    """
+    Document frequencies over a set of jobs, so IDF does not depend on which jobs are scored together
+    """
+
+    def __init__(self):
+        self.document_frequency = Counter()
+        self.n_docs = 0
+
+    def add(self, jobs: Iterable[Dict]):
+        for job in jobs:
+            self.add_terms({t for t in tokenize(_job_text(job)) if t not in STOPWORDS})
+
+    def add_terms(self, terms: Iterable[str]):
+        self.document_frequency.update(terms)
+        self.n_docs += 1
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + self.n_docs) / (1 + self.document_frequency.get(term, 0))) + 1
+
+
+def score_jobs(
+    jobs: Sequence[Dict],
+    resume: Optional[ResumeProfile] = None,
+    max_keywords: int = 8,
+    resumes: Optional[Sequence[Optional[ResumeProfile]]] = None,
+    corpus: Optional[Corpus] = None
+) -> List[Tuple[Optional[int], List[str]]]:
+    """
+    Score every job against the resume in one pass.
+
+    Returns (match_score, keywords) per job. The score blends skill coverage
+    (share of the job's vocabulary skills found in the resume) with TF-IDF
+    cosine similarity between resume and job text. IDF comes from `corpus`,
+    normally built over the user's whole inbox; without one it comes from the
+    batch itself. `resumes` gives each job its own resume (aligned with `jobs`)
+    and takes precedence over `resume`; jobs without one only get keywords.
+    """
+    if not jobs:
+        return []
+    job_tokens = [tokenize(_job_text(job)) for job in jobs]
+    job_counts = [Counter(tokens) for tokens in job_tokens]
+    job_skills = [extract_skills(tokens, counts) for tokens, counts in zip(job_tokens, job_counts)]
+    for counts in job_counts:
+        for stopword in counts.keys() & STOPWORDS:
+            del counts[stopword]
+
+    if corpus is None:
+        corpus = Corpus()
+        for counts in job_counts:
+            corpus.add_terms(counts.keys())
+    idf = corpus.idf
+
+    keywords = [_keywords(skills, counts, idf, max_keywords) for skills, counts in zip(job_skills, job_counts)]
+    if resumes is None:
+        resumes = [resume] * len(jobs)
+
+    # Jobs sharing a resume are scored together in one matrix product
+    groups: Dict[int, Tuple[ResumeProfile, List[int]]] = {}
+    for i, profile in enumerate(resumes):
+        if profile is not None and profile.term_counts:
+            groups.setdefault(id(profile), (profile, []))[1].append(i)
+
+    results: List[Tuple[Optional[int], List[str]]] = [(None, kw) for kw in keywords]
+    for profile, indices in groups.values():
+        similarity = _cosine_to_resume([job_counts[i] for i in indices], profile, idf)
+        for i, sim in zip(indices, similarity):
+            skills = job_skills[i]
+            if skills:
+                coverage = len(profile.skills.intersection(skills)) / len(skills)
+                blended = 0.65 * coverage + 0.35 * min(sim / 0.5, 1.0)
+            else:
+                blended = min(sim / 0.5, 1.0)
+            results[i] = (int(round(blended * 100)), keywords[i])
+    return results
+
+
+def _cosine_to_resume(job_counts: List[Counter], resume: ResumeProfile, idf) -> np.ndarray:
+    """
+    Vectorized cosine similarity between each job and the resume.
+
+    Only the resume's terms can contribute to the dot product, so the matrix is
+    jobs x resume-terms rather than jobs x vocabulary; job norms are summed over
+    all of each job's terms with one bincount.
+    """
+    resume_terms = list(resume.term_counts)
+    term_index = {term: j for j, term in enumerate(resume_terms)}
+    resume_idf = np.array([idf(t) for t in resume_terms], dtype=np.float32)
+    resume_vec = (1 + np.log(np.array([resume.term_counts[t] for t in resume_terms], dtype=np.float32))) * resume_idf
+
+    overlap = np.zeros((len(job_counts), len(resume_terms)), dtype=np.float32)
+    doc_ids, weights = [], []
+    for i, counts in enumerate(job_counts):
+        for term, count in counts.items():
+            weight = (1 + math.log(count)) * idf(term)
+            doc_ids.append(i)
+            weights.append(weight)
+            j = term_index.get(term)
+            if j is not None:
+                overlap[i, j] = weight
+    job_norms = np.sqrt(np.bincount(np.array(doc_ids, dtype=np.int64), weights=np.square(np.array(weights, dtype=np.float64)), minlength=len(job_counts)))
+
+    dots = overlap @ resume_vec
+    denominator = job_norms * float(np.linalg.norm(resume_vec))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.where(denominator > 0, dots / denominator, 0.0)
+    return similarity
+
+
+def _keywords(skills: Counter, counts: Counter, idf, limit: int) -> List[str]:
+    keywords = [skill for skill, _ in skills.most_common(limit)]
+    if len(keywords) < 5:
+        # Pad with the job's most distinctive terms
+        taken = {word for k in keywords for word in tokenize(k)}
+        ranked = heapq.nlargest(
+            limit - len(keywords),
+            (t for t in counts if len(t) > 2 and not t.isdigit() and t not in taken),
+            key=lambda t: (1 + math.log(counts[t])) * idf(t)
+        )
+        keywords.extend(term.capitalize() for term in ranked)
+    return keywords[:limit]
+
+
+def resume_profile(text: Optional[str]) -> Optional[ResumeProfile]:
+    return ResumeProfile.from_text(text) if text and text.strip() else None
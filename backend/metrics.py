@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with labels, rendered in the Prometheus text format
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One counter per bucket, then +Inf, sum
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(items):
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = f"{label_str}," if label_str else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count:g}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-2]:g}')
+            lines.append(f"{self.name}_count{{{label_str}}} {series[-2]:g}")
+            lines.append(f"{self.name}_sum{{{label_str}}} {series[-1]:.6f}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LATENCY = Histogram("jobflow_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"])
+MONGO_LATENCY = Histogram("jobflow_mongo_command_duration_seconds", "MongoDB command latency", ["command", "outcome"])
+EXTERNAL_LATENCY = Histogram("jobflow_external_call_duration_seconds", "Scraper, LLM and auth call latency", ["kind", "name"])
+MONGO_CALLS_PER_REQUEST = Histogram(
+    "jobflow_mongo_commands_per_request", "MongoDB commands issued per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100)
+)
+HISTOGRAMS = [REQUEST_LATENCY, MONGO_LATENCY, EXTERNAL_LATENCY, MONGO_CALLS_PER_REQUEST]
+
+
+class RequestStats:
+    """
+    Per-request breakdown, shared by reference with the executor threads Motor runs commands on
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_calls = 0
+        self.mongo_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_mongo(self, seconds: float):
+        with self._lock:
+            self.mongo_calls += 1
+            self.mongo_seconds += seconds
+
+    def add_span(self, kind: str, seconds: float, mongo_seconds: float = 0.0):
+        with self._lock:
+            self.spans[kind] = self.spans.get(kind, 0.0) + seconds
+            # Mongo time spent inside the span is reported as part of the span, not twice
+            self.mongo_seconds -= mongo_seconds
+
+    def breakdown(self, total: float) -> Dict[str, float]:
+        parts = {"mongo": self.mongo_seconds, **self.spans}
+        # Time not attributed to a tracked call: handler code, validation and serialization
+        parts["other"] = max(total - sum(parts.values()), 0.0)
+        return parts
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        MONGO_LATENCY.observe(seconds, event.command_name, outcome)
+        stats = current_request.get()
+        if stats is not None:
+            stats.add_mongo(seconds)
+
+
+@contextmanager
+def track(kind: str, name: str) -> Iterator[None]:
+    """
+    Time a block as an external call of the given kind (auth, scraper, llm)
+    """
+    stats = current_request.get()
+    mongo_before = stats.mongo_seconds if stats is not None else 0.0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        EXTERNAL_LATENCY.observe(elapsed, kind, name)
+        if stats is not None:
+            stats.add_span(kind, elapsed, stats.mongo_seconds - mongo_before)
+
+
+async def observe(kind: str, name: str, awaitable: Awaitable[T]) -> T:
+    with track(kind, name):
+        return await awaitable
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def install_metrics_middleware(app, slow_request_seconds: float):
+    @app.middleware("http")
+    async def record_request_metrics(request, call_next):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            total = time.perf_counter() - stats.started
+            breakdown = stats.breakdown(total)
+            response.headers["Server-Timing"] = ", ".join(
+                f"{name};dur={seconds * 1000:.1f}" for name, seconds in breakdown.items()
+            )
+            return response
+        finally:
+            current_request.reset(token)
+            total = time.perf_counter() - stats.started
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.observe(total, request.method, route, str(status))
+            MONGO_CALLS_PER_REQUEST.observe(stats.mongo_calls, route)
+            if total >= slow_request_seconds:
+                parts = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in stats.breakdown(total).items())
+                logger.warning(
+                    f"Slow request {request.method} {route} {status} {total * 1000:.1f}ms "
+                    f"(mongo_calls={stats.mongo_calls} {parts})"
+                )
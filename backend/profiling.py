@@ -0,0 +1,365 @@
+import asyncio
+import hmac
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bson import Binary
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+MAX_STACK_DEPTH = 256
+WAIT_FRAME = ("(waiting)", "", 0)
+
+FrameKey = Tuple[str, str, int]
+
+
+def _frame_key(frame) -> FrameKey:
+    code = frame.f_code
+    # Per function rather than per line, so each await point does not become its own frame
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _coroutine_frames(coro) -> List:
+    """
+    Frames of a coroutine and everything it is awaiting, outermost first
+    """
+    frames = []
+    while coro is not None and len(frames) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+def task_stacks(task, thread_frame, depth: int = 0) -> List[List[FrameKey]]:
+    """
+    The async call stacks of a task, outermost first.
+
+    A running task's stack continues into the loop thread's current frames
+    (the synchronous calls it is making); a suspended one ends in a
+    "(waiting)" frame, or branches into the child tasks it awaits through
+    asyncio.gather, so time spent in concurrent scrapers or queries shows up
+    under the coroutine that started them.
+    """
+    coroutine_frames = _coroutine_frames(task.get_coro())
+    stack = [_frame_key(frame) for frame in coroutine_frames]
+    if coroutine_frames and thread_frame is not None:
+        innermost = coroutine_frames[-1]
+        above = []
+        frame = thread_frame
+        while frame is not None and frame is not innermost and len(above) < MAX_STACK_DEPTH:
+            above.append(frame)
+            frame = frame.f_back
+        if frame is innermost:
+            return [stack + [_frame_key(f) for f in reversed(above)]]
+
+    waiter = getattr(task, "_fut_waiter", None)
+    children = getattr(waiter, "_children", None)
+    if isinstance(waiter, asyncio.Task):
+        children = [waiter]
+    if children and depth < 8:
+        stacks = []
+        for child in children:
+            if isinstance(child, asyncio.Task) and not child.done():
+                stacks.extend(stack + child_stack for child_stack in task_stacks(child, thread_frame, depth + 1))
+        if stacks:
+            return stacks
+    return [stack + [WAIT_FRAME]]
+
+
+class RequestProfile:
+    """
+    Samples collected for one request
+    """
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.profile_id = f"profile_{uuid.uuid4().hex[:12]}"
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.user_id: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.frames: Dict[FrameKey, int] = {}
+        self.stacks: Dict[Tuple[int, ...], int] = {}
+        # (stack id, weight in seconds) in time order
+        self.samples: List[Tuple[int, float]] = []
+        self.last_sample = self.started
+
+    def sample(self, thread_frame):
+        now = time.perf_counter()
+        # Weight by the time since the previous sample: the sampler can be held off the GIL during CPU-bound work
+        elapsed = now - self.last_sample
+        self.last_sample = now
+        stacks = task_stacks(self.task, thread_frame)
+        for stack in stacks:
+            ids = tuple(self.frames.setdefault(key, len(self.frames)) for key in stack)
+            self.samples.append((self.stacks.setdefault(ids, len(self.stacks)), elapsed / len(stacks)))
+
+    def speedscope(self) -> Dict:
+        """
+        The samples as a speedscope file (https://www.speedscope.app)
+        """
+        stacks = [None] * len(self.stacks)
+        for ids, stack_id in self.stacks.items():
+            stacks[stack_id] = list(ids)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": name, "file": file, "line": line} for name, file, line in self.frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.method} {self.path}",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.duration * 1000, 3),
+                "samples": [stacks[stack_id] for stack_id, _ in self.samples],
+                "weights": [round(weight * 1000, 3) for _, weight in self.samples],
+            }],
+            "name": f"{self.method} {self.path} {self.profile_id}",
+            "exporter": "jobflow",
+        }
+
+
+class StackSampler:
+    """
+    One daemon thread sampling every in-flight profiled request; idle while none are
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: Dict[str, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.pop(profile.profile_id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._profiles
+                if idle:
+                    self._wakeup.clear()
+            if idle:
+                self._wakeup.wait()
+                continue
+            time.sleep(self.interval)
+            # Held while sampling, so a profile is never being written to once remove() returns
+            with self._lock:
+                frames = sys._current_frames()
+                for profile in self._profiles.values():
+                    try:
+                        profile.sample(frames.get(profile.thread_id))
+                    except Exception as e:
+                        # Stacks change under the sampler; a torn read only loses one sample
+                        logger.debug(f"Profile sample failed: {str(e)}")
+                del frames
+
+
+def collapsed_stacks(speedscope: Dict) -> str:
+    """
+    Folded "frame;frame;frame weight" lines, the input format of flamegraph.pl and most flamegraph tools
+    """
+    frames = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    totals: Dict[str, float] = {}
+    for profile in speedscope["profiles"]:
+        if profile.get("type") != "sampled":
+            continue
+        for stack, weight in zip(profile["samples"], profile["weights"]):
+            key = ";".join(frames[i] for i in stack)
+            totals[key] = totals.get(key, 0) + weight
+    # Weights are milliseconds; flamegraph tools expect integer counts
+    return "".join(f"{key} {max(int(round(weight * 1000)), 1)}\n" for key, weight in totals.items())
+
+
+class ProfileStore:
+    """
+    Captured profiles in the `profiles` collection, speedscope JSON zlib-compressed, expiring after `retention`
+    """
+
+    def __init__(self, db, retention: timedelta = timedelta(days=7)):
+        self.db = db
+        self.retention = retention
+
+    async def ensure_indexes(self):
+        await self.db.profiles.create_index([("profile_id", 1)], unique=True)
+        await self.db.profiles.create_index([("started_at", -1)])
+        await self.db.profiles.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+    async def save(self, meta: Dict, speedscope: Dict):
+        data = await asyncio.to_thread(lambda: Binary(zlib.compress(json.dumps(speedscope).encode(), 6)))
+        await self.db.profiles.insert_one({
+            **meta,
+            "speedscope": data,
+            "expires_at": datetime.now(timezone.utc) + self.retention,
+        })
+
+    async def list(self, limit: int = 50, path: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict]:
+        query = {}
+        if path:
+            query["path"] = path
+        if user_id:
+            query["user_id"] = user_id
+        return await self.db.profiles.find(query, {"_id": 0, "speedscope": 0, "expires_at": 0}).sort("started_at", -1).limit(limit).to_list(limit)
+
+    async def load(self, profile_id: str) -> Optional[Dict]:
+        doc = await self.db.profiles.find_one({"profile_id": profile_id}, {"_id": 0, "speedscope": 1})
+        if not doc:
+            return None
+        return await asyncio.to_thread(lambda: json.loads(zlib.decompress(doc["speedscope"])))
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def tag_profile(**fields):
+    """
+    Attach details known only inside the handler (such as the user) to the request's profile, if it is being profiled
+    """
+    profile = current_profile.get()
+    if profile is not None:
+        for name, value in fields.items():
+            setattr(profile, name, value)
+
+
+class Profiler:
+    """
+    Per-request wall-clock profiling, off unless a token is configured.
+
+    A request is profiled when it carries `X-Profile: <token>` or, on one of
+    `paths`, with probability `sample_rate`. The built-in sampler follows a
+    request's task through its awaits (into gathered child tasks) from a
+    background thread, so profiles show time spent waiting on Motor queries
+    and scrapers as well as CPU time, attributed to this request only even
+    while others run on the loop. With `backend="pyinstrument"` (if
+    installed) pyinstrument's async mode is used instead. Results are saved
+    through the store once the response has been sent.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        token: Optional[str],
+        sample_rate: float = 0.0,
+        paths: Sequence[str] = ("/api/",),
+        interval: float = 0.001,
+        backend: str = "sampler"
+    ):
+        self.store = store
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        self.paths = tuple(paths)
+        self.interval = interval
+        self.backend = backend
+        self.sampler = StackSampler(interval)
+        self._pending: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None
+
+    def trigger(self, scope) -> Optional[str]:
+        if self.token is None:
+            return None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return "header" if hmac.compare_digest(value, self.token) else None
+        if self.sample_rate and scope["path"].startswith(self.paths) and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def save_later(self, profile: RequestProfile, speedscope: Dict):
+        meta = {
+            "profile_id": profile.profile_id,
+            "method": profile.method,
+            "path": profile.path,
+            "status": profile.status,
+            "user_id": profile.user_id,
+            "trigger": profile.trigger,
+            "profiler": self.backend,
+            "started_at": profile.started_at,
+            "duration_ms": round(profile.duration * 1000, 1),
+            "samples": len(speedscope["profiles"][0].get("samples", [])) if speedscope.get("profiles") else 0,
+        }
+        task = asyncio.ensure_future(self.store.save(meta, speedscope))
+        self._pending.add(task)
+        task.add_done_callback(self._saved)
+        logger.info(f"Profiled {profile.method} {profile.path} in {meta['duration_ms']}ms as {profile.profile_id}")
+
+    def _saved(self, task: asyncio.Task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Saving profile failed: {str(task.exception())}")
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests the profiler selects; adds an X-Profile-Id response header
+    """
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            return await self.app(scope, receive, send)
+        trigger = self.profiler.trigger(scope)
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+        token = current_profile.set(profile)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.profile_id.encode())]}
+            await send(message)
+
+        external = None
+        if self.profiler.backend == "pyinstrument":
+            from pyinstrument import Profiler as PyinstrumentProfiler
+            external = PyinstrumentProfiler(interval=self.profiler.interval, async_mode="enabled")
+            external.start()
+        else:
+            self.profiler.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.duration = time.perf_counter() - profile.started
+            current_profile.reset(token)
+            if external is not None:
+                from pyinstrument.renderers import SpeedscopeRenderer
+                external.stop()
+                speedscope = json.loads(external.output(SpeedscopeRenderer()))
+            else:
+                self.profiler.sampler.remove(profile)
+                speedscope = profile.speedscope()
+            self.profiler.save_later(profile, speedscope)
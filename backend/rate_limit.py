@@ -0,0 +1,295 @@
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from llm_client import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Route class -> (burst, requests per minute) for one user across all workers
+DEFAULT_LIMITS = {
+    "search": (10, 20),
+    "ai": (10, 20),
+    "bulk": (5, 20),
+    "default": (300, 1200),
+}
+# (method or None for any, path, exact match, route class); checked in order, first match wins
+ROUTE_CLASSES = [
+    ("POST", "/api/jobs/search", False, "search"),
+    ("POST", "/api/jobs/from-url", True, "search"),
+    (None, "/api/ai/", False, "ai"),
+    ("POST", "/api/jobs/batch", True, "bulk"),
+    ("POST", "/api/jobs/bulk-save", True, "bulk"),
+    ("POST", "/api/jobs/score", True, "bulk"),
+    ("POST", "/api/import", True, "bulk"),
+    ("GET", "/api/export", True, "bulk"),
+]
+# Long-lived or operational endpoints that are never limited
+EXEMPT_PATHS = {"/api/events", "/healthz", "/readyz", "/metrics"}
+# How long a worker trusts its token -> user mapping; bounds how long a session revoked elsewhere keeps its user's bucket
+SESSION_CACHE_SECONDS = 300
+# Tokens that resolved to no session are remembered briefly, so repeating one costs no further lookups
+UNKNOWN_SESSION_CACHE_SECONDS = 30
+MAX_CACHED_SESSIONS = 50000
+
+
+def parse_limit(value: str) -> Tuple[float, float]:
+    """
+    "burst/per_minute", e.g. "10/20"
+    """
+    burst, _, per_minute = value.partition("/")
+    return float(burst), float(per_minute or burst)
+
+
+def limits_from_env() -> Dict[str, Tuple[float, float]]:
+    """
+    DEFAULT_LIMITS with RATE_LIMIT_<CLASS>=burst/per_minute overrides
+    """
+    return {
+        name: parse_limit(os.environ[f"RATE_LIMIT_{name.upper()}"]) if f"RATE_LIMIT_{name.upper()}" in os.environ else limit
+        for name, limit in DEFAULT_LIMITS.items()
+    }
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """
+    The limit class of a request, or None for paths outside the API and exempt endpoints
+    """
+    if path in EXEMPT_PATHS or not path.startswith("/api/"):
+        return None
+    for route_method, prefix, exact, name in ROUTE_CLASSES:
+        if (route_method is None or route_method == method) and (path == prefix if exact else path.startswith(prefix)):
+            return name
+    return "default"
+
+
+class MemoryRateLimitStore:
+    """
+    Token buckets in this worker's memory
+    """
+
+    def __init__(self, max_keys: int = 50000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, key: str, burst: float, per_second: float) -> Tuple[bool, float]:
+        return self.acquire_now(key, burst, per_second)
+
+    def acquire_now(self, key: str, burst: float, per_second: float) -> Tuple[bool, float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(burst, per_second)
+        return bucket.try_acquire()
+
+    def _prune(self):
+        # Buckets that would have refilled completely carry no state worth keeping
+        now = time.monotonic()
+        self._buckets = {
+            k: b for k, b in self._buckets.items()
+            if now - b.updated < (b.capacity - b.tokens) / b.refill_per_second
+        }
+
+
+class MongoRateLimitStore:
+    """
+    Token buckets shared by every worker, one `rate_limits` document per key.
+
+    Refill and take happen in a single pipeline update, so concurrent requests
+    on different workers cannot both spend the last token. Idle buckets expire
+    through a TTL index once they would have refilled completely.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def ensure_indexes(self):
+        await self.db.rate_limits.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+    async def acquire(self, key: str, burst: float, per_second: float) -> Tuple[bool, float]:
+        now = time.time()
+        refilled = {"$min": [burst, {"$add": [
+            {"$ifNull": ["$tokens", burst]},
+            {"$multiply": [{"$max": [{"$subtract": [now, {"$ifNull": ["$updated", now]}]}, 0]}, per_second]}
+        ]}]}
+        bucket = await self.db.rate_limits.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=burst / per_second),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket["allowed"]:
+            return True, 0.0
+        return False, (1 - bucket["tokens"]) / per_second
+
+
+class RateLimiter:
+    """
+    Per-user, per-route-class request limits.
+
+    Requests are keyed by the user behind their session token. Unauthenticated
+    requests and tokens that resolve to no live session share their client
+    address's bucket, so sending a fresh made-up token each time buys nothing.
+    A token's user is looked up through `session_lookup` and remembered for a
+    few minutes (unknown tokens for less); an uncached token is charged to its
+    client address before the lookup, so lookups are bounded by that
+    address's allowance.
+    With the memory store every worker enforces its share of the limit
+    (limit / workers); with a shared store the expensive classes are counted
+    exactly across workers and the `default` class, which guards cheap CRUD
+    reads, stays in memory so hot paths never pay a round trip.
+    """
+
+    LOCAL_CLASSES = {"default"}
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        workers: int = 1,
+        shared_store=None,
+        session_lookup: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.session_lookup = session_lookup
+        self.memory = MemoryRateLimitStore()
+        self.shared_store = shared_store
+        self.limits = {}
+        for name, (burst, per_minute) in limits.items():
+            shared = shared_store is not None and name not in self.LOCAL_CLASSES
+            share = 1 if shared else workers
+            self.limits[name] = (max(burst / share, 1.0), per_minute / 60 / share, shared)
+        # token -> (user_id, or None for no session; monotonic expiry)
+        self._users: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def remember_session(self, token: str, user_id: Optional[str], ttl: float = SESSION_CACHE_SECONDS):
+        if len(self._users) >= MAX_CACHED_SESSIONS:
+            now = time.monotonic()
+            self._users = {t: entry for t, entry in self._users.items() if entry[1] > now}
+            if len(self._users) >= MAX_CACHED_SESSIONS:
+                self._users.clear()
+        self._users[token] = (user_id, time.monotonic() + ttl)
+
+    def forget_session(self, token: str):
+        """
+        Drop a token on logout, so its requests stop counting against the user
+        """
+        self._users.pop(token, None)
+
+    @staticmethod
+    def session_token(scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                start = value.find(b"session_token=")
+                if start != -1 and (start == 0 or value[start - 1:start] in b" ;"):
+                    end = value.find(b";", start)
+                    return value[start + 14:end if end != -1 else None].decode("latin-1").strip() or None
+            elif name == b"authorization" and value[:7].lower() == b"bearer ":
+                return value[7:].decode("latin-1").strip() or None
+        return None
+
+    @staticmethod
+    def client_key(scope) -> str:
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def cached_user(self, token: str) -> Tuple[bool, Optional[str]]:
+        """
+        (known, user_id); user_id is None for a token remembered as having no session
+        """
+        entry = self._users.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            return False, None
+        return True, entry[0]
+
+    async def lookup_user(self, token: str) -> Optional[str]:
+        if self.session_lookup is None:
+            return None
+        try:
+            user_id = await self.session_lookup(token)
+        except Exception as e:
+            # Not remembered: the next request retries the lookup
+            logger.warning(f"Rate limit session lookup failed: {str(e)}")
+            return None
+        self.remember_session(token, user_id, SESSION_CACHE_SECONDS if user_id is not None else UNKNOWN_SESSION_CACHE_SECONDS)
+        return user_id
+
+    async def acquire(self, name: str, key: str) -> float:
+        """
+        Seconds to wait before `key` may make a request of class `name`; 0 to proceed
+        """
+        burst, per_second, shared = self.limits[name]
+        key = f"{name}:{key}"
+        if not shared:
+            allowed, retry_after = self.memory.acquire_now(key, burst, per_second)
+        else:
+            try:
+                allowed, retry_after = await self.shared_store.acquire(key, burst, per_second)
+            except Exception as e:
+                # A limiter outage must not take the API down with it
+                logger.warning(f"Shared rate limit check failed, allowing request: {str(e)}")
+                return 0.0
+        return 0.0 if allowed else retry_after
+
+    async def check(self, scope) -> Tuple[Optional[str], float]:
+        """
+        (route class, seconds to wait); 0 means the request may proceed
+        """
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            return None, 0.0
+        token = self.session_token(scope)
+        if token is None:
+            return name, await self.acquire(name, self.client_key(scope))
+        known, user_id = self.cached_user(token)
+        if not known:
+            # Charge the client address first, so unknown tokens cannot buy unlimited lookups
+            retry_after = await self.acquire(name, self.client_key(scope))
+            if retry_after:
+                return name, retry_after
+            user_id = await self.lookup_user(token)
+            if user_id is None:
+                return name, 0.0
+        return name, await self.acquire(name, user_id if user_id is not None else self.client_key(scope))
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware answering 429 with Retry-After once a user's bucket for the route class is empty
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            return await self.app(scope, receive, send)
+        name, retry_after = await self.limiter.check(scope)
+        if not retry_after:
+            return await self.app(scope, receive, send)
+        body = json.dumps({"detail": "Too many requests", "limit": name}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+def to_utc(value) -> datetime:
+    """
+    Parse a stored reminder_date (ISO string or datetime) into an aware UTC datetime
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ReminderScheduler:
+    """
+    Fires due reminders from an in-memory min-heap keyed on reminder_date.
+
+    Only a sliding window of pending reminders (due before now + horizon, at most
+    batch_size of them) is held in memory. The window is read through the
+    (completed, notified_at, reminder_date) index, so there are no full
+    collection scans however many reminders are pending. A reminder is fired by
+    atomically setting notified_at; that makes firing idempotent across
+    restarts and workers, and silently skips reminders completed or deleted
+    after they were loaded.
+    """
+
+    def __init__(
+        self,
+        db,
+        on_due: Callable[[Dict], Awaitable[None]],
+        horizon: timedelta = timedelta(minutes=10),
+        batch_size: int = 5000,
+        max_sleep: float = 60.0
+    ):
+        self.db = db
+        self.on_due = on_due
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self._heap: List[Tuple[datetime, str]] = []
+        self._scheduled: Set[str] = set()
+        self._loaded_until: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.db.reminders.create_index([("completed", 1), ("notified_at", 1), ("reminder_date", 1)])
+        await self.normalize_dates()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def normalize_dates(self):
+        """
+        One-time migration: rewrite every stored reminder_date as a UTC ISO string.
+
+        The window query compares reminder_date as strings, which only orders
+        instants correctly when all of them are written the same way. Reminders
+        stored before dates were normalized may be naive, carry another offset,
+        or be BSON datetimes. Recorded in `migrations` once done; rerunning it
+        is harmless.
+        """
+        if await self.db.migrations.find_one({"_id": "reminder_date_utc"}):
+            return
+        fixed = 0
+        operations = []
+        cursor = self.db.reminders.find({"reminder_date": {"$not": {"$regex": r"\+00:00$"}}}, {"_id": 1, "reminder_date": 1})
+        async for doc in cursor:
+            try:
+                normalized = to_utc(doc["reminder_date"]).isoformat()
+            except (TypeError, ValueError):
+                logger.warning(f"Reminder {doc['_id']} has an unreadable reminder_date {doc['reminder_date']!r}")
+                continue
+            operations.append(UpdateOne({"_id": doc["_id"], "reminder_date": doc["reminder_date"]}, {"$set": {"reminder_date": normalized}}))
+            if len(operations) >= 1000:
+                fixed += (await self.db.reminders.bulk_write(operations, ordered=False)).modified_count
+                operations = []
+        if operations:
+            fixed += (await self.db.reminders.bulk_write(operations, ordered=False)).modified_count
+        await self.db.migrations.update_one(
+            {"_id": "reminder_date_utc"},
+            {"$set": {"done_at": datetime.now(timezone.utc).isoformat(), "fixed": fixed}},
+            upsert=True
+        )
+        logger.info(f"Normalized reminder_date of {fixed} reminders to UTC")
+
+    def schedule(self, reminder_id: str, reminder_date):
+        """
+        Register a newly created reminder; ones beyond the loaded window are picked up by a later load
+        """
+        due = to_utc(reminder_date)
+        if self._loaded_until is None or due > self._loaded_until or reminder_id in self._scheduled:
+            return
+        heapq.heappush(self._heap, (due, reminder_id))
+        self._scheduled.add(reminder_id)
+        self._wakeup.set()
+
+    async def _load_window(self, now: datetime):
+        horizon = now + self.horizon
+        cursor = self.db.reminders.find(
+            {
+                "completed": False,
+                "notified_at": None,
+                "reminder_date": {"$lte": horizon.isoformat()}
+            },
+            {"_id": 0, "reminder_id": 1, "reminder_date": 1}
+        ).sort("reminder_date", 1).limit(self.batch_size)
+        docs = await cursor.to_list(self.batch_size)
+
+        for doc in docs:
+            if doc["reminder_id"] in self._scheduled:
+                continue
+            heapq.heappush(self._heap, (to_utc(doc["reminder_date"]), doc["reminder_id"]))
+            self._scheduled.add(doc["reminder_id"])
+
+        # A full batch means the window was truncated; only trust it up to the last loaded reminder
+        if len(docs) >= self.batch_size:
+            self._loaded_until = to_utc(docs[-1]["reminder_date"])
+        else:
+            self._loaded_until = horizon
+
+    async def _fire(self, reminder_id: str, now: datetime):
+        result = await self.db.reminders.update_one(
+            {"reminder_id": reminder_id, "completed": False, "notified_at": None},
+            {"$set": {"notified_at": now.isoformat()}}
+        )
+        if result.modified_count == 0:
+            return
+        reminder = await self.db.reminders.find_one({"reminder_id": reminder_id}, {"_id": 0})
+        if reminder:
+            await self.on_due(reminder)
+
+    async def _run(self):
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                if self._loaded_until is None or now >= self._loaded_until:
+                    await self._load_window(now)
+
+                while self._heap and self._heap[0][0] <= now:
+                    _, reminder_id = heapq.heappop(self._heap)
+                    self._scheduled.discard(reminder_id)
+                    await self._fire(reminder_id, now)
+
+                next_wake = self._loaded_until
+                if self._heap and self._heap[0][0] < next_wake:
+                    next_wake = self._heap[0][0]
+                timeout = min(max((next_wake - datetime.now(timezone.utc)).total_seconds(), 0), self.max_sleep)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {str(e)}")
+                timeout = self.max_sleep
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
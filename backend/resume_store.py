@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from job_analysis import RESUME_TOKEN_BUDGET, compact_text
+from llm_client import count_tokens
+from match_scoring import ResumeProfile
+
+# Fields only needed when a resume is used, never when listing them
+HEAVY_FIELDS = {"text": 0, "prompt_text": 0, "features": 0}
+
+
+class StoredResume:
+    """
+    A resume as AI requests and scoring use it: the compacted prompt text and the precomputed profile
+    """
+
+    __slots__ = ("resume_id", "version", "revision", "prompt_text", "profile")
+
+    def __init__(self, resume_id: str, version: str, revision: str, prompt_text: str, profile: ResumeProfile):
+        self.resume_id = resume_id
+        self.version = version
+        self.revision = revision
+        self.prompt_text = prompt_text
+        self.profile = profile
+
+
+class ResumeStore:
+    """
+    Per-user resumes, one document per version label (matching Job.resume_version).
+
+    Tokenization, skill extraction and prompt compaction happen once on upload;
+    the results are stored with the resume and kept in a small in-process LRU
+    cache. Each save gets a new revision id, so a lookup only has to read
+    (resume_id, revision) from Mongo to know whether the cached copy is current,
+    which keeps workers consistent without cross-process invalidation.
+    """
+
+    def __init__(self, db, cache_size: int = 512):
+        self.db = db
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, StoredResume]" = OrderedDict()
+
+    async def ensure_indexes(self):
+        await self.db.resumes.create_index([("user_id", 1), ("resume_id", 1)], unique=True)
+        await self.db.resumes.create_index([("user_id", 1), ("version", 1)], unique=True)
+
+    async def save(self, user_id: str, version: str, text: str) -> Dict:
+        """
+        Create the version or replace its content; the resume_id is stable across replacements
+        """
+        # Tokenizing and compacting a long resume is CPU work; keep it off the event loop
+        profile, prompt_text = await asyncio.to_thread(self._prepare, text)
+        now = datetime.now(timezone.utc).isoformat()
+        resume = await self.db.resumes.find_one_and_update(
+            {"user_id": user_id, "version": version},
+            {
+                "$set": {
+                    "text": text,
+                    "prompt_text": prompt_text,
+                    "features": profile.to_features(),
+                    "skills": sorted(profile.skills),
+                    "token_count": count_tokens(prompt_text),
+                    "revision": uuid.uuid4().hex[:12],
+                    "updated_at": now
+                },
+                "$setOnInsert": {"resume_id": f"resume_{uuid.uuid4().hex[:12]}", "created_at": now}
+            },
+            projection={"_id": 0, **HEAVY_FIELDS},
+            upsert=True,
+            return_document=True
+        )
+        self._cache.pop(resume["resume_id"], None)
+        return resume
+
+    @staticmethod
+    def _prepare(text: str) -> Tuple[ResumeProfile, str]:
+        return ResumeProfile.from_text(text), compact_text(text, RESUME_TOKEN_BUDGET)
+
+    async def list(self, user_id: str) -> List[Dict]:
+        return await self.db.resumes.find(
+            {"user_id": user_id}, {"_id": 0, **HEAVY_FIELDS}
+        ).sort("updated_at", -1).to_list(100)
+
+    async def get(self, user_id: str, resume_id: str) -> Optional[Dict]:
+        return await self.db.resumes.find_one({"user_id": user_id, "resume_id": resume_id}, {"_id": 0, "features": 0})
+
+    async def delete(self, user_id: str, resume_id: str) -> bool:
+        result = await self.db.resumes.delete_one({"user_id": user_id, "resume_id": resume_id})
+        self._cache.pop(resume_id, None)
+        return result.deleted_count > 0
+
+    async def resolve(self, user_id: str, resume_id: Optional[str] = None, version: Optional[str] = None) -> Optional[StoredResume]:
+        """
+        Look up a resume by id, by version label, or the most recently updated one when neither is given
+        """
+        query = {"user_id": user_id}
+        if resume_id:
+            query["resume_id"] = resume_id
+        elif version:
+            query["version"] = version
+        head = await self.db.resumes.find_one(
+            query, {"_id": 0, "resume_id": 1, "revision": 1}, sort=[("updated_at", -1)]
+        )
+        if not head:
+            return None
+        return await self._load(head["resume_id"], head["revision"])
+
+    async def resolve_versions(self, user_id: str, versions: List[str]) -> Dict[str, StoredResume]:
+        """
+        Resumes for a set of Job.resume_version labels in one query; unknown labels are left out
+        """
+        if not versions:
+            return {}
+        heads = await self.db.resumes.find(
+            {"user_id": user_id, "version": {"$in": list(versions)}},
+            {"_id": 0, "resume_id": 1, "version": 1, "revision": 1}
+        ).to_list(len(versions))
+        resolved = {}
+        for head in heads:
+            resume = await self._load(head["resume_id"], head["revision"])
+            if resume:
+                resolved[head["version"]] = resume
+        return resolved
+
+    async def _load(self, resume_id: str, revision: str) -> Optional[StoredResume]:
+        cached = self._cache.get(resume_id)
+        if cached is not None and cached.revision == revision:
+            self._cache.move_to_end(resume_id)
+            return cached
+
+        doc = await self.db.resumes.find_one(
+            {"resume_id": resume_id}, {"_id": 0, "resume_id": 1, "version": 1, "revision": 1, "prompt_text": 1, "features": 1}
+        )
+        if not doc:
+            return None
+        resume = StoredResume(
+            doc["resume_id"], doc["version"], doc["revision"], doc["prompt_text"], ResumeProfile.from_features(doc["features"])
+        )
+        self._cache[resume_id] = resume
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return resume
@@ -0,0 +1,64 @@
+"""
+Production entry point for the JobFlow API
+
+Runs uvicorn with one process per worker. Each worker opens its own MongoDB
+and HTTP connection pools in the app's lifespan handler, sized from the
+connection budgets divided by the worker count, and warms up (indexes,
+tokenizer) before it reports ready. uvloop and httptools are used when
+installed. With more than one worker, live events are relayed from MongoDB
+change streams (EVENT_SOURCE=changestream, the default), which needs a
+replica set.
+
+Usage (from backend/):
+    python serve.py --workers 4 --port 8001
+    WEB_CONCURRENCY=4 MONGO_POOL_BUDGET=200 python serve.py
+"""
+import argparse
+import importlib.util
+import os
+
+import uvicorn
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default=os.environ.get("UVICORN_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default=os.environ.get("UVICORN_HTTP", "auto"))
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    args = parser.parse_args()
+
+    loop = args.loop if args.loop != "auto" else ("uvloop" if available("uvloop") else "asyncio")
+    http = args.http if args.http != "auto" else ("httptools" if available("httptools") else "h11")
+
+    # Live events must cross workers; refuse here rather than have every worker fail at startup
+    event_source = os.environ.get("EVENT_SOURCE") or ("changestream" if args.workers > 1 else "local")
+    if event_source == "local" and args.workers > 1:
+        parser.error("EVENT_SOURCE=local only reaches clients of the worker that made the write; "
+                     "use EVENT_SOURCE=changestream (needs a replica set) or --workers 1")
+
+    # Workers are spawned fresh and read this to size their pools
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    uvicorn.run(
+        "server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        timeout_keep_alive=30,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,130 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Cookie, Response, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Cookie, Header, Response, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
+import hmac
+import json
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, ValidationError, field_validator
+from typing import List, Literal, Optional, Dict, Any, Tuple
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-import requests
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-from job_scraper import job_scraper
+from event_bus import event_bus, ChangeStreamRelay
+from reminder_scheduler import ReminderScheduler, to_utc
+from task_generator import DailyTaskGenerator, GOAL_TASK_TYPES
+from metrics import MongoCommandListener, install_metrics_middleware, render_metrics, track
+from llm_client import LLMClient, LLMOverloaded, LLMRateLimited, count_tokens
+from match_scoring import Corpus, resume_profile, score_jobs
+from resume_store import ResumeStore
+from similarity_index import SimilarityIndex
+from analytics import JobAnalytics, ROLLUP_FIELDS
+from job_text import JobTextStore, WITHOUT_TEXT, split_text
+from job_extract import ExtractionError, JobExtractor
+from job_posting import JobPosting, postings_to_dicts
+from profiling import Profiler, ProfileStore, ProfilingMiddleware, collapsed_stacks, tag_profile
+from rate_limit import MongoRateLimitStore, RateLimiter, RateLimitMiddleware, limits_from_env
+from data_access import Database, QUERY_POLICIES, QUERY_TIMEOUT_ERRORS, current_policy, mongo_client_options, query_policy
+from data_transfer import COLLECTIONS as EXPORT_COLLECTIONS, DataImporter, export_csv, export_ndjson, iter_csv_records, iter_lines, iter_ndjson_records, stored_document
+from job_analysis import ANALYSIS_SYSTEM_MESSAGE, AnalysisParseError, build_analysis_prompt, parse_analysis
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Opened per worker by the lifespan handler (or bound directly with bind_database)
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Imported and opened on first use; CRUD-only workers never load aiohttp, BeautifulSoup or the LLM SDK
+http_session = None
+_job_scraper = None
 
-app = FastAPI()
-api_router = APIRouter(prefix="/api")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_worker()
+    try:
+        yield
+    finally:
+        await stop_worker()
+
+app = FastAPI(lifespan=lifespan)
+app.state.ready = False
+# Every API read gets the default deadline unless its route declares another policy
+api_router = APIRouter(prefix="/api", dependencies=[query_policy("default")])
 
 EMERGENT_AUTH_SESSION_URL = "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data"
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
+EVENT_KEEPALIVE_SECONDS = 15
+REMINDER_SCHEDULER_ENABLED = os.environ.get('REMINDER_SCHEDULER_ENABLED', 'true').lower() == 'true'
+TASK_GENERATION_ENABLED = os.environ.get('TASK_GENERATION_ENABLED', 'true').lower() == 'true'
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+SIMILARITY_INDEX_ENABLED = os.environ.get('SIMILARITY_INDEX_ENABLED', 'true').lower() == 'true'
+SIMILARITY_INDEX_PATH = os.environ.get('SIMILARITY_INDEX_PATH', str(ROOT_DIR / 'data' / 'similarity'))
+SIMILARITY_DIM = int(os.environ.get('SIMILARITY_DIM', '256'))
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_MB', '50')) * 1024 * 1024
+# Set by the process manager (serve.py, gunicorn, uvicorn --workers); connection budgets are split across workers
+WEB_CONCURRENCY = max(int(os.environ.get('WEB_CONCURRENCY', '1')), 1)
+# "local": handlers publish their own writes, which only reaches clients of the same worker;
+# "changestream": every worker relays MongoDB change streams (needs a replica set); "off": no live events
+EVENT_SOURCE = os.environ.get('EVENT_SOURCE') or ('changestream' if WEB_CONCURRENCY > 1 else 'local')
+MONGO_POOL_BUDGET = int(os.environ.get('MONGO_POOL_BUDGET', '100'))
+HTTP_POOL_BUDGET = int(os.environ.get('HTTP_POOL_BUDGET', '100'))
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', '2'))
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# "memory": each worker enforces its share of the limits; "mongo": search/AI/bulk limits are shared by all workers
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+# Profiling is off unless a token is set: send `X-Profile: <token>` to profile a request, and the same token as a Bearer to download
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_PATHS = os.environ.get('PROFILE_PATHS', '/api/jobs').split(',')
+
+def worker_pool_size(budget: int, minimum: int = 4) -> int:
+    return max(budget // WEB_CONCURRENCY, minimum)
+
+def llm_chat(*args, **kwargs):
+    from emergentintegrations.llm.chat import LlmChat
+    return LlmChat(*args, **kwargs)
+
+def llm_message(*args, **kwargs):
+    from emergentintegrations.llm.chat import UserMessage
+    return UserMessage(*args, **kwargs)
+
+async def get_job_scraper():
+    """
+    The scraper singleton, imported and given this worker's connection pool on the first search
+    """
+    global _job_scraper
+    if _job_scraper is None:
+        from job_scraper import job_scraper
+        await job_scraper.start(connection_limit=worker_pool_size(HTTP_POOL_BUDGET))
+        _job_scraper = job_scraper
+    return _job_scraper
+
+def get_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        import aiohttp
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=worker_pool_size(HTTP_POOL_BUDGET), ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    return http_session
+
+llm_client = LLMClient(
+    EMERGENT_LLM_KEY,
+    chat_factory=llm_chat,
+    message_factory=llm_message,
+    max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', '8')),
+    max_queue=int(os.environ.get('LLM_MAX_QUEUE', '32')),
+    user_burst=float(os.environ.get('LLM_USER_BURST', '5')),
+    user_refill_per_minute=float(os.environ.get('LLM_USER_PER_MINUTE', '10'))
+)
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -67,6 +166,15 @@ class Job(BaseModel):
     ai_match_score: Optional[int] = None
     ai_keywords: Optional[List[str]] = None
     ai_summary: Optional[List[str]] = None
+    ai_score_source: Optional[str] = None
+    tags: Optional[List[str]] = None
+    
+    @classmethod
+    def from_posting(cls, user_id: str, posting: JobPosting) -> "Job":
+        """
+        A saved job from a scraped posting, without the JobCreate round trip bulk-save used to make
+        """
+        return cls(user_id=user_id, tags=list(posting.tags) or None, **posting.job_fields())
 
 class JobCreate(BaseModel):
     title: str
@@ -77,6 +185,25 @@ class JobCreate(BaseModel):
     description: Optional[str] = None
     salary_range: Optional[str] = None
 
+class SearchResult(BaseModel):
+    """
+    A search result sent back to bulk-save in the shape /jobs/search returned it; JobCreate bodies also fit
+    """
+    title: str
+    company: str
+    location: Optional[str] = None
+    description: Optional[str] = None
+    posted_date: Optional[str] = None
+    job_url: Optional[str] = None
+    company_url: Optional[str] = None
+    salary_range: Optional[str] = None
+    is_remote: bool = False
+    source: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    
+    def to_posting(self) -> JobPosting:
+        return JobPosting.from_dict(self.model_dump(exclude_none=True))
+
 class JobUpdate(BaseModel):
     title: Optional[str] = None
     company: Optional[str] = None
@@ -92,6 +219,11 @@ class JobUpdate(BaseModel):
     contact_person: Optional[str] = None
     applied_date: Optional[datetime] = None
     interview_date: Optional[datetime] = None
+    ai_match_score: Optional[int] = None
+    ai_keywords: Optional[List[str]] = None
+    ai_summary: Optional[List[str]] = None
+    ai_score_source: Optional[str] = None
+    tags: Optional[List[str]] = None
 
 class DailyGoals(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -131,8 +263,15 @@ class Reminder(BaseModel):
     reminder_date: datetime
     message: str
     completed: bool = False
+    notified_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    # Stored in UTC, also when imported, so reminder_date strings sort chronologically for the scheduler's range queries
+    @field_validator("reminder_date")
+    @classmethod
+    def reminder_date_in_utc(cls, value: datetime) -> datetime:
+        return to_utc(value)
+
 class ReminderCreate(BaseModel):
     job_id: str
     reminder_date: datetime
@@ -141,6 +280,13 @@ class ReminderCreate(BaseModel):
 class AIAnalysisRequest(BaseModel):
     job_description: str
     user_resume: Optional[str] = None
+    # Stored resume to use instead of sending the text; resume_version matches Job.resume_version
+    resume_id: Optional[str] = None
+    resume_version: Optional[str] = None
+
+class ResumeCreate(BaseModel):
+    version: str = Field(min_length=1, max_length=100)
+    text: str = Field(min_length=1, max_length=100000)
 
 class AIEmailRequest(BaseModel):
     job_title: str
@@ -148,7 +294,81 @@ class AIEmailRequest(BaseModel):
     recipient_name: Optional[str] = None
     email_type: str
 
+def publish_change(user_id: str, event_type: str, data: Any):
+    if EVENT_SOURCE != "local":
+        return
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    event_bus.publish(user_id, event_type, data)
+
+async def publish_due_reminder(reminder: Dict):
+    # With change streams the relay publishes reminder.due on every worker when notified_at is set
+    publish_change(reminder["user_id"], "reminder.due", reminder)
+
+reminder_scheduler = ReminderScheduler(None, on_due=publish_due_reminder)
+change_stream_relay = ChangeStreamRelay(None, event_bus)
+task_generator = DailyTaskGenerator(None, default_goals={field: DailyGoals.model_fields[field].default for field in GOAL_TASK_TYPES})
+resume_store = ResumeStore(None)
+analytics = JobAnalytics(None)
+job_texts = JobTextStore(None)
+job_extractor = JobExtractor(None)
+rate_limit_store = MongoRateLimitStore(None) if RATE_LIMIT_BACKEND == 'mongo' else None
+
+async def session_user_id(token: str) -> Optional[str]:
+    """
+    The user behind a live session token, or None for unknown and expired tokens
+    """
+    session_doc = await db.user_sessions.find_one({"session_token": token}, {"_id": 0, "user_id": 1, "expires_at": 1})
+    if not session_doc:
+        return None
+    expires_at = session_doc.get("expires_at")
+    if isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    if expires_at is not None:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at < datetime.now(timezone.utc):
+            return None
+    return session_doc["user_id"]
+
+rate_limiter = RateLimiter(
+    limits_from_env(),
+    workers=WEB_CONCURRENCY,
+    shared_store=rate_limit_store,
+    session_lookup=session_user_id,
+    enabled=RATE_LIMIT_ENABLED
+)
+profile_store = ProfileStore(None, retention=timedelta(days=int(os.environ.get('PROFILE_RETENTION_DAYS', '7'))))
+profiler = Profiler(
+    profile_store,
+    PROFILING_TOKEN,
+    sample_rate=PROFILE_SAMPLE_RATE,
+    paths=PROFILE_PATHS,
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', '1')) / 1000,
+    backend=os.environ.get('PROFILER', 'sampler')
+)
+similarity_index = SimilarityIndex(SIMILARITY_INDEX_PATH, dim=SIMILARITY_DIM)
+# Both event sources go through the bus, so the index sees every job write
+event_bus.add_listener(similarity_index.on_event)
+background_tasks: List[asyncio.Task] = []
+
+def bind_database(database):
+    """
+    Point the handlers and every service at a database (the worker's own client, or a test double)
+    """
+    global db
+    db = database if isinstance(database, Database) else Database(database)
+    for service in (reminder_scheduler, change_stream_relay, task_generator, resume_store, analytics, job_texts, job_extractor, rate_limit_store, profile_store):
+        if service is not None:
+            service.db = db
+
 async def get_current_user(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None) -> User:
+    with track("auth", "session"):
+        user = await _resolve_session_user(session_token, authorization)
+    tag_profile(user_id=user.user_id)
+    return user
+
+async def _resolve_session_user(session_token: Optional[str], authorization: Optional[str]) -> User:
     token = session_token
     if not token and authorization:
         parts = authorization.split()
@@ -184,9 +404,9 @@ async def get_current_user(request: Request, session_token: Optional[str] = Cook
 async def create_session(session_request: SessionRequest, response: Response):
     headers = {"X-Session-ID": session_request.session_id}
     try:
-        resp = requests.get(EMERGENT_AUTH_SESSION_URL, headers=headers, timeout=10)
-        resp.raise_for_status()
-        auth_data = resp.json()
+        async with get_http_session().get(EMERGENT_AUTH_SESSION_URL, headers=headers) as resp:
+            resp.raise_for_status()
+            auth_data = await resp.json()
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to validate session: {str(e)}")
     
@@ -245,14 +465,18 @@ async def get_me(request: Request, session_token: Optional[str] = Cookie(None),
 async def logout(request: Request, response: Response, session_token: Optional[str] = Cookie(None)):
     if session_token:
         await db.user_sessions.delete_one({"session_token": session_token})
+        rate_limiter.forget_session(session_token)
     
     response.delete_cookie(key="session_token", path="/", samesite="none", secure=True)
     return {"message": "Logged out successfully"}
 
-@api_router.get("/jobs", response_model=List[Job])
+@api_router.get("/jobs", response_model=List[Job], dependencies=[query_policy("list")])
 async def get_jobs(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    jobs = await db.jobs.find({"user_id": user.user_id}, {"_id": 0}).to_list(1000)
+    return await read_jobs(user.user_id)
+
+async def read_jobs(user_id: str) -> List[Dict]:
+    jobs = await db.jobs.find({"user_id": user_id}, WITHOUT_TEXT).to_list(1000)
     
     for job in jobs:
         for date_field in ["date_added", "applied_date", "interview_date"]:
@@ -264,24 +488,58 @@ async def get_jobs(request: Request, session_token: Optional[str] = Cookie(None)
 @api_router.post("/jobs", response_model=Job)
 async def create_job(job_data: JobCreate, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    
-    job = Job(user_id=user.user_id, **job_data.model_dump())
+    return await insert_job(user.user_id, job_data)
+
+async def insert_job(user_id: str, job_data: JobCreate) -> Job:
+    job = Job(user_id=user_id, **job_data.model_dump())
     job_dict = job.model_dump()
     
     for date_field in ["date_added", "applied_date", "interview_date"]:
         if date_field in job_dict and job_dict[date_field]:
             job_dict[date_field] = job_dict[date_field].isoformat()
     
-    await db.jobs.insert_one(job_dict)
+    row, texts = split_text(job_dict)
+    # Texts first, so a reader that sees the job also finds its description
+    await job_texts.save(user_id, job.job_id, texts)
+    await db.jobs.insert_one(row)
+    await analytics.record(None, row)
+    publish_change(user_id, "job.created", job)
     return job
 
+class JobFromUrlRequest(BaseModel):
+    url: str
+    # False: return the extracted fields to pre-fill the form; True: create the job right away
+    save: bool = False
+
+@api_router.post("/jobs/from-url")
+async def create_job_from_url(from_url_request: JobFromUrlRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    try:
+        fields, cached = await job_extractor.extract(from_url_request.url, await get_job_scraper())
+    except ExtractionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Keep the link the user pasted; the canonical one is only the cache key
+    fields = {**fields, "job_url": from_url_request.url}
+    
+    if not from_url_request.save:
+        return {"job": fields, "cached": cached, "saved": False}
+    if not fields.get("company"):
+        raise HTTPException(status_code=422, detail="Could not find the company on this page")
+    job = await insert_job(user.user_id, JobCreate(**fields))
+    return {"job": job, "cached": cached, "saved": True}
+
 @api_router.get("/jobs/{job_id}", response_model=Job)
 async def get_job(job_id: str, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    job = await db.jobs.find_one({"job_id": job_id, "user_id": user.user_id}, {"_id": 0})
+    job, texts = await asyncio.gather(
+        db.jobs.find_one({"job_id": job_id, "user_id": user.user_id}, {"_id": 0}),
+        job_texts.load(user.user_id, job_id)
+    )
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    job.update(texts)
     
     for date_field in ["date_added", "applied_date", "interview_date"]:
         if date_field in job and job[date_field] and isinstance(job[date_field], str):
@@ -289,42 +547,92 @@ async def get_job(job_id: str, request: Request, session_token: Optional[str] =
     
     return Job(**job)
 
+def job_update_fields(job_update: JobUpdate) -> Dict[str, Any]:
+    update_data = {k: v for k, v in job_update.model_dump(exclude_unset=True).items() if v is not None}
+    
+    for date_field in ["applied_date", "interview_date"]:
+        if date_field in update_data and update_data[date_field]:
+            update_data[date_field] = update_data[date_field].isoformat()
+    return update_data
+
+def stamp_applied_date(update_data: Dict[str, Any], existing: Dict) -> Dict[str, Any]:
+    """
+    Moving a job to "applied" records when, unless the job or the update already has an applied_date
+    """
+    if update_data.get("status") == "applied" and not existing.get("applied_date") and not update_data.get("applied_date"):
+        update_data["applied_date"] = datetime.now(timezone.utc).isoformat()
+    return update_data
+
 @api_router.patch("/jobs/{job_id}", response_model=Job)
 async def update_job(job_id: str, job_update: JobUpdate, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
     
-    existing_job = await db.jobs.find_one({"job_id": job_id, "user_id": user.user_id}, {"_id": 0})
+    existing_job = await db.jobs.find_one({"job_id": job_id, "user_id": user.user_id}, ROLLUP_FIELDS)
     if not existing_job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    update_data = {k: v for k, v in job_update.model_dump(exclude_unset=True).items() if v is not None}
-    
-    for date_field in ["applied_date", "interview_date"]:
-        if date_field in update_data and update_data[date_field]:
-            update_data[date_field] = update_data[date_field].isoformat()
+    update_data, text_data = split_text(job_update_fields(job_update))
+    stamp_applied_date(update_data, existing_job)
     
+    if text_data:
+        await job_texts.save(user.user_id, job_id, text_data)
     if update_data:
         await db.jobs.update_one(
             {"job_id": job_id, "user_id": user.user_id},
             {"$set": update_data}
         )
     
-    updated_job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    # The response carries the job's short fields plus any texts that were just written
+    updated_job = await db.jobs.find_one({"job_id": job_id}, WITHOUT_TEXT)
+    await analytics.record(existing_job, updated_job)
+    updated_job.update(text_data)
+    if "title" in update_data and "description" not in text_data:
+        # Listeners such as the similarity index re-vectorize from title and description
+        updated_job.update(await job_texts.load(user.user_id, job_id, ["description"]))
     
     for date_field in ["date_added", "applied_date", "interview_date"]:
         if date_field in updated_job and updated_job[date_field] and isinstance(updated_job[date_field], str):
             updated_job[date_field] = datetime.fromisoformat(updated_job[date_field])
     
-    return Job(**updated_job)
+    job = Job(**updated_job)
+    publish_change(user.user_id, "job.updated", job)
+    return job
+
+@api_router.get("/jobs/{job_id}/similar")
+async def get_similar_jobs(job_id: str, limit: int = 10, request: Request = None, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    job = await db.jobs.find_one({"job_id": job_id, "user_id": user.user_id}, SimilarityIndex.FIELDS)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    vector = similarity_index.vector(job_id)
+    if vector is None:
+        await job_texts.attach(user.user_id, [job], ["description"])
+        vector = similarity_index.vectorizer.transform([job])[0]
+    matches = similarity_index.query(user.user_id, vector, k=min(max(limit, 1), 50), exclude=job_id)
+    if not matches:
+        return []
+    
+    # The index can briefly hold jobs deleted through another worker; only return ones that still exist
+    docs = await db.jobs.find(
+        {"user_id": user.user_id, "job_id": {"$in": [match_id for match_id, _ in matches]}},
+        WITHOUT_TEXT
+    ).to_list(len(matches))
+    by_id = {doc["job_id"]: doc for doc in docs}
+    return [{**by_id[match_id], "similarity": round(score, 4)} for match_id, score in matches if match_id in by_id]
 
 @api_router.delete("/jobs/{job_id}")
 async def delete_job(job_id: str, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    result = await db.jobs.delete_one({"job_id": job_id, "user_id": user.user_id})
+    deleted_job = await db.jobs.find_one_and_delete({"job_id": job_id, "user_id": user.user_id}, projection=ROLLUP_FIELDS)
     
-    if result.deleted_count == 0:
+    if not deleted_job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    await job_texts.delete([job_id])
+    await analytics.record(deleted_job, None)
+    publish_change(user.user_id, "job.deleted", {"job_id": job_id})
     return {"message": "Job deleted successfully"}
 
 class JobSearchRequest(BaseModel):
@@ -339,6 +647,7 @@ async def search_jobs(search_request: JobSearchRequest, request: Request, sessio
     user = await get_current_user(request, session_token, authorization)
     
     try:
+        job_scraper = await get_job_scraper()
         results = await job_scraper.search_jobs(
             query=search_request.query,
             location=search_request.location,
@@ -346,36 +655,318 @@ async def search_jobs(search_request: JobSearchRequest, request: Request, sessio
             experience_level=search_request.experience_level,
             max_results=search_request.max_results
         )
-        return {"jobs": results, "count": len(results)}
+        return {"jobs": postings_to_dicts(results), "count": len(results)}
     except Exception as e:
         logging.error(f"Job search error: {str(e)}")
         raise HTTPException(status_code=500, detail="Job search failed")
 
+@api_router.post("/jobs/search/stream")
+async def search_jobs_stream(search_request: JobSearchRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    async def event_stream():
+        total = 0
+        sources = {}
+        try:
+            job_scraper = await get_job_scraper()
+            async for source, jobs in job_scraper.stream_jobs(
+                query=search_request.query,
+                location=search_request.location,
+                remote_only=search_request.remote_only,
+                experience_level=search_request.experience_level,
+                max_results=search_request.max_results
+            ):
+                total += len(jobs)
+                sources[source] = len(jobs)
+                yield json.dumps({"type": "jobs", "source": source, "jobs": postings_to_dicts(jobs)}) + "\n"
+        except Exception as e:
+            logging.error(f"Job search stream error: {str(e)}")
+            yield json.dumps({"type": "error", "detail": "Job search failed"}) + "\n"
+        yield json.dumps({"type": "summary", "count": total, "sources": sources}) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+SCORE_PAGE_SIZE = 1000
+
+class JobScoreRequest(BaseModel):
+    user_resume: Optional[str] = None
+    resume_id: Optional[str] = None
+    job_ids: Optional[List[str]] = Field(None, max_length=SCORE_PAGE_SIZE)
+    overwrite: bool = False
+
+@api_router.post("/jobs/score")
+async def score_saved_jobs(score_request: JobScoreRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    # A resume given by the request applies to every page; otherwise jobs use their tagged version or the latest
+    fixed_profile = None
+    default = None
+    if score_request.user_resume:
+        fixed_profile = resume_profile(score_request.user_resume)
+    elif score_request.resume_id:
+        fixed_profile = (await require_resume(user.user_id, score_request.resume_id)).profile
+    else:
+        default = await resume_store.resolve(user.user_id)
+    
+    # IDF comes from the whole inbox, so a job scores the same however few jobs are scored with it
+    corpus = Corpus()
+    async for page in job_pages(user.user_id, {"title": 1, "description": 1}):
+        await asyncio.to_thread(corpus.add, page)
+    
+    scored = []
+    async for page in job_pages(
+        user.user_id,
+        {"title": 1, "description": 1, "resume_version": 1, "ai_match_score": 1, "ai_score_source": 1},
+        score_request.job_ids
+    ):
+        scored.extend(await score_job_page(user.user_id, page, score_request.overwrite, fixed_profile, default, corpus))
+    
+    # Only an explicit list of jobs gets its scores back; a whole-inbox run can be any size
+    if score_request.job_ids:
+        return {"scored": len(scored), "jobs": scored}
+    return {"scored": len(scored)}
+
+async def job_pages(user_id: str, projection: Dict, job_ids: Optional[List[str]] = None):
+    """
+    A user's jobs in pages of SCORE_PAGE_SIZE ordered by job_id, with their descriptions attached
+    """
+    job_filter = {"$in": job_ids} if job_ids else {}
+    while True:
+        page = await db.jobs.find(
+            {"user_id": user_id, **({"job_id": job_filter} if job_filter else {})},
+            {"_id": 0, "job_id": 1, **projection}
+        ).sort("job_id", 1).limit(SCORE_PAGE_SIZE).to_list(SCORE_PAGE_SIZE)
+        if not page:
+            return
+        if "description" in projection:
+            await job_texts.attach(user_id, page, ["description"])
+        yield page
+        if len(page) < SCORE_PAGE_SIZE:
+            return
+        job_filter["$gt"] = page[-1]["job_id"]
+
+async def score_job_page(user_id: str, jobs: List[Dict], overwrite: bool, fixed_profile, default, corpus: Corpus) -> List[Dict]:
+    # Scores from an on-demand LLM analysis are kept unless the caller asks to overwrite them
+    if not overwrite:
+        jobs = [job for job in jobs if job.get("ai_match_score") is None or job.get("ai_score_source") == "local"]
+    if not jobs:
+        return []
+    
+    if fixed_profile is not None:
+        resumes = [fixed_profile] * len(jobs)
+    else:
+        versions = list({job["resume_version"] for job in jobs if job.get("resume_version")})
+        by_version = await resume_store.resolve_versions(user_id, versions)
+        resumes = []
+        for job in jobs:
+            stored = by_version.get(job.get("resume_version")) or default
+            resumes.append(stored.profile if stored else None)
+    
+    # Scoring is CPU-bound; keep it off the event loop thread
+    results = await asyncio.to_thread(score_jobs, jobs, resumes=resumes, corpus=corpus)
+    
+    operations = []
+    scored = []
+    for job, (match_score, keywords) in zip(jobs, results):
+        fields = {"ai_keywords": keywords, "ai_score_source": "local"}
+        if match_score is not None:
+            fields["ai_match_score"] = match_score
+        operations.append(UpdateOne({"job_id": job["job_id"], "user_id": user_id}, {"$set": fields}))
+        scored.append({"job_id": job["job_id"], "ai_match_score": match_score, "ai_keywords": keywords})
+    await db.jobs.bulk_write(operations, ordered=False)
+    return scored
+
+MAX_BATCH_OPERATIONS = 5000
+BATCH_CHUNK_SIZE = 500
+
+class JobBatchOperation(BaseModel):
+    op: Literal["update", "delete", "set_status", "add_tags", "remove_tags"]
+    job_id: str
+    fields: Optional[JobUpdate] = None
+    status: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+class JobBatchRequest(BaseModel):
+    operations: List[JobBatchOperation]
+    # Stream per-item results as NDJSON while chunks complete
+    stream: bool = False
+
+def batch_write_model(operation: JobBatchOperation, existing: Dict, user_id: str):
+    """
+    The bulk_write model for one batch item, or an error message when the item is invalid.
+
+    Text fields of an update are left out of the model (None for a text-only update); `batch_text_fields` returns them.
+    """
+    job_filter = {"job_id": operation.job_id, "user_id": user_id}
+    if operation.op == "delete":
+        return DeleteOne(job_filter), None
+    if operation.op == "update":
+        update_data, text_data = split_text(job_update_fields(operation.fields) if operation.fields else {})
+        if not update_data and not text_data:
+            return None, "No fields to update"
+        stamp_applied_date(update_data, existing)
+        return (UpdateOne(job_filter, {"$set": update_data}) if update_data else None), None
+    if operation.op == "set_status":
+        if not operation.status:
+            return None, "status is required"
+        return UpdateOne(job_filter, {"$set": stamp_applied_date({"status": operation.status}, existing)}), None
+    if not operation.tags:
+        return None, "tags are required"
+    if operation.op == "add_tags":
+        return UpdateOne(job_filter, {"$addToSet": {"tags": {"$each": operation.tags}}}), None
+    return UpdateOne(job_filter, {"$pull": {"tags": {"$in": operation.tags}}}), None
+
+def batch_text_fields(operation: JobBatchOperation) -> Dict[str, Any]:
+    if operation.op != "update" or not operation.fields:
+        return {}
+    return split_text(job_update_fields(operation.fields))[1]
+
+async def apply_job_batch(user_id: str, chunk: List[Tuple[int, JobBatchOperation]]) -> List[Dict[str, Any]]:
+    """
+    Run one chunk of batch items as a single unordered bulk_write and report each item's outcome
+    """
+    job_ids = list({operation.job_id for _, operation in chunk})
+    before = {
+        doc["job_id"]: doc
+        for doc in await db.jobs.find({"user_id": user_id, "job_id": {"$in": job_ids}}, ROLLUP_FIELDS).to_list(len(job_ids))
+    }
+    
+    results = []
+    writes = []
+    write_results = []
+    deleted = set()
+    for index, operation in chunk:
+        result = {"index": index, "job_id": operation.job_id, "op": operation.op, "ok": True}
+        results.append(result)
+        existing = before.get(operation.job_id)
+        # Items apply in order: one after a delete of the same job finds nothing
+        if existing is None or operation.job_id in deleted:
+            result.update(ok=False, error="Job not found")
+            continue
+        model, error = batch_write_model(operation, existing, user_id)
+        if error:
+            result.update(ok=False, error=error)
+            continue
+        if operation.op == "delete":
+            deleted.add(operation.job_id)
+        if model is not None:
+            writes.append(model)
+            write_results.append(result)
+    
+    deletes = sum(1 for model in writes if isinstance(model, DeleteOne))
+    removed = deletes
+    if writes:
+        try:
+            removed = (await db.jobs.bulk_write(writes, ordered=False)).deleted_count
+        except BulkWriteError as e:
+            removed = e.details.get("nRemoved", 0)
+            for write_error in e.details.get("writeErrors", []):
+                write_results[write_error["index"]].update(ok=False, error=write_error.get("errmsg", "Write failed"))
+    
+    touched = list({result["job_id"] for result in results if result["ok"]})
+    after = {}
+    if touched:
+        after = {
+            doc["job_id"]: doc
+            for doc in await db.jobs.find({"user_id": user_id, "job_id": {"$in": touched}}, WITHOUT_TEXT).to_list(len(touched))
+        }
+    # Deleted by another request since `before` was read, so the update matched nothing
+    for result in results:
+        if result["ok"] and result["job_id"] not in deleted and result["job_id"] not in after:
+            result.update(ok=False, error="Job not found")
+    
+    succeeded = [operation for (_, operation), result in zip(chunk, results) if result["ok"]]
+    text_updates = [(operation.job_id, batch_text_fields(operation)) for operation in succeeded if operation.job_id in after]
+    await job_texts.save_many(user_id, text_updates)
+    await job_texts.delete([operation.job_id for operation in succeeded if operation.op == "delete"])
+    
+    touched = list({operation.job_id for operation in succeeded})
+    if touched:
+        for job_id, texts in text_updates:
+            after[job_id].update(texts)
+        if removed < deletes:
+            # Some of the deletes raced another request's; which ones is unknown, so recount from scratch
+            await analytics.invalidate([user_id])
+        await analytics.record_many((before[job_id], after.get(job_id)) for job_id in touched)
+        for job_id in touched:
+            if job_id in after:
+                publish_change(user_id, "job.updated", after[job_id])
+            else:
+                publish_change(user_id, "job.deleted", {"job_id": job_id})
+    return results
+
+@api_router.post("/jobs/batch")
+async def batch_jobs(batch_request: JobBatchRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    operations = batch_request.operations
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+    indexed = list(enumerate(operations))
+    chunks = [indexed[start:start + BATCH_CHUNK_SIZE] for start in range(0, len(indexed), BATCH_CHUNK_SIZE)]
+    
+    if not batch_request.stream:
+        results = []
+        for chunk in chunks:
+            results.extend(await apply_job_batch(user.user_id, chunk))
+        succeeded = sum(1 for result in results if result["ok"])
+        return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+    
+    async def result_stream():
+        succeeded = failed = 0
+        for chunk in chunks:
+            try:
+                results = await apply_job_batch(user.user_id, chunk)
+            except Exception as e:
+                logging.error(f"Job batch error: {str(e)}")
+                yield json.dumps({"type": "error", "detail": "Batch aborted", "index": chunk[0][0]}) + "\n"
+                break
+            for result in results:
+                succeeded += result["ok"]
+                failed += not result["ok"]
+                yield json.dumps({"type": "result", **result}) + "\n"
+        yield json.dumps({"type": "summary", "succeeded": succeeded, "failed": failed}) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
 @api_router.post("/jobs/bulk-save")
-async def bulk_save_jobs(jobs_data: List[JobCreate], request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+async def bulk_save_jobs(jobs_data: List[SearchResult], request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
     
     saved_jobs = []
+    saved_rows = []
+    saved_texts = []
     for job_data in jobs_data:
-        job = Job(user_id=user.user_id, **job_data.model_dump())
+        job = Job.from_posting(user.user_id, job_data.to_posting())
         job_dict = job.model_dump()
         
         for date_field in ["date_added", "applied_date", "interview_date"]:
             if date_field in job_dict and job_dict[date_field]:
                 job_dict[date_field] = job_dict[date_field].isoformat()
         
-        await db.jobs.insert_one(job_dict)
+        row, texts = split_text(job_dict)
         saved_jobs.append(job)
+        saved_rows.append(row)
+        saved_texts.append((job.job_id, texts))
     
-    return {"message": f"{len(saved_jobs)} jobs saved successfully", "count": len(saved_jobs)}
+    await job_texts.save_many(user.user_id, saved_texts)
+    for job, row in zip(saved_jobs, saved_rows):
+        await db.jobs.insert_one(row)
+        publish_change(user.user_id, "job.created", job)
+    
+    await analytics.record_many((None, row) for row in saved_rows)
+    return {"message": f"{len(saved_jobs)} jobs saved successfully", "count": len(saved_jobs), "job_ids": [job.job_id for job in saved_jobs]}
 
 @api_router.get("/goals", response_model=DailyGoals)
 async def get_goals(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    goals = await db.daily_goals.find_one({"user_id": user.user_id}, {"_id": 0})
+    return await read_goals(user.user_id)
+
+async def read_goals(user_id: str) -> DailyGoals:
+    goals = await db.daily_goals.find_one({"user_id": user_id}, {"_id": 0})
     
     if not goals:
-        default_goals = DailyGoals(user_id=user.user_id)
+        default_goals = DailyGoals(user_id=user_id)
         goals_dict = default_goals.model_dump()
         goals_dict["updated_at"] = goals_dict["updated_at"].isoformat()
         await db.daily_goals.insert_one(goals_dict)
@@ -410,13 +1001,17 @@ async def update_goals(goals_update: DailyGoalsUpdate, request: Request, session
     if isinstance(updated_goals["updated_at"], str):
         updated_goals["updated_at"] = datetime.fromisoformat(updated_goals["updated_at"])
     
-    return DailyGoals(**updated_goals)
+    goals = DailyGoals(**updated_goals)
+    publish_change(user.user_id, "goals.updated", goals)
+    return goals
 
-@api_router.get("/tasks", response_model=List[DailyTask])
+@api_router.get("/tasks", response_model=List[DailyTask], dependencies=[query_policy("list")])
 async def get_tasks(date: Optional[str] = None, request: Request = None, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    
-    query = {"user_id": user.user_id}
+    return await read_tasks(user.user_id, date)
+
+async def read_tasks(user_id: str, date: Optional[str] = None) -> List[Dict]:
+    query = {"user_id": user_id}
     if date:
         query["date"] = date
     
@@ -437,8 +1032,19 @@ async def create_task(task_data: DailyTaskCreate, date: str, request: Request, s
     task_dict["created_at"] = task_dict["created_at"].isoformat()
     
     await db.daily_tasks.insert_one(task_dict)
+    publish_change(user.user_id, "task.created", task)
     return task
 
+@api_router.post("/tasks/generate")
+async def generate_tasks(date: str, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    try:
+        date = datetime.strptime(date, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+    result = await task_generator.generate_for_users([user.user_id], date)
+    return {"created": result["tasks"], "already_generated": result["skipped"] > 0}
+
 @api_router.patch("/tasks/{task_id}")
 async def update_task(task_id: str, completed: bool, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
@@ -451,6 +1057,9 @@ async def update_task(task_id: str, completed: bool, request: Request, session_t
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    # The whole task, so a client that does not list it yet can add it
+    task = await db.daily_tasks.find_one({"task_id": task_id, "user_id": user.user_id}, {"_id": 0})
+    publish_change(user.user_id, "task.updated", task or {"task_id": task_id, "completed": completed})
     return {"message": "Task updated successfully"}
 
 @api_router.delete("/tasks/{task_id}")
@@ -462,15 +1071,19 @@ async def delete_task(task_id: str, request: Request, session_token: Optional[st
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    publish_change(user.user_id, "task.deleted", {"task_id": task_id})
     return {"message": "Task deleted successfully"}
 
-@api_router.get("/reminders", response_model=List[Reminder])
+@api_router.get("/reminders", response_model=List[Reminder], dependencies=[query_policy("list")])
 async def get_reminders(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
-    reminders = await db.reminders.find({"user_id": user.user_id}, {"_id": 0}).to_list(1000)
+    return await read_reminders(user.user_id)
+
+async def read_reminders(user_id: str) -> List[Dict]:
+    reminders = await db.reminders.find({"user_id": user_id}, {"_id": 0}).to_list(1000)
     
     for reminder in reminders:
-        for date_field in ["reminder_date", "created_at"]:
+        for date_field in ["reminder_date", "notified_at", "created_at"]:
             if date_field in reminder and isinstance(reminder[date_field], str):
                 reminder[date_field] = datetime.fromisoformat(reminder[date_field])
     
@@ -486,6 +1099,8 @@ async def create_reminder(reminder_data: ReminderCreate, request: Request, sessi
     reminder_dict["created_at"] = reminder_dict["created_at"].isoformat()
     
     await db.reminders.insert_one(reminder_dict)
+    reminder_scheduler.schedule(reminder.reminder_id, reminder.reminder_date)
+    publish_change(user.user_id, "reminder.created", reminder)
     return reminder
 
 @api_router.patch("/reminders/{reminder_id}")
@@ -500,6 +1115,9 @@ async def update_reminder(reminder_id: str, completed: bool, request: Request, s
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
+    # The whole reminder: the dashboard drops completed ones, and one marked incomplete again has to rejoin the list
+    reminder = await db.reminders.find_one({"reminder_id": reminder_id, "user_id": user.user_id}, {"_id": 0})
+    publish_change(user.user_id, "reminder.updated", reminder or {"reminder_id": reminder_id, "completed": completed})
     return {"message": "Reminder updated successfully"}
 
 @api_router.delete("/reminders/{reminder_id}")
@@ -511,113 +1129,273 @@ async def delete_reminder(reminder_id: str, request: Request, session_token: Opt
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
+    publish_change(user.user_id, "reminder.deleted", {"reminder_id": reminder_id})
     return {"message": "Reminder deleted successfully"}
 
-@api_router.post("/ai/analyze-job")
-async def analyze_job(analysis_request: AIAnalysisRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+def import_normalizer(model):
+    def normalize(data: Dict, user_id: str) -> Dict:
+        # Blank CSV cells and explicit nulls fall back to the model defaults (fresh ids, timestamps)
+        fields = {k: v for k, v in data.items() if v is not None}
+        return stored_document(model(**{**fields, "user_id": user_id}))
+    return normalize
+
+IMPORT_NORMALIZERS = {
+    "job": import_normalizer(Job),
+    "task": import_normalizer(DailyTask),
+    "reminder": import_normalizer(Reminder),
+    "goals": import_normalizer(DailyGoals),
+}
+
+@api_router.get("/export", dependencies=[query_policy("export")])
+async def export_data(format: str = "ndjson", collections: str = "jobs,tasks,reminders,goals", request: Request = None, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
     
-    try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"analyze_{user.user_id}_{uuid.uuid4().hex[:8]}",
-            system_message="You are a career advisor AI. Analyze job descriptions and provide match scores, missing keywords, and tailored summaries."
-        ).with_model("openai", "gpt-5.2")
-        
-        prompt = f"""Analyze this job description and provide:
-1. A match score (0-100) based on general job market fit
-2. Key skills/keywords required (list 5-8 important ones)
-3. A concise 3-5 bullet point summary of the role
+    names = [name.strip() for name in collections.split(",") if name.strip()]
+    if not names or any(name not in EXPORT_COLLECTIONS for name in names):
+        raise HTTPException(status_code=400, detail=f"collections must be a subset of {', '.join(EXPORT_COLLECTIONS)}")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    
+    if format == "ndjson":
+        body = export_ndjson(db, user.user_id, names)
+        media_type, filename = "application/x-ndjson", f"jobflow-export-{stamp}.ndjson"
+    elif format == "csv":
+        # A CSV file holds one collection
+        if len(names) != 1:
+            raise HTTPException(status_code=400, detail="CSV export takes exactly one collection")
+        body = export_csv(db, user.user_id, names[0])
+        media_type, filename = "text/csv", f"jobflow-{names[0]}-{stamp}.csv"
+    else:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
-Job Description:
-{analysis_request.job_description}
+@api_router.post("/import", dependencies=[query_policy("import")])
+async def import_data(format: str = "ndjson", collection: str = "jobs", request: Request = None, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    # Records are written while the body is still streaming, so the size is checked before reading any of it
+    length = request.headers.get("content-length")
+    if length is None:
+        raise HTTPException(status_code=411, detail="Content-Length is required")
+    if not length.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if int(length) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Imports are limited to {IMPORT_MAX_BYTES // (1024 * 1024)} MB")
+    
+    lines = iter_lines(request.stream())
+    if format == "ndjson":
+        records = iter_ndjson_records(lines)
+    elif format == "csv":
+        if collection not in EXPORT_COLLECTIONS:
+            raise HTTPException(status_code=400, detail=f"collection must be one of {', '.join(EXPORT_COLLECTIONS)}")
+        records = iter_csv_records(lines, collection)
+    else:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    
+    importer = DataImporter(db, user.user_id, IMPORT_NORMALIZERS)
+    # Imports skip per-job events; the index and rollups are updated in bulk instead
+    importer.on_jobs_inserted = similarity_index.add_jobs
+    summary = await importer.run(records)
+    if summary["imported"]["jobs"]:
+        # Rebuilt by the next summary instead of scanning every job inside this request
+        await analytics.invalidate([user.user_id])
+    publish_change(user.user_id, "import.completed", summary)
+    return summary
 
-{"User's Resume: " + analysis_request.user_resume if analysis_request.user_resume else ""}
+@api_router.get("/analytics", dependencies=[query_policy("analytics")])
+async def get_analytics(weeks: int = 12, request: Request = None, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    return await read_analytics(user.user_id, weeks)
 
-Provide response in this exact format:
-MATCH_SCORE: [number]
-KEYWORDS: [comma separated list]
-SUMMARY:
-- [bullet 1]
-- [bullet 2]
-- [bullet 3]"""
-        
-        message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
-        
-        lines = response.strip().split('\n')
-        match_score = 70
-        keywords = []
-        summary = []
-        
-        current_section = None
-        for line in lines:
-            line = line.strip()
-            if line.startswith("MATCH_SCORE:"):
+async def read_analytics(user_id: str, weeks: int = 12) -> Dict:
+    return await analytics.summary(user_id, weeks=min(max(weeks, 1), 104))
+
+MAX_BATCH_READS = 20
+
+class BatchRead(BaseModel):
+    # Key of this read in the response; defaults to the path
+    id: Optional[str] = None
+    path: Literal["/jobs", "/goals", "/tasks", "/reminders", "/resumes", "/analytics"]
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class BatchReadRequest(BaseModel):
+    requests: List[BatchRead] = Field(min_length=1, max_length=MAX_BATCH_READS)
+
+# path -> (reader(user_id, params), response model, query policy); the same readers and models as the GET routes
+BATCH_READERS = {
+    "/jobs": (lambda user_id, params: read_jobs(user_id), TypeAdapter(List[Job]), "list"),
+    "/goals": (lambda user_id, params: read_goals(user_id), TypeAdapter(DailyGoals), "default"),
+    "/tasks": (lambda user_id, params: read_tasks(user_id, params.get("date")), TypeAdapter(List[DailyTask]), "list"),
+    "/reminders": (lambda user_id, params: read_reminders(user_id), TypeAdapter(List[Reminder]), "list"),
+    "/resumes": (lambda user_id, params: resume_store.list(user_id), TypeAdapter(List[Dict[str, Any]]), "list"),
+    "/analytics": (lambda user_id, params: read_analytics(user_id, int(params.get("weeks", 12))), TypeAdapter(Dict[str, Any]), "analytics"),
+}
+
+async def run_batch_read(user_id: str, read: BatchRead) -> Dict[str, Any]:
+    """
+    One sub-read as {"status", "body"} or {"status", "detail"}; failures stay local to the sub-read
+    """
+    reader, adapter, policy = BATCH_READERS[read.path]
+    # Each sub-read runs in its own task, so this only applies to its own queries
+    current_policy.set(QUERY_POLICIES[policy])
+    try:
+        result = await reader(user_id, read.params)
+        return {"status": 200, "body": adapter.dump_python(adapter.validate_python(result), mode="json")}
+    except HTTPException as e:
+        return {"status": e.status_code, "detail": e.detail}
+    except QUERY_TIMEOUT_ERRORS:
+        return {"status": 503, "detail": "Database is busy, please retry"}
+    except (ValueError, TypeError, ValidationError) as e:
+        return {"status": 422, "detail": str(e)}
+
+@api_router.post("/batch")
+async def batch_read(batch_request: BatchReadRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    """
+    Several GET reads in one round trip: one auth check, queries run concurrently, one response
+    """
+    user = await get_current_user(request, session_token, authorization)
+    
+    keys = [read.id or read.path for read in batch_request.requests]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=422, detail="Batch read ids must be unique")
+    
+    results = await asyncio.gather(*(run_batch_read(user.user_id, read) for read in batch_request.requests))
+    return JSONResponse({"results": dict(zip(keys, results))})
+
+@api_router.get("/events")
+async def stream_events(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    queue = event_bus.subscribe(user.user_id)
+    
+    async def event_stream():
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
                 try:
-                    match_score = int(line.split(":")[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith("KEYWORDS:"):
-                keywords_str = line.split(":", 1)[1].strip()
-                keywords = [k.strip() for k in keywords_str.split(",")]
-                current_section = "keywords"
-            elif line.startswith("SUMMARY:"):
-                current_section = "summary"
-            elif line.startswith("-") and current_section == "summary":
-                summary.append(line[1:].strip())
-        
-        return {
-            "match_score": match_score,
-            "keywords": keywords[:8],
-            "summary": summary[:5]
-        }
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            event_bus.unsubscribe(user.user_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def require_resume(user_id: str, resume_id: Optional[str] = None, version: Optional[str] = None):
+    resume = await resume_store.resolve(user_id, resume_id=resume_id, version=version)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+async def resume_text_for(user_id: str, analysis_request: AIAnalysisRequest) -> Tuple[Optional[str], bool]:
+    """
+    Resume text for an AI prompt and whether it is already compacted (stored resumes are)
+    """
+    if analysis_request.resume_id or analysis_request.resume_version:
+        resume = await require_resume(user_id, analysis_request.resume_id, analysis_request.resume_version)
+        return resume.prompt_text, True
+    return analysis_request.user_resume, False
+
+@api_router.get("/resumes", dependencies=[query_policy("list")])
+async def get_resumes(request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    return await resume_store.list(user.user_id)
+
+@api_router.post("/resumes")
+async def save_resume(resume_data: ResumeCreate, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    return await resume_store.save(user.user_id, resume_data.version.strip(), resume_data.text)
+
+@api_router.get("/resumes/{resume_id}")
+async def get_resume(resume_id: str, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    resume = await resume_store.get(user.user_id, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+@api_router.delete("/resumes/{resume_id}")
+async def delete_resume(resume_id: str, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    if not await resume_store.delete(user.user_id, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {"message": "Resume deleted"}
+
+def llm_http_error(error: Exception) -> HTTPException:
+    retry_after = str(max(1, int(error.retry_after + 0.999)))
+    if isinstance(error, LLMRateLimited):
+        return HTTPException(status_code=429, detail="Too many AI requests", headers={"Retry-After": retry_after})
+    return HTTPException(status_code=503, detail="AI service busy", headers={"Retry-After": retry_after})
+
+@api_router.post("/ai/analyze-job")
+async def analyze_job(analysis_request: AIAnalysisRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    user = await get_current_user(request, session_token, authorization)
+    
+    resume_text, resume_is_compact = await resume_text_for(user.user_id, analysis_request)
+    prompt = build_analysis_prompt(analysis_request.job_description, resume_text, resume_is_compact)
+    prompt_tokens = count_tokens(ANALYSIS_SYSTEM_MESSAGE) + count_tokens(prompt)
     
+    try:
+        response = await llm_client.complete(user.user_id, "analyze", system_message=ANALYSIS_SYSTEM_MESSAGE, prompt=prompt)
+    except (LLMRateLimited, LLMOverloaded) as e:
+        raise llm_http_error(e)
     except Exception as e:
         logging.error(f"AI analysis error: {str(e)}")
         try:
-            chat_backup = LlmChat(
-                api_key=EMERGENT_LLM_KEY,
-                session_id=f"analyze_{user.user_id}_{uuid.uuid4().hex[:8]}",
-                system_message="You are a career advisor AI."
-            ).with_model("anthropic", "claude-sonnet-4-5-20250929")
-            
-            message = UserMessage(text=prompt)
-            response = await chat_backup.send_message(message)
-            
-            return {
-                "match_score": 70,
-                "keywords": ["Communication", "Problem Solving", "Teamwork"],
-                "summary": ["Analyze the role requirements", "Strong technical skills needed", "Good growth opportunity"]
-            }
+            response = await llm_client.complete(
+                user.user_id,
+                "analyze",
+                system_message=ANALYSIS_SYSTEM_MESSAGE,
+                prompt=prompt,
+                provider="anthropic",
+                model="claude-sonnet-4-5-20250929",
+                rate_limited=False
+            )
+        except LLMOverloaded as e:
+            raise llm_http_error(e)
         except Exception:
             raise HTTPException(status_code=500, detail="AI service unavailable")
+    
+    try:
+        analysis = parse_analysis(response)
+    except AnalysisParseError as e:
+        logging.error(f"AI analysis parse error: {str(e)}")
+        raise HTTPException(status_code=502, detail="AI response could not be parsed")
+    
+    return {**analysis.model_dump(), "prompt_tokens": prompt_tokens}
 
 @api_router.post("/ai/generate-cover-letter")
 async def generate_cover_letter(analysis_request: AIAnalysisRequest, request: Request, session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     user = await get_current_user(request, session_token, authorization)
+    resume_text, _ = await resume_text_for(user.user_id, analysis_request)
     
     try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"cover_{user.user_id}_{uuid.uuid4().hex[:8]}",
-            system_message="You are a professional resume writer. Create concise, compelling cover letter paragraphs."
-        ).with_model("openai", "gpt-5.2")
-        
         prompt = f"""Write a short, tailored 2-3 paragraph cover letter introduction for this job.
 
 Job Description:
 {analysis_request.job_description}
 
-{"Candidate Background: " + analysis_request.user_resume if analysis_request.user_resume else ""}
+{"Candidate Background: " + resume_text if resume_text else ""}
 
 Make it professional, enthusiastic, and specific to the role. Focus on value proposition."""
         
-        message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
+        response = await llm_client.complete(
+            user.user_id,
+            "cover",
+            system_message="You are a professional resume writer. Create concise, compelling cover letter paragraphs.",
+            prompt=prompt
+        )
         
         return {"cover_letter": response.strip()}
     
+    except (LLMRateLimited, LLMOverloaded) as e:
+        raise llm_http_error(e)
     except Exception as e:
         logging.error(f"Cover letter generation error: {str(e)}")
         raise HTTPException(status_code=500, detail="AI service unavailable")
@@ -627,12 +1405,6 @@ async def generate_email(email_request: AIEmailRequest, request: Request, sessio
     user = await get_current_user(request, session_token, authorization)
     
     try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"email_{user.user_id}_{uuid.uuid4().hex[:8]}",
-            system_message="You are a professional career coach. Write concise, professional networking emails."
-        ).with_model("openai", "gpt-5.2")
-        
         recipient = email_request.recipient_name or "Hiring Manager"
         
         if email_request.email_type == "application":
@@ -642,17 +1414,92 @@ async def generate_email(email_request: AIEmailRequest, request: Request, sessio
         else:
             prompt = f"Write a professional networking message to {recipient} regarding opportunities at {email_request.company}. Keep it brief and genuine (3-4 sentences)."
         
-        message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
+        response = await llm_client.complete(
+            user.user_id,
+            "email",
+            system_message="You are a professional career coach. Write concise, professional networking emails.",
+            prompt=prompt
+        )
         
         return {"email": response.strip()}
     
+    except (LLMRateLimited, LLMOverloaded) as e:
+        raise llm_http_error(e)
     except Exception as e:
         logging.error(f"Email generation error: {str(e)}")
         raise HTTPException(status_code=500, detail="AI service unavailable")
 
+def bearer_matches(authorization: Optional[str], token: str) -> bool:
+    # Constant-time so response timing does not reveal how much of the token matched
+    return hmac.compare_digest((authorization or "").encode(), f"Bearer {token}".encode())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and not bearer_matches(authorization, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+def require_profiling_token(authorization: Optional[str]):
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not bearer_matches(authorization, PROFILING_TOKEN):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+@app.get("/admin/profiles")
+async def list_profiles(limit: int = 50, path: Optional[str] = None, user_id: Optional[str] = None, authorization: Optional[str] = Header(None)):
+    require_profiling_token(authorization)
+    return await profile_store.list(limit=min(max(limit, 1), 500), path=path, user_id=user_id)
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, format: Literal["speedscope", "collapsed"] = "speedscope", authorization: Optional[str] = Header(None)):
+    """
+    A captured profile: speedscope JSON (open at https://www.speedscope.app) or folded stacks for flamegraph.pl
+    """
+    require_profiling_token(authorization)
+    speedscope = await profile_store.load(profile_id)
+    if speedscope is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(
+            collapsed_stacks(speedscope),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+        )
+    return JSONResponse(speedscope, headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'})
+
+@app.get("/healthz")
+async def healthz():
+    """
+    Liveness: the process is up and serving requests
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: warm-up has finished and MongoDB answers, so the worker can take traffic
+    """
+    if not app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(e)})
+    return {"status": "ready"}
+
+async def query_timeout_handler(request: Request, exc: Exception):
+    logger.warning(f"Query deadline exceeded on {request.method} {request.url.path}: {str(exc)}")
+    return JSONResponse(status_code=503, content={"detail": "Database is busy, please retry"}, headers={"Retry-After": "1"})
+
+for error in QUERY_TIMEOUT_ERRORS:
+    app.add_exception_handler(error, query_timeout_handler)
+
 app.include_router(api_router)
 
+# Innermost, so a profile covers only the request's own task from routing to response
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+install_metrics_middleware(app, slow_request_seconds=SLOW_REQUEST_MS / 1000)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -667,6 +1514,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+async def ensure_core_indexes():
+    await asyncio.gather(
+        db.user_sessions.create_index("session_token"),
+        db.users.create_index("user_id"),
+        db.users.create_index("email"),
+        db.jobs.create_index([("user_id", 1), ("job_id", 1)]),
+        db.jobs.create_index([("user_id", 1), ("job_url", 1)]),
+        db.daily_tasks.create_index([("user_id", 1), ("date", 1)]),
+        db.reminders.create_index([("user_id", 1), ("completed", 1)]),
+        resume_store.ensure_indexes(),
+        analytics.ensure_indexes(),
+        job_texts.ensure_indexes(),
+        job_extractor.ensure_indexes(),
+        *([rate_limit_store.ensure_indexes()] if rate_limit_store is not None else []),
+        *([profile_store.ensure_indexes()] if profiler.enabled else []),
+    )
+
+def check_event_source():
+    """
+    Refuse configurations where live events (and the similarity index, which follows them) would miss writes
+    """
+    if EVENT_SOURCE not in ("local", "changestream", "off"):
+        raise RuntimeError(f"Unknown EVENT_SOURCE {EVENT_SOURCE!r}, expected local, changestream or off")
+    if EVENT_SOURCE == "local" and WEB_CONCURRENCY > 1:
+        raise RuntimeError(
+            f"EVENT_SOURCE=local only reaches clients of the worker that made the write, but {WEB_CONCURRENCY} workers are configured; "
+            "use EVENT_SOURCE=changestream (needs a replica set) or a single worker"
+        )
+    if EVENT_SOURCE == "off" and SIMILARITY_INDEX_ENABLED:
+        raise RuntimeError("The similarity index follows writes through live events; set SIMILARITY_INDEX_ENABLED=false with EVENT_SOURCE=off")
+
+async def warm_up():
+    """
+    Work done before the worker reports ready: connect, build indexes, and load lazily-initialized state
+    """
+    await db.command("ping")
+    await ensure_core_indexes()
+    # Loads the tokenizer encoding used to budget LLM prompts
+    await asyncio.to_thread(count_tokens, "warm up")
+
+async def start_worker():
+    global client
+    check_event_source()
+    if db is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            event_listeners=[MongoCommandListener()],
+            **mongo_client_options(worker_pool_size(MONGO_POOL_BUDGET))
+        )
+        bind_database(client[os.environ['DB_NAME']])
+    
+    await warm_up()
+    await start_background_services()
+    app.state.ready = True
+    logger.info(f"Worker {os.getpid()} ready (mongo pool {worker_pool_size(MONGO_POOL_BUDGET)}, http pool {worker_pool_size(HTTP_POOL_BUDGET)})")
+
+async def start_background_services():
+    if REMINDER_SCHEDULER_ENABLED:
+        await reminder_scheduler.start()
+    if EVENT_SOURCE == "changestream":
+        await change_stream_relay.start()
+    if SIMILARITY_INDEX_ENABLED:
+        background_tasks.append(asyncio.create_task(similarity_index.run(db, change_streams=EVENT_SOURCE == "changestream")))
+    if TASK_GENERATION_ENABLED:
+        await task_generator.ensure_indexes()
+        background_tasks.append(asyncio.create_task(task_generator.run_daily()))
+
+async def stop_worker():
+    app.state.ready = False
+    for task in background_tasks:
+        task.cancel()
+    if SIMILARITY_INDEX_ENABLED:
+        similarity_index.save()
+    await change_stream_relay.stop()
+    await reminder_scheduler.stop()
+    if _job_scraper is not None:
+        await _job_scraper.close()
+    if http_session is not None:
+        await http_session.close()
+    if client is not None:
+        client.close()
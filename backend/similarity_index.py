@@ -0,0 +1,500 @@
+import asyncio
+import fcntl
+import json
+import logging
+import math
+import os
+import shutil
+import time
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import IO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId, Timestamp
+
+from job_text import JobTextStore
+from match_scoring import STOPWORDS, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Tokens of the description that go into a job's vector; the opening of a posting carries the role
+MAX_DESCRIPTION_TOKENS = 400
+TITLE_WEIGHT = 2.0
+BIGRAM_WEIGHT = 0.5
+# Catching up from a snapshot starts this much before it was taken, to cover clock skew between hosts
+SYNC_MARGIN_SECONDS = 60
+# Under the index path: the name of the current snapshot directory, and the locks workers coordinate through
+CURRENT_FILE = "CURRENT"
+WRITER_LOCK = "writer.lock"
+ATTACHED_LOCK = "attached.lock"
+SNAPSHOT_GRACE_SECONDS = 60
+
+
+@lru_cache(maxsize=200000)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    # crc32 rather than hash(): bucket assignment must be stable across processes and restarts
+    h = zlib.crc32(feature.encode())
+    return h % dim, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def _age(path: str) -> float:
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _title_hash(title: Optional[str]) -> int:
+    return zlib.crc32((title or "").encode())
+
+
+class HashingVectorizer:
+    """
+    Fixed-size signed feature hashing over title and description unigrams and bigrams.
+
+    Needs no fitted vocabulary, so a job can be vectorized the moment it is
+    saved; vectors are L2-normalized float32, so a dot product is the cosine.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def features(self, title: str, description: str) -> Counter:
+        weights = Counter()
+        for tokens, weight in (
+            (tokenize(title), TITLE_WEIGHT),
+            (tokenize(description)[:MAX_DESCRIPTION_TOKENS], 1.0),
+        ):
+            words = [t for t in tokens if t not in STOPWORDS and not t.isdigit()]
+            for word in words:
+                weights[word] += weight
+            for first, second in zip(words, words[1:]):
+                weights[f"{first} {second}"] += weight * BIGRAM_WEIGHT
+        return weights
+
+    def transform(self, jobs: Sequence[Dict]) -> np.ndarray:
+        vectors = np.zeros((len(jobs), self.dim), dtype=np.float32)
+        for i, job in enumerate(jobs):
+            row = vectors[i]
+            for feature, weight in self.features(job.get("title") or "", job.get("description") or "").items():
+                index, sign = _bucket(feature, self.dim)
+                # Sublinear term weight so repeated boilerplate does not dominate
+                row[index] += sign * (1 + math.log(weight)) if weight >= 1 else sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SimilarityIndex:
+    """
+    Top-k cosine search over every saved job's vector, scoped to the job's owner.
+
+    Rows live in two segments: a read-only memory-mapped snapshot loaded at
+    startup (shared between workers through the page cache) and an in-memory
+    segment for rows added since. Updates and deletes tombstone the old row,
+    so the snapshot is never written in place; snapshots compact the live rows
+    into a new directory that the CURRENT file is switched to, picked up on
+    the next start. Only the worker holding the writer lock snapshots. A
+    query only touches the owner's rows, so its cost follows the size of the
+    user's inbox rather than the whole index.
+
+    Job writes arrive through the event bus listener. Events that carry no
+    description (change stream events, updates that left it alone) are
+    vectorized from the database when the job is new to the index or its
+    title changed, in batches on a background task.
+    """
+
+    FIELDS = {"_id": 0, "job_id": 1, "user_id": 1, "title": 1, "description": 1}
+
+    def __init__(self, path: Optional[str], dim: int = 256, batch_size: int = 1000):
+        self.path = path
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self.batch_size = batch_size
+        self._db = None
+        self._pending = set()
+        self._refresher: Optional[asyncio.Task] = None
+        self._writer_lock: Optional[IO] = None
+        self._attached_lock: Optional[IO] = None
+        self._reset()
+
+    def _reset(self):
+        self._base = np.zeros((0, self.dim), dtype=np.float32)
+        self._delta = np.zeros((1024, self.dim), dtype=np.float32)
+        self._size = 0
+        self._job_ids: List[str] = []
+        self._owners = np.zeros(1024, dtype=np.int32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._title_hashes = np.zeros(1024, dtype=np.uint32)
+        self._owner_codes: Dict[str, int] = {}
+        self._owner_names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._dirty = False
+        # From the loaded snapshot: when it was taken, and whether at shutdown
+        self._synced_at: Optional[float] = None
+        self._clean = False
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _owner_code(self, user_id: str) -> int:
+        code = self._owner_codes.get(user_id)
+        if code is None:
+            code = self._owner_codes[user_id] = len(self._owner_names)
+            self._owner_names.append(user_id)
+        return code
+
+    def _grow(self, needed: int):
+        capacity = len(self._owners)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("_owners", "_alive", "_title_hashes"):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+        delta_needed = new_capacity - len(self._base)
+        if delta_needed > len(self._delta):
+            grown = np.zeros((delta_needed, self.dim), dtype=np.float32)
+            grown[:len(self._delta)] = self._delta
+            self._delta = grown
+
+    def add_vectors(self, job_ids: Sequence[str], user_ids: Sequence[str], vectors: np.ndarray, titles: Optional[Sequence[str]] = None):
+        for job_id in job_ids:
+            self.remove(job_id)
+        start = self._size
+        end = start + len(job_ids)
+        self._grow(end)
+        base_rows = len(self._base)
+        self._delta[start - base_rows:end - base_rows] = vectors
+        self._owners[start:end] = [self._owner_code(u) for u in user_ids]
+        self._alive[start:end] = True
+        self._title_hashes[start:end] = [_title_hash(t) for t in titles] if titles is not None else 0
+        for offset, job_id in enumerate(job_ids):
+            self._rows[job_id] = start + offset
+        self._job_ids.extend(job_ids)
+        self._size = end
+        self._dirty = True
+
+    def add_jobs(self, jobs: Sequence[Dict]):
+        """
+        Insert or replace the vectors of job documents (needs job_id, user_id, title, description)
+        """
+        if not jobs:
+            return
+        self.add_vectors(
+            [j["job_id"] for j in jobs], [j["user_id"] for j in jobs], self.vectorizer.transform(jobs), [j.get("title") for j in jobs]
+        )
+
+    def remove(self, job_id: str):
+        row = self._rows.pop(job_id, None)
+        if row is not None:
+            self._alive[row] = False
+            self._dirty = True
+
+    def vector(self, job_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(job_id)
+        if row is None:
+            return None
+        return self._row_vectors(np.array([row]))[0]
+
+    def _row_vectors(self, rows: np.ndarray) -> np.ndarray:
+        base_rows = len(self._base)
+        in_base = rows < base_rows
+        if in_base.all():
+            return self._base[rows]
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        vectors[in_base] = self._base[rows[in_base]]
+        vectors[~in_base] = self._delta[rows[~in_base] - base_rows]
+        return vectors
+
+    def _scores(self, rows: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        if len(rows) * 4 < self._size:
+            # Gathering a small inbox's rows is cheaper than scoring every row
+            return self._row_vectors(rows) @ vector
+        base_rows = len(self._base)
+        everything = np.concatenate([self._base @ vector, self._delta[:self._size - base_rows] @ vector])
+        return everything[rows]
+
+    def query(self, user_id: str, vector: np.ndarray, k: int = 10, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        code = self._owner_codes.get(user_id)
+        if code is None:
+            return []
+        rows = np.flatnonzero((self._owners[:self._size] == code) & self._alive[:self._size])
+        excluded = self._rows.get(exclude)
+        if excluded is not None:
+            rows = rows[rows != excluded]
+        if not len(rows):
+            return []
+        scores = self._scores(rows, vector)
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._job_ids[rows[i]], float(scores[i])) for i in top]
+
+    # Persistence
+
+    def _files(self) -> Tuple[str, str]:
+        with open(os.path.join(self.path, CURRENT_FILE)) as f:
+            directory = os.path.join(self.path, f.read().strip())
+        return os.path.join(directory, "vectors.npy"), os.path.join(directory, "rows.json")
+
+    def load(self) -> bool:
+        if not self.path:
+            return False
+        try:
+            vectors_path, rows_path = self._files()
+            with open(rows_path) as f:
+                meta = json.load(f)
+            base = np.load(vectors_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.info(f"No usable similarity snapshot at {self.path}: {str(e)}")
+            return False
+        count = len(meta["job_ids"])
+        if meta.get("dim") != self.dim or base.shape != (count, self.dim) or len(meta.get("title_hashes", meta["job_ids"])) != count:
+            logger.warning("Similarity snapshot does not match the configured index, rebuilding")
+            return False
+
+        self._reset()
+        self._base = base
+        self._grow(count)
+        self._owner_names = list(meta["owners"])
+        self._owner_codes = {user_id: code for code, user_id in enumerate(self._owner_names)}
+        self._owners[:count] = meta["owner_codes"]
+        self._alive[:count] = True
+        self._title_hashes[:count] = meta.get("title_hashes") or 0
+        self._job_ids = list(meta["job_ids"])
+        self._rows = {job_id: row for row, job_id in enumerate(self._job_ids)}
+        self._size = count
+        self._synced_at = meta.get("synced_at")
+        self._clean = bool(meta.get("clean"))
+        return True
+
+    def snapshot(self, clean: bool = False) -> Tuple[np.ndarray, Dict]:
+        """
+        Copy of the live rows and their metadata, taken on the event loop so writers cannot interleave.
+        `clean` marks the snapshot taken at shutdown, after which this process made no more writes.
+        """
+        rows = np.flatnonzero(self._alive[:self._size])
+        vectors = self._row_vectors(rows) if len(rows) else np.zeros((0, self.dim), dtype=np.float32)
+        codes = self._owners[rows].tolist()
+        used = sorted(set(codes))
+        recode = {old: new for new, old in enumerate(used)}
+        self._dirty = False
+        return vectors, {
+            "dim": self.dim,
+            "job_ids": [self._job_ids[r] for r in rows],
+            "owners": [self._owner_names[c] for c in used],
+            "owner_codes": [recode[c] for c in codes],
+            "title_hashes": self._title_hashes[rows].tolist(),
+            "synced_at": time.time(),
+            "clean": clean,
+        }
+
+    def write_snapshot(self, vectors: np.ndarray, meta: Dict):
+        """
+        Write a new snapshot directory and switch CURRENT to it; the running index keeps its segments until next load
+        """
+        os.makedirs(self.path, exist_ok=True)
+        name = f"snapshot-{time.time_ns()}-{os.getpid()}"
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory)
+        np.save(os.path.join(directory, "vectors.npy"), vectors)
+        with open(os.path.join(directory, "rows.json"), "w") as f:
+            json.dump(meta, f)
+        # Vectors and rows are only ever read through the pointer, so a reader never sees a mixed pair
+        current = os.path.join(self.path, CURRENT_FILE)
+        temporary = f"{current}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "w") as f:
+            f.write(name)
+        os.replace(temporary, current)
+        # Workers that mapped an older snapshot keep reading it after the unlink; recent ones may still be in use by their writer
+        for entry in os.listdir(self.path):
+            entry_path = os.path.join(self.path, entry)
+            if entry.startswith("snapshot-") and entry < name and _age(entry_path) > SNAPSHOT_GRACE_SECONDS:
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+    def _lock(self, name: str, operation: int) -> Optional[IO]:
+        os.makedirs(self.path, exist_ok=True)
+        handle = open(os.path.join(self.path, name), "a")
+        try:
+            fcntl.flock(handle, operation | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        return handle
+
+    def attach(self):
+        """
+        Hold a shared lock on the path while this process keeps the index up to date
+        """
+        if self.path and self._attached_lock is None:
+            self._attached_lock = self._lock(ATTACHED_LOCK, fcntl.LOCK_SH)
+
+    def claim_writer(self) -> bool:
+        """
+        Whether this process snapshots the path: the first to lock it does, until it exits
+        """
+        if self._writer_lock is None:
+            self._writer_lock = self._lock(WRITER_LOCK, fcntl.LOCK_EX)
+        return self._writer_lock is not None
+
+    def _alone(self) -> bool:
+        # Another attached worker may still write after this snapshot, so it would not be clean
+        if self._attached_lock is None:
+            handle = self._lock(ATTACHED_LOCK, fcntl.LOCK_EX)
+            if handle is not None:
+                handle.close()
+            return handle is not None
+        try:
+            fcntl.flock(self._attached_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def save(self):
+        """
+        Snapshot at shutdown; marked clean only when no other worker is still attached
+        """
+        if self.path and self.claim_writer():
+            self.write_snapshot(*self.snapshot(clean=self._alone()))
+
+    # Keeping the index in step with MongoDB
+
+    async def sync(self, db, change_streams: bool = False):
+        """
+        Catch up with the writes made since the snapshot was taken.
+
+        With change streams as the event source they are replayed from the
+        snapshot's time; otherwise, after a snapshot written at shutdown, only
+        jobs inserted since are added. Without a snapshot, or when the replay
+        is no longer available, every job_id is compared with the database.
+        """
+        if self._synced_at is not None and (change_streams or self._clean):
+            since = self._synced_at - SYNC_MARGIN_SECONDS
+            try:
+                job_ids = await (self._changed_since(db, since) if change_streams else self._inserted_since(db, since))
+            except Exception as e:
+                logger.warning(f"Similarity index cannot catch up from its snapshot, rescanning: {str(e)}")
+            else:
+                await self.refresh(db, job_ids)
+                logger.info(f"Similarity index synced: {len(self)} jobs ({len(job_ids)} changed since the snapshot)")
+                return
+        await self._rescan(db)
+
+    async def _rescan(self, db):
+        present = set()
+        missing = []
+        async for doc in db.jobs.find({}, {"_id": 0, "job_id": 1}):
+            present.add(doc["job_id"])
+            if doc["job_id"] not in self._rows:
+                missing.append(doc["job_id"])
+        for job_id in [j for j in self._rows if j not in present]:
+            self.remove(job_id)
+        await self.refresh(db, missing)
+        logger.info(f"Similarity index synced: {len(self)} jobs ({len(missing)} added)")
+
+    async def _inserted_since(self, db, since: float) -> List[str]:
+        first_id = ObjectId.from_datetime(datetime.fromtimestamp(since, timezone.utc))
+        return [
+            doc["job_id"] async for doc in db.jobs.find({"_id": {"$gte": first_id}}, {"_id": 0, "job_id": 1})
+            if doc["job_id"] not in self._rows
+        ]
+
+    async def _changed_since(self, db, since: float) -> List[str]:
+        """
+        Jobs written since `since`, from the jobs and job_texts change streams; fails once the oplog no longer reaches back that far
+        """
+        changed = set()
+        for collection in ("jobs", "job_texts"):
+            async with db[collection].watch(
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable",
+                start_at_operation_time=Timestamp(int(since), 0)
+            ) as stream:
+                while stream.alive:
+                    change = await stream.try_next()
+                    if change is None:
+                        break
+                    document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+                    if document.get("job_id"):
+                        changed.add(document["job_id"])
+        return list(changed)
+
+    async def refresh(self, db, job_ids: Iterable[str]):
+        """
+        Re-vectorize jobs from the database; ids whose job is gone are dropped
+        """
+        job_ids = list(job_ids)
+        for i in range(0, len(job_ids), self.batch_size):
+            chunk = job_ids[i:i + self.batch_size]
+            batch = await db.jobs.find({"job_id": {"$in": chunk}}, self.FIELDS).to_list(len(chunk))
+            for job_id in set(chunk) - {j["job_id"] for j in batch}:
+                self.remove(job_id)
+            if not batch:
+                continue
+            await JobTextStore(db).attach(None, batch, ["description"])
+            vectors = await asyncio.to_thread(self.vectorizer.transform, batch)
+            self.add_vectors([j["job_id"] for j in batch], [j["user_id"] for j in batch], vectors, [j.get("title") for j in batch])
+
+    async def run(self, db, save_interval: float = 300, change_streams: bool = False):
+        """
+        Load the snapshot, catch up with the database, then snapshot periodically
+        """
+        self._db = db
+        self.attach()
+        self.load()
+        try:
+            await self.sync(db, change_streams)
+        except Exception as e:
+            logger.error(f"Similarity index sync failed: {str(e)}")
+        while True:
+            await asyncio.sleep(save_interval)
+            if self._dirty and self.path and self.claim_writer():
+                try:
+                    await asyncio.to_thread(self.write_snapshot, *self.snapshot())
+                except Exception as e:
+                    logger.error(f"Similarity index save failed: {str(e)}")
+
+    def on_event(self, user_id: str, event_type: str, data: Optional[Dict]):
+        """
+        Event bus listener: mirrors job writes into the index
+        """
+        if not data or not event_type.startswith("job.") or not data.get("job_id"):
+            return
+        job_id = data["job_id"]
+        if event_type == "job.deleted":
+            self.remove(job_id)
+        elif event_type == "job.text_updated":
+            self._refresh_later(job_id)
+        elif data.get("description") is not None:
+            self.add_jobs([{**data, "user_id": user_id}])
+        else:
+            # Job texts live in a side collection, so most events carry no description
+            row = self._rows.get(job_id)
+            if row is None or self._title_hashes[row] != _title_hash(data.get("title")):
+                self._refresh_later(job_id)
+
+    def _refresh_later(self, job_id: str):
+        if self._db is None:
+            # Not running yet; the startup sync picks the job up
+            return
+        self._pending.add(job_id)
+        if self._refresher is None:
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_pending())
+
+    async def _refresh_pending(self):
+        try:
+            while self._pending:
+                batch = list(self._pending)[:self.batch_size]
+                self._pending.difference_update(batch)
+                await self.refresh(self._db, batch)
+        except Exception as e:
+            logger.error(f"Similarity index refresh failed: {str(e)}")
+        finally:
+            self._refresher = None
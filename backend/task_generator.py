@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+PENDING_JOB_STATUSES = ["saved", "to-apply"]
+GOAL_TASK_TYPES = {
+    "applications_per_day": "application",
+    "networking_per_day": "networking",
+    "skills_per_day": "skills",
+}
+DEFAULT_GOALS = {"applications_per_day": 3, "networking_per_day": 2, "skills_per_day": 2}
+PENDING_JOB_OUTPUT = {"job_id": "$job_id", "title": "$title", "company": "$company"}
+
+
+class DailyTaskGenerator:
+    """
+    Creates each user's DailyTasks for a date from their DailyGoals and pending saved jobs.
+
+    Users are processed in chunks: one query for the chunk's goals, one
+    aggregation for their oldest pending jobs, one insert_many for the claims
+    and one insert_many for all of the chunk's tasks. Chunks run concurrently
+    up to `concurrency`. A run is idempotent per (user_id, date): a claim
+    document is inserted into task_generation_runs under a unique index before
+    tasks are written. If the run fails after that, the users whose tasks were
+    not all written lose whatever was written and their claims, so a rerun
+    neither skips nor duplicates them.
+
+    The daily sweep is claimed per date in task_generation_sweeps, so only
+    one of the server's workers runs it; a sweep left unfinished for
+    `sweep_timeout` is taken over by the next worker that checks.
+
+    Pending jobs are picked with $topN, which needs MongoDB 5.2 or later. With
+    `top_n=False`, or after the server rejects $topN once, a $sort, $push and
+    $slice pipeline is used instead; it gives the same result but collects
+    all of a user's pending jobs before trimming them.
+    """
+
+    def __init__(
+        self,
+        db,
+        default_goals: Optional[Dict[str, int]] = None,
+        chunk_size: int = 500,
+        concurrency: int = 8,
+        sweep_timeout: timedelta = timedelta(hours=1),
+        top_n: bool = True
+    ):
+        self.db = db
+        self.default_goals = default_goals or DEFAULT_GOALS
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.sweep_timeout = sweep_timeout
+        self.top_n = top_n
+
+    async def ensure_indexes(self):
+        await self.db.task_generation_runs.create_index([("user_id", 1), ("date", 1)], unique=True)
+        await self.db.jobs.create_index([("user_id", 1), ("status", 1), ("date_added", 1)])
+        await self.db.daily_goals.create_index("user_id")
+
+    async def generate_for_all(self, date: str) -> Dict[str, int]:
+        """
+        Generate tasks for every user; returns counts of users claimed, skipped and tasks created
+        """
+        totals = {"users": 0, "skipped": 0, "tasks": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async def run_chunk(user_ids: List[str]):
+            async with semaphore:
+                try:
+                    result = await self.generate_for_users(user_ids, date)
+                except Exception as e:
+                    logger.error(f"Task generation failed for a chunk of {len(user_ids)} users: {str(e)}")
+                    return
+                for key, value in result.items():
+                    totals[key] += value
+
+        chunk = []
+        async for user in self.db.users.find({}, {"_id": 0, "user_id": 1}).batch_size(self.chunk_size):
+            chunk.append(user["user_id"])
+            if len(chunk) >= self.chunk_size:
+                pending.add(asyncio.create_task(run_chunk(chunk)))
+                chunk = []
+                # Keep the number of in-flight chunks bounded so memory stays flat for any user count
+                if len(pending) >= self.concurrency * 2:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if chunk:
+            pending.add(asyncio.create_task(run_chunk(chunk)))
+        if pending:
+            await asyncio.wait(pending)
+
+        logger.info(f"Generated {totals['tasks']} tasks for {totals['users']} users on {date} ({totals['skipped']} already done)")
+        return totals
+
+    async def generate_for_users(self, user_ids: Iterable[str], date: str) -> Dict[str, int]:
+        user_ids = list(user_ids)
+        claimed = await self._claim(user_ids, date)
+        if not claimed:
+            return {"users": 0, "skipped": len(user_ids), "tasks": 0}
+
+        tasks = []
+        try:
+            goals = await self._load_goals(claimed)
+            max_applications = max(g["applications_per_day"] for g in goals.values())
+            pending_jobs = await self._load_pending_jobs(claimed, max_applications)
+
+            for user_id in claimed:
+                tasks.extend(self.build_tasks(user_id, date, goals[user_id], pending_jobs.get(user_id, [])))
+
+            if tasks:
+                await self.db.daily_tasks.insert_many(tasks, ordered=False)
+        except BulkWriteError as e:
+            failed = {tasks[error["index"]]["user_id"] for error in e.details.get("writeErrors", [])}
+            # Without an acknowledged write concern nothing is known to be durable
+            await self._release(set(claimed) if e.details.get("writeConcernErrors") else failed, date, tasks)
+            raise
+        except Exception:
+            await self._release(set(claimed), date, tasks)
+            raise
+
+        return {"users": len(claimed), "skipped": len(user_ids) - len(claimed), "tasks": len(tasks)}
+
+    async def _release(self, user_ids: Set[str], date: str, tasks: List[Dict]):
+        """
+        Delete the tasks that did get written for `user_ids` and drop their claims, so a rerun starts them over
+        """
+        task_ids = [task["task_id"] for task in tasks if task["user_id"] in user_ids]
+        try:
+            if task_ids:
+                await self.db.daily_tasks.delete_many({"task_id": {"$in": task_ids}})
+            await self.db.task_generation_runs.delete_many({"user_id": {"$in": list(user_ids)}, "date": date})
+        except Exception as e:
+            # The claims stay: these users miss the day's tasks rather than get them twice
+            logger.error(f"Could not release task generation claims of {len(user_ids)} users for {date}: {str(e)}")
+
+    def build_tasks(self, user_id: str, date: str, goals: Dict[str, int], pending_jobs: List[Dict]) -> List[Dict]:
+        created_at = datetime.now(timezone.utc).isoformat()
+        tasks = []
+
+        def add(task_type: str, description: str, job_id: Optional[str] = None):
+            tasks.append({
+                "task_id": f"task_{uuid.uuid4().hex[:12]}",
+                "user_id": user_id,
+                "date": date,
+                "task_type": task_type,
+                "job_id": job_id,
+                "description": description,
+                "completed": False,
+                "generated": True,
+                "created_at": created_at
+            })
+
+        applications = goals["applications_per_day"]
+        for job in pending_jobs[:applications]:
+            add("application", f"Apply to {job['title']} at {job['company']}", job["job_id"])
+        for _ in range(applications - min(applications, len(pending_jobs))):
+            add("application", "Find and apply to a new role")
+        for _ in range(goals["networking_per_day"]):
+            add("networking", "Reach out to someone in your network")
+        for _ in range(goals["skills_per_day"]):
+            add("skills", "Spend time practicing a skill from a target job description")
+        return tasks
+
+    async def _claim(self, user_ids: List[str], date: str) -> List[str]:
+        now = datetime.now(timezone.utc).isoformat()
+        claims = [{"user_id": user_id, "date": date, "created_at": now} for user_id in user_ids]
+        try:
+            await self.db.task_generation_runs.insert_many(claims, ordered=False)
+            return user_ids
+        except BulkWriteError as e:
+            duplicates = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") == 11000}
+            other_errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if other_errors:
+                raise
+            return [user_id for index, user_id in enumerate(user_ids) if index not in duplicates]
+
+    async def _load_goals(self, user_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        goals = {user_id: dict(self.default_goals) for user_id in user_ids}
+        projection = {"_id": 0, "user_id": 1, **{field: 1 for field in GOAL_TASK_TYPES}}
+        async for doc in self.db.daily_goals.find({"user_id": {"$in": user_ids}}, projection):
+            goals[doc["user_id"]].update({k: v for k, v in doc.items() if k in GOAL_TASK_TYPES and v is not None})
+        return goals
+
+    async def _load_pending_jobs(self, user_ids: List[str], per_user: int) -> Dict[str, List[Dict]]:
+        if per_user <= 0:
+            return {}
+        if self.top_n:
+            try:
+                return await self._aggregate_pending_jobs(self._top_n_pipeline(user_ids, per_user))
+            except OperationFailure as e:
+                logger.warning(f"$topN is not supported by this MongoDB server, falling back to $slice: {str(e)}")
+                self.top_n = False
+        return await self._aggregate_pending_jobs(self._slice_pipeline(user_ids, per_user))
+
+    def _top_n_pipeline(self, user_ids: List[str], per_user: int) -> List[Dict]:
+        # $topN keeps only per_user jobs per group instead of collecting every pending job
+        return [
+            {"$match": {"user_id": {"$in": user_ids}, "status": {"$in": PENDING_JOB_STATUSES}}},
+            {"$group": {
+                "_id": "$user_id",
+                "jobs": {"$topN": {"n": per_user, "sortBy": {"date_added": 1}, "output": PENDING_JOB_OUTPUT}}
+            }},
+        ]
+
+    def _slice_pipeline(self, user_ids: List[str], per_user: int) -> List[Dict]:
+        return [
+            {"$match": {"user_id": {"$in": user_ids}, "status": {"$in": PENDING_JOB_STATUSES}}},
+            {"$sort": {"user_id": 1, "date_added": 1}},
+            {"$group": {"_id": "$user_id", "jobs": {"$push": PENDING_JOB_OUTPUT}}},
+            {"$project": {"jobs": {"$slice": ["$jobs", per_user]}}},
+        ]
+
+    async def _aggregate_pending_jobs(self, pipeline: List[Dict]) -> Dict[str, List[Dict]]:
+        results = {}
+        async for doc in self.db.jobs.aggregate(pipeline, allowDiskUse=True):
+            results[doc["_id"]] = doc["jobs"]
+        return results
+
+    async def claim_sweep(self, date: str) -> bool:
+        """
+        True if this process should run the sweep for `date`: nobody has started it, or its runner went quiet
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db.task_generation_sweeps.insert_one({"_id": date, "started_at": now.isoformat(), "finished_at": None})
+            return True
+        except DuplicateKeyError:
+            pass
+        result = await self.db.task_generation_sweeps.update_one(
+            {"_id": date, "finished_at": None, "started_at": {"$lt": (now - self.sweep_timeout).isoformat()}},
+            {"$set": {"started_at": now.isoformat()}}
+        )
+        return result.modified_count == 1
+
+    async def sweep(self, date: str) -> Optional[Dict[str, int]]:
+        """
+        generate_for_all once across processes; None if another process has the date
+        """
+        if not await self.claim_sweep(date):
+            logger.info(f"Task generation for {date} is handled by another worker")
+            return None
+        totals = await self.generate_for_all(date)
+        await self.db.task_generation_sweeps.update_one({"_id": date}, {"$set": {"finished_at": datetime.now(timezone.utc).isoformat()}})
+        return totals
+
+    async def run_daily(self):
+        """
+        Sweep today's tasks now (a no-op for users already done), then again after each UTC midnight
+        """
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.sweep(now.date().isoformat())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Daily task generation error: {str(e)}")
+            tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+            # Checking in again before midnight lets this worker take over a sweep whose runner died
+            wake = min(tomorrow, now + self.sweep_timeout)
+            await asyncio.sleep(max((wake - datetime.now(timezone.utc)).total_seconds(), 1))
+
+
+async def _main():
+    import argparse
+    import os
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Generate daily tasks for all users")
+    parser.add_argument("--date", default=datetime.now(timezone.utc).date().isoformat())
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    generator = DailyTaskGenerator(client[os.environ['DB_NAME']], chunk_size=args.chunk_size, concurrency=args.concurrency)
+    await generator.ensure_indexes()
+    print(await generator.generate_for_all(args.date))
+    client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(_main())
@@ -0,0 +1,36 @@
+import { useEffect, useRef } from 'react';
+import { EVENTS_URL } from '../utils/api';
+
+// Subscribes to the per-user server-sent event channel. `handlers` maps event
+// types (e.g. 'job.updated') to callbacks receiving the event payload. Returns a
+// ref whose `current` is true while the channel is connected, so callers can
+// fall back to refetching when it is not.
+export const useLiveEvents = (handlers) => {
+  const handlersRef = useRef(handlers);
+  const connectedRef = useRef(false);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    const source = new EventSource(EVENTS_URL, { withCredentials: true });
+    source.onopen = () => {
+      connectedRef.current = true;
+    };
+    source.onerror = () => {
+      connectedRef.current = false;
+    };
+
+    Object.keys(handlersRef.current).forEach((type) => {
+      source.addEventListener(type, (event) => {
+        const handler = handlersRef.current[type];
+        if (handler) handler(JSON.parse(event.data).data);
+      });
+    });
+
+    return () => {
+      connectedRef.current = false;
+      source.close();
+    };
+  }, []);
+
+  return connectedRef;
+};
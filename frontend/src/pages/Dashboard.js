@@ -1,7 +1,8 @@
 import { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
-import { goalsAPI, tasksAPI, remindersAPI, jobsAPI } from '../utils/api';
-import { getTodayString, formatDate } from '../utils/helpers';
+import { batchAPI, tasksAPI } from '../utils/api';
+import { getTodayString, formatDate, upsertById, mergeById, removeById } from '../utils/helpers';
+import { useLiveEvents } from '../hooks/use-live-events';
 import { CalendarDays, Target, CheckCircle2, Circle, Plus, X, Sparkles } from 'lucide-react';
 import { Button } from '../components/ui/button';
 import { Progress } from '../components/ui/progress';
@@ -25,18 +26,40 @@ export const Dashboard = () => {
     fetchData();
   }, []);
 
+  useLiveEvents({
+    'goals.updated': (updatedGoals) => setGoals((prev) => ({ ...prev, ...updatedGoals })),
+    'task.created': (task) => {
+      if (task.date === today) setTasks((prev) => upsertById(prev, task, 'task_id'));
+    },
+    'task.updated': (task) => setTasks((prev) => mergeById(prev, task, 'task_id').filter((t) => t.date === today)),
+    'task.deleted': ({ task_id }) => setTasks((prev) => removeById(prev, task_id, 'task_id')),
+    'reminder.created': (reminder) => setReminders((prev) => upsertById(prev, reminder, 'reminder_id')),
+    'reminder.updated': (reminder) =>
+      setReminders((prev) => {
+        // Completed reminders are not listed; one marked incomplete again arrives whole and rejoins the list
+        const rejoins = !reminder.completed && reminder.reminder_date;
+        const next = rejoins ? upsertById(prev, reminder, 'reminder_id') : mergeById(prev, reminder, 'reminder_id');
+        return next.filter((r) => !r.completed);
+      }),
+    'reminder.deleted': ({ reminder_id }) => setReminders((prev) => removeById(prev, reminder_id, 'reminder_id')),
+    'reminder.due': (reminder) => toast(reminder.message),
+    'job.created': (job) => setJobs((prev) => upsertById(prev, job, 'job_id')),
+    'job.updated': (job) => setJobs((prev) => mergeById(prev, job, 'job_id')),
+    'job.deleted': ({ job_id }) => setJobs((prev) => removeById(prev, job_id, 'job_id')),
+  });
+
   const fetchData = async () => {
     try {
-      const [goalsRes, tasksRes, remindersRes, jobsRes] = await Promise.all([
-        goalsAPI.get(),
-        tasksAPI.getAll(today),
-        remindersAPI.getAll(),
-        jobsAPI.getAll(),
+      const data = await batchAPI.read([
+        { id: 'goals', path: '/goals' },
+        { id: 'tasks', path: '/tasks', params: { date: today } },
+        { id: 'reminders', path: '/reminders' },
+        { id: 'jobs', path: '/jobs' },
       ]);
-      setGoals(goalsRes.data);
-      setTasks(tasksRes.data);
-      setReminders(remindersRes.data.filter(r => !r.completed));
-      setJobs(jobsRes.data);
+      setGoals(data.goals);
+      setTasks(data.tasks);
+      setReminders(data.reminders.filter(r => !r.completed));
+      setJobs(data.jobs);
     } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load dashboard data');
@@ -48,7 +71,7 @@ export const Dashboard = () => {
   const toggleTask = async (taskId, completed) => {
     try {
       await tasksAPI.update(taskId, !completed);
-      setTasks(tasks.map(t => t.task_id === taskId ? { ...t, completed: !completed } : t));
+      setTasks((prev) => mergeById(prev, { task_id: taskId, completed: !completed }, 'task_id'));
       toast.success(completed ? 'Task marked incomplete' : 'Task completed!');
     } catch (error) {
       toast.error('Failed to update task');
@@ -70,7 +93,7 @@ export const Dashboard = () => {
         },
         today
       );
-      setTasks([...tasks, response.data]);
+      setTasks((prev) => upsertById(prev, response.data, 'task_id'));
       setNewTask({ type: 'application', description: '', job_id: '' });
       setShowAddTask(false);
       toast.success('Task added!');
@@ -82,7 +105,7 @@ export const Dashboard = () => {
   const deleteTask = async (taskId) => {
     try {
       await tasksAPI.delete(taskId);
-      setTasks(tasks.filter(t => t.task_id !== taskId));
+      setTasks((prev) => removeById(prev, taskId, 'task_id'));
       toast.success('Task deleted');
     } catch (error) {
       toast.error('Failed to delete task');
@@ -88,6 +88,7 @@ export const JobDetail = () => {
         ai_match_score: response.data.match_score,
         ai_keywords: response.data.keywords,
         ai_summary: response.data.summary,
+        ai_score_source: 'llm',
       });
       toast.success('Job analyzed!');
     } catch (error) {
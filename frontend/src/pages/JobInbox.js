@@ -2,7 +2,8 @@ import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import { jobsAPI } from '../utils/api';
-import { formatRelativeDate } from '../utils/helpers';
+import { formatRelativeDate, upsertById, mergeById, removeById } from '../utils/helpers';
+import { useLiveEvents } from '../hooks/use-live-events';
 import {
   Plus,
   Search,
@@ -36,6 +37,7 @@ export const JobInbox = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(true);
   const [showAddJob, setShowAddJob] = useState(false);
+  const [fetchingDetails, setFetchingDetails] = useState(false);
   const [activeTab, setActiveTab] = useState('saved');
   
   // Job search state
@@ -64,6 +66,17 @@ export const JobInbox = () => {
     fetchJobs();
   }, []);
 
+  const live = useLiveEvents({
+    'job.created': (job) => setJobs((prev) => upsertById(prev, job, 'job_id')),
+    'job.updated': (job) => setJobs((prev) => mergeById(prev, job, 'job_id')),
+    'job.deleted': ({ job_id }) => setJobs((prev) => removeById(prev, job_id, 'job_id')),
+  });
+
+  // With the live channel connected, saved jobs arrive as job.created events
+  const refreshJobs = () => {
+    if (!live.current) fetchJobs();
+  };
+
   useEffect(() => {
     if (searchQuery.trim() === '') {
       setFilteredJobs(jobs.filter((j) => j.status === 'saved'));
@@ -113,12 +126,38 @@ export const JobInbox = () => {
         description: '',
         salary_range: '',
       });
-      fetchJobs();
+      refreshJobs();
     } catch (error) {
       toast.error('Failed to add job');
     }
   };
 
+  const fetchJobDetails = async () => {
+    if (!newJob.job_url.trim()) {
+      toast.error('Please enter a job URL');
+      return;
+    }
+
+    setFetchingDetails(true);
+    try {
+      const response = await jobsAPI.fromUrl(newJob.job_url.trim());
+      const fields = response.data.job;
+      // Only fill what the user has not typed yet
+      setNewJob((current) => {
+        const filled = { ...current };
+        Object.entries(fields).forEach(([key, value]) => {
+          if (value && !current[key]) filled[key] = value;
+        });
+        return filled;
+      });
+      toast.success('Job details filled in');
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to fetch job details');
+    } finally {
+      setFetchingDetails(false);
+    }
+  };
+
   const handleSearchJobs = async () => {
     if (!searchFilters.query.trim()) {
       toast.error('Please enter a search term');
@@ -126,17 +165,27 @@ export const JobInbox = () => {
     }
 
     setSearching(true);
+    setSearchResults([]);
+    setSelectedJobs(new Set());
     try {
-      const response = await api.post('/jobs/search', {
-        query: searchFilters.query,
-        location: searchFilters.location || null,
-        remote_only: searchFilters.remote_only,
-        experience_level: searchFilters.experience_level || null,
-        max_results: 20,
-      });
-      setSearchResults(response.data.jobs);
-      setSelectedJobs(new Set());
-      toast.success(`Found ${response.data.count} jobs!`);
+      await jobsAPI.searchStream(
+        {
+          query: searchFilters.query,
+          location: searchFilters.location || null,
+          remote_only: searchFilters.remote_only,
+          experience_level: searchFilters.experience_level || null,
+          max_results: 20,
+        },
+        (event) => {
+          if (event.type === 'jobs' && event.jobs.length > 0) {
+            setSearchResults((prev) => [...prev, ...event.jobs]);
+          } else if (event.type === 'summary') {
+            toast.success(`Found ${event.count} jobs!`);
+          } else if (event.type === 'error') {
+            toast.error('Failed to search jobs');
+          }
+        }
+      );
     } catch (error) {
       console.error('Job search error:', error);
       toast.error('Failed to search jobs');
@@ -164,24 +213,18 @@ export const JobInbox = () => {
   };
 
   const bulkSaveJobs = async () => {
-    const selectedJobsData = Array.from(selectedJobs).map((index) => {
-      const job = searchResults[index];
-      return {
-        title: job.title,
-        company: job.company,
-        location: job.location,
-        job_url: job.job_url,
-        source: job.source,
-        description: job.description,
-        salary_range: job.salary_range || null,
-      };
-    });
+    // Sent as the search returned them, so tags are kept on the saved jobs
+    const selectedJobsData = Array.from(selectedJobs).map((index) => searchResults[index]);
 
     try {
       const response = await api.post('/jobs/bulk-save', selectedJobsData);
       toast.success(response.data.message);
       setSelectedJobs(new Set());
       setShowSearch(false);
+      // Local scoring fills keywords for the new jobs without an LLM call
+      if (response.data.job_ids?.length) {
+        await jobsAPI.score(null, response.data.job_ids).catch(() => null);
+      }
       fetchJobs();
     } catch (error) {
       toast.error('Failed to save jobs');
@@ -200,7 +243,7 @@ export const JobInbox = () => {
         salary_range: job.salary_range || null,
       });
       toast.success(`${job.title} saved!`);
-      fetchJobs();
+      refreshJobs();
     } catch (error) {
       toast.error('Failed to save job');
     }
@@ -313,13 +356,24 @@ export const JobInbox = () => {
                   </div>
                   <div>
                     <Label htmlFor="job-url">Job URL</Label>
-                    <Input
-                      id="job-url"
-                      value={newJob.job_url}
-                      onChange={(e) => setNewJob({ ...newJob, job_url: e.target.value })}
-                      placeholder="https://..."
-                      data-testid="job-url-input"
-                    />
+                    <div className="flex gap-2">
+                      <Input
+                        id="job-url"
+                        value={newJob.job_url}
+                        onChange={(e) => setNewJob({ ...newJob, job_url: e.target.value })}
+                        placeholder="https://..."
+                        data-testid="job-url-input"
+                      />
+                      <Button
+                        type="button"
+                        variant="outline"
+                        onClick={fetchJobDetails}
+                        disabled={fetchingDetails}
+                        data-testid="fetch-job-details-button"
+                      >
+                        {fetchingDetails ? <Loader2 className="w-4 h-4 animate-spin" strokeWidth={1.5} /> : 'Fetch details'}
+                      </Button>
+                    </div>
                   </div>
                 </div>
                 <div>
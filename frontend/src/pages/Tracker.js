@@ -4,7 +4,8 @@ import { DndContext, DragOverlay, closestCorners, PointerSensor, useSensor, useS
 import { SortableContext, verticalListSortingStrategy, useSortable } from '@dnd-kit/sortable';
 import { CSS } from '@dnd-kit/utilities';
 import { jobsAPI } from '../utils/api';
-import { statusLabels, formatRelativeDate } from '../utils/helpers';
+import { statusLabels, formatRelativeDate, upsertById, mergeById, removeById } from '../utils/helpers';
+import { useLiveEvents } from '../hooks/use-live-events';
 import { useNavigate } from 'react-router-dom';
 import { Building2, GripVertical } from 'lucide-react';
 import { Card } from '../components/ui/card';
@@ -103,6 +104,12 @@ export const Tracker = () => {
     fetchJobs();
   }, []);
 
+  useLiveEvents({
+    'job.created': (job) => setJobs((prev) => upsertById(prev, job, 'job_id')),
+    'job.updated': (job) => setJobs((prev) => mergeById(prev, job, 'job_id')),
+    'job.deleted': ({ job_id }) => setJobs((prev) => removeById(prev, job_id, 'job_id')),
+  });
+
   const fetchJobs = async () => {
     try {
       const response = await jobsAPI.getAll();
@@ -135,7 +142,7 @@ export const Tracker = () => {
       if (job && job.status !== newStatus) {
         try {
           await jobsAPI.update(jobId, { status: newStatus });
-          setJobs(jobs.map((j) => (j.job_id === jobId ? { ...j, status: newStatus } : j)));
+          setJobs((prev) => mergeById(prev, { job_id: jobId, status: newStatus }, 'job_id'));
           toast.success(`Moved to ${statusLabels[newStatus]}`);
         } catch (error) {
           toast.error('Failed to update job status');
@@ -2,6 +2,7 @@ import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export const API_URL = `${BACKEND_URL}/api`;
+export const EVENTS_URL = `${API_URL}/events`;
 
 export const api = axios.create({
   baseURL: API_URL,
@@ -11,6 +12,35 @@ export const api = axios.create({
   },
 });
 
+// POSTs a JSON body and invokes onEvent for every NDJSON line of the response
+// as it arrives. Uses fetch because axios cannot expose a streaming body in the browser.
+export const streamNdjson = async (path, body, onEvent) => {
+  const response = await fetch(`${API_URL}${path}`, {
+    method: 'POST',
+    credentials: 'include',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffer.trim()) {
+    onEvent(JSON.parse(buffer));
+  }
+};
+
 export const authAPI = {
   createSession: (sessionId) => api.post('/auth/session', { session_id: sessionId }),
   getMe: () => api.get('/auth/me'),
@@ -21,8 +51,15 @@ export const jobsAPI = {
   getAll: () => api.get('/jobs'),
   getOne: (jobId) => api.get(`/jobs/${jobId}`),
   create: (jobData) => api.post('/jobs', jobData),
+  fromUrl: (url, save = false) => api.post('/jobs/from-url', { url, save }),
   update: (jobId, jobData) => api.patch(`/jobs/${jobId}`, jobData),
   delete: (jobId) => api.delete(`/jobs/${jobId}`),
+  searchStream: (searchParams, onEvent) => streamNdjson('/jobs/search/stream', searchParams, onEvent),
+  batch: (operations) => api.post('/jobs/batch', { operations }),
+  batchStream: (operations, onEvent) => streamNdjson('/jobs/batch', { operations, stream: true }, onEvent),
+  similar: (jobId, limit = 10) => api.get(`/jobs/${jobId}/similar`, { params: { limit } }),
+  score: (userResume = null, jobIds = null, overwrite = false) =>
+    api.post('/jobs/score', { user_resume: userResume, job_ids: jobIds, overwrite }),
 };
 
 export const goalsAPI = {
@@ -44,11 +81,52 @@ export const remindersAPI = {
   delete: (reminderId) => api.delete(`/reminders/${reminderId}`),
 };
 
+export const batchAPI = {
+  // Several GET reads in one round trip; resolves to { id: body } and rejects if any read failed
+  read: async (requests) => {
+    const response = await api.post('/batch', { requests });
+    const results = Object.entries(response.data.results);
+    const failed = results.find(([, result]) => result.status !== 200);
+    if (failed) {
+      throw new Error(`Batch read ${failed[0]} failed: ${failed[1].detail}`);
+    }
+    return Object.fromEntries(results.map(([id, result]) => [id, result.body]));
+  },
+};
+
+export const dataAPI = {
+  // Downloads go through a plain link so the browser streams the file to disk
+  exportUrl: (format = 'ndjson', collections = 'jobs,tasks,reminders,goals') =>
+    `${API_URL}/export?format=${format}&collections=${encodeURIComponent(collections)}`,
+  import: (file, format = 'ndjson', collection = 'jobs') =>
+    api.post('/import', file, {
+      params: { format, collection },
+      headers: { 'Content-Type': format === 'csv' ? 'text/csv' : 'application/x-ndjson' },
+    }),
+};
+
+export const analyticsAPI = {
+  get: (weeks = 12) => api.get('/analytics', { params: { weeks } }),
+};
+
+export const resumesAPI = {
+  getAll: () => api.get('/resumes'),
+  getOne: (resumeId) => api.get(`/resumes/${resumeId}`),
+  save: (version, text) => api.post('/resumes', { version, text }),
+  delete: (resumeId) => api.delete(`/resumes/${resumeId}`),
+};
+
+// `resume` is either raw resume text or { resumeId } / { resumeVersion } for a stored one
+const resumeFields = (resume) =>
+  resume && typeof resume === 'object'
+    ? { resume_id: resume.resumeId, resume_version: resume.resumeVersion }
+    : { user_resume: resume };
+
 export const aiAPI = {
-  analyzeJob: (jobDescription, userResume) => 
-    api.post('/ai/analyze-job', { job_description: jobDescription, user_resume: userResume }),
-  generateCoverLetter: (jobDescription, userResume) => 
-    api.post('/ai/generate-cover-letter', { job_description: jobDescription, user_resume: userResume }),
+  analyzeJob: (jobDescription, resume) => 
+    api.post('/ai/analyze-job', { job_description: jobDescription, ...resumeFields(resume) }),
+  generateCoverLetter: (jobDescription, resume) => 
+    api.post('/ai/generate-cover-letter', { job_description: jobDescription, ...resumeFields(resume) }),
   generateEmail: (jobTitle, company, recipientName, emailType) => 
     api.post('/ai/generate-email', { job_title: jobTitle, company, recipient_name: recipientName, email_type: emailType }),
 };
@@ -40,3 +40,23 @@ export const statusLabels = {
   offer: 'Offer',
   rejected: 'Rejected',
 };
+
+// Apply a realtime change event to a list of records identified by idField.
+// Partial payloads (e.g. { task_id, completed }) are merged into the existing record.
+// Null values are not merged: live events leave out fields the server stores
+// elsewhere (a job's description arrives as null) and must not blank them.
+export const upsertById = (list, record, idField) => {
+  const index = list.findIndex((item) => item[idField] === record[idField]);
+  if (index === -1) return [...list, record];
+  const changes = Object.fromEntries(Object.entries(record).filter(([, value]) => value !== null && value !== undefined));
+  const next = [...list];
+  next[index] = { ...next[index], ...changes };
+  return next;
+};
+
+// Apply an update event to a listed record only. An update for a record the list
+// does not hold is ignored: its payload may be partial and would render as a blank row.
+export const mergeById = (list, record, idField) =>
+  list.some((item) => item[idField] === record[idField]) ? upsertById(list, record, idField) : list;
+
+export const removeById = (list, id, idField) => list.filter((item) => item[idField] !== id);
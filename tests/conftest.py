@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import uuid
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+# server.py reads these at import time; the tests bind a mongomock database instead
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "jobflow_test")
+os.environ["REMINDER_SCHEDULER_ENABLED"] = "false"
+os.environ["TASK_GENERATION_ENABLED"] = "false"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+USER_ID = "user_1"
+SESSION_TOKEN = "token_1"
+JOB = {"user_id": USER_ID, "title": "Engineer", "company": "Acme", "source": "Manual", "status": "saved", "date_added": "2026-03-02T10:00:00+00:00"}
+
+
+@pytest.fixture
+def api_db():
+    """
+    A mongomock database bound to the server, with user_1 signed in through session token_1
+    """
+    import server
+
+    db = AsyncMongoMockClient()[f"api_{uuid.uuid4().hex}"]
+    server.bind_database(db)
+
+    async def sign_in():
+        await db.user_sessions.insert_one({"user_id": USER_ID, "session_token": SESSION_TOKEN, "expires_at": "2999-01-01T00:00:00+00:00"})
+        await db.users.insert_one({"user_id": USER_ID, "email": "a@example.com", "name": "A", "created_at": "2026-01-01T00:00:00+00:00"})
+
+    asyncio.run(sign_in())
+    return db
+
+
+@pytest.fixture
+def api(api_db):
+    """
+    Calls the app in process as user_1: api("GET", "/api/jobs") returns the httpx response
+    """
+    import server
+
+    def call(method, path, headers=None, **kwargs):
+        async def run():
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path, headers={"Cookie": f"session_token={SESSION_TOKEN}", **(headers or {})}, **kwargs)
+
+        return asyncio.run(run())
+
+    return call
+
+
+@pytest.fixture
+def insert_jobs(api_db):
+    """
+    Adds saved jobs owned by user_1: insert_jobs("job_1", "job_2", title="Python Engineer")
+    """
+
+    def insert(*job_ids, **fields):
+        asyncio.run(api_db.jobs.insert_many([{**JOB, "job_id": job_id, **fields} for job_id in job_ids]))
+
+    return insert
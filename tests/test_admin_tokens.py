@@ -0,0 +1,24 @@
+import pytest
+
+import server
+from profiling import PROFILE_HEADER, Profiler
+
+
+@pytest.mark.parametrize("authorization, expected", [
+    ("Bearer s3cret", 200),
+    ("Bearer s3cre", 401),
+    ("Bearer s3cret-and-more", 401),
+    ("Basic s3cret", 401),
+    (None, 401),
+])
+def test_metrics_token(api, monkeypatch, authorization, expected):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "s3cret")
+    headers = {"Authorization": authorization} if authorization else {}
+    assert api("GET", "/metrics", headers=headers).status_code == expected
+
+
+@pytest.mark.parametrize("value, expected", [(b"s3cret", "header"), (b"s3cre", None), (b"", None)])
+def test_profile_header_token(value, expected):
+    profiler = Profiler(store=None, token="s3cret")
+    scope = {"path": "/api/jobs", "headers": [(PROFILE_HEADER, value)]}
+    assert profiler.trigger(scope) == expected
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from analytics import JobAnalytics
+
+
+def job(number, status="saved", user_id="user_1"):
+    return {"job_id": f"job_{number}", "user_id": user_id, "source": "LinkedIn", "status": status, "date_added": "2026-03-02T10:00:00+00:00"}
+
+
+@pytest.fixture
+def analytics():
+    analytics = JobAnalytics(AsyncMongoMockClient()["analytics_test"])
+    asyncio.run(analytics.ensure_indexes())
+    return analytics
+
+
+async def add_job(analytics, document):
+    await analytics.db.jobs.insert_one(dict(document))
+    await analytics.record(None, document)
+
+
+def test_concurrent_first_summaries_rebuild_once(analytics):
+    passes = []
+    replace_rollups = analytics._replace_rollups
+
+    async def counted(user_id):
+        passes.append(user_id)
+        await asyncio.sleep(0.05)
+        await replace_rollups(user_id)
+
+    analytics._replace_rollups = counted
+
+    async def run():
+        await analytics.db.jobs.insert_many([job(n) for n in range(3)])
+        return await asyncio.gather(*(analytics.summary("user_1") for _ in range(4)))
+
+    summaries = asyncio.run(run())
+    assert passes == ["user_1"]
+    assert [s["total_jobs"] for s in summaries] == [3] * 4
+
+
+def test_write_during_rebuild_is_counted_once(analytics):
+    replace_rollups = analytics._replace_rollups
+    written = []
+
+    async def racing(user_id):
+        await replace_rollups(user_id)
+        if not written:
+            # A job saved through the API while the first pass was writing its rollups
+            written.append(True)
+            await add_job(analytics, job(99))
+
+    analytics._replace_rollups = racing
+
+    async def run():
+        await analytics.db.jobs.insert_many([job(n) for n in range(3)])
+        return await analytics.summary("user_1")
+
+    assert asyncio.run(run())["total_jobs"] == 4
+
+
+def test_write_racing_the_claim_forces_another_rebuild(analytics):
+    async def run():
+        await analytics.db.jobs.insert_many([job(n) for n in range(3)])
+        await analytics.summary("user_1")
+
+        # The job is written and its increment checked the state, then a rebuild claims and scans before the increment lands
+        document = job(99, status="applied")
+        await analytics.db.jobs.insert_one(dict(document))
+        states = analytics._states
+
+        async def states_then_rebuild(user_ids):
+            result = await states(user_ids)
+            if not hasattr(states_then_rebuild, "done"):
+                states_then_rebuild.done = True
+                await analytics.rebuild("user_1")
+            return result
+
+        analytics._states = states_then_rebuild
+        await analytics.record(None, document)
+        analytics._states = states
+        return await analytics.summary("user_1")
+
+    summary = asyncio.run(run())
+    assert summary["total_jobs"] == 4
+    assert summary["funnel"]["applied"] == 1
+
+
+def test_records_update_rollups_incrementally(analytics):
+    async def run():
+        await analytics.summary("user_1")
+        await add_job(analytics, job(1))
+        await analytics.db.jobs.update_one({"job_id": "job_1"}, {"$set": {"status": "applied"}})
+        await analytics.record(job(1), job(1, status="applied"))
+        return await analytics.summary("user_1")
+
+    summary = asyncio.run(run())
+    assert summary["funnel"]["saved"] == 0
+    assert summary["funnel"]["applied"] == 1
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+import server
+from data_access import current_policy
+
+READS = [
+    ("/jobs", {}),
+    ("/goals", {}),
+    ("/tasks", {"date": "2026-03-02"}),
+    ("/reminders", {}),
+    ("/resumes", {}),
+    ("/analytics", {"weeks": 4}),
+]
+
+
+@pytest.fixture
+def db(api_db, insert_jobs):
+    insert_jobs("job_1", "job_2")
+    insert_jobs("job_3", status="applied", applied_date="2026-03-01T00:00:00+00:00")
+    asyncio.run(api_db.daily_tasks.insert_one({
+        "task_id": "task_1", "user_id": "user_1", "date": "2026-03-02", "task_type": "application",
+        "description": "Apply to Acme", "completed": False, "created_at": "2026-03-02T08:00:00+00:00",
+    }))
+    asyncio.run(api_db.reminders.insert_one({
+        "reminder_id": "rem_1", "user_id": "user_1", "job_id": "job_1", "message": "Follow up", "reminder_date": "2026-03-03T09:00:00+00:00",
+        "completed": False, "created_at": "2026-03-01T09:00:00+00:00",
+    }))
+    return api_db
+
+
+@pytest.fixture
+def batch(api):
+    def request(reads):
+        response = api("POST", "/api/batch", json={"requests": reads})
+        assert response.status_code == 200, response.text
+        return response.json()["results"]
+
+    return request
+
+
+def test_bodies_match_the_get_routes(db, api, batch):
+    results = batch([{"path": path, "params": params} for path, params in READS])
+    for path, params in READS:
+        direct = api("GET", f"/api{path}", params=params)
+        assert direct.status_code == 200, path
+        assert results[path] == {"status": 200, "body": direct.json()}, path
+
+
+def test_failed_sub_read_does_not_fail_the_others(db, batch):
+    results = batch([
+        {"id": "jobs", "path": "/jobs"},
+        {"id": "bad_weeks", "path": "/analytics", "params": {"weeks": "many"}},
+        {"id": "reminders", "path": "/reminders"},
+    ])
+    assert results["bad_weeks"]["status"] == 422
+    assert results["jobs"]["status"] == 200 and len(results["jobs"]["body"]) == 3
+    assert results["reminders"]["status"] == 200
+
+
+def test_sub_read_errors_become_their_status(db, batch, monkeypatch):
+    async def busy(user_id, params):
+        raise server.QUERY_TIMEOUT_ERRORS[0]("operation exceeded time limit", 50)
+
+    async def missing(user_id, params):
+        raise server.HTTPException(status_code=404, detail="Resume not found")
+
+    monkeypatch.setitem(server.BATCH_READERS, "/goals", (busy, *server.BATCH_READERS["/goals"][1:]))
+    monkeypatch.setitem(server.BATCH_READERS, "/resumes", (missing, *server.BATCH_READERS["/resumes"][1:]))
+    results = batch([{"path": "/goals"}, {"path": "/resumes"}, {"path": "/tasks"}])
+    assert results["/goals"] == {"status": 503, "detail": "Database is busy, please retry"}
+    assert results["/resumes"] == {"status": 404, "detail": "Resume not found"}
+    assert results["/tasks"]["status"] == 200
+
+
+def test_each_sub_read_runs_under_its_route_policy(db, batch, monkeypatch):
+    seen = {}
+
+    def recording(path):
+        reader, adapter, policy = server.BATCH_READERS[path]
+
+        async def read(user_id, params):
+            await asyncio.sleep(0)
+            seen[path] = current_policy.get()
+            return await reader(user_id, params)
+
+        return read, adapter, policy
+
+    for path, _ in READS:
+        monkeypatch.setitem(server.BATCH_READERS, path, recording(path))
+    batch([{"path": path, "params": params} for path, params in READS])
+    assert seen == {
+        "/jobs": server.QUERY_POLICIES["list"],
+        "/goals": server.QUERY_POLICIES["default"],
+        "/tasks": server.QUERY_POLICIES["list"],
+        "/reminders": server.QUERY_POLICIES["list"],
+        "/resumes": server.QUERY_POLICIES["list"],
+        "/analytics": server.QUERY_POLICIES["analytics"],
+    }
+
+
+@pytest.mark.parametrize("reads", [
+    [{"path": "/jobs"}, {"path": "/jobs"}],
+    [{"id": "a", "path": "/jobs"}, {"id": "a", "path": "/tasks"}],
+    [{"id": "/jobs", "path": "/tasks"}, {"path": "/jobs"}],
+])
+def test_duplicate_ids_are_rejected(db, api, reads):
+    response = api("POST", "/api/batch", json={"requests": reads})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Batch read ids must be unique"
+
+
+def test_same_path_with_distinct_ids(db, batch):
+    results = batch([
+        {"id": "today", "path": "/tasks", "params": {"date": "2026-03-02"}},
+        {"id": "tomorrow", "path": "/tasks", "params": {"date": "2026-03-03"}},
+    ])
+    assert [task["task_id"] for task in results["today"]["body"]] == ["task_1"]
+    assert results["tomorrow"]["body"] == []
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import ExecutionTimeout
+
+import server
+from data_access import Database
+
+
+class SlowCursor:
+    def __init__(self, collection, cursor):
+        self._collection = collection
+        self._cursor = cursor
+        self._max_time_ms = None
+
+    def max_time_ms(self, ms):
+        self._max_time_ms = ms
+        return self
+
+    def __getattr__(self, attr):
+        value = getattr(self._cursor, attr)
+        if not callable(value):
+            return value
+
+        def chained(*args, **kwargs):
+            result = value(*args, **kwargs)
+            return self if result is self._cursor else result
+
+        return chained
+
+    async def to_list(self, length=None):
+        await self._collection.serve("find", self._max_time_ms)
+        return await self._cursor.to_list(length)
+
+    async def _iterate(self):
+        await self._collection.serve("find", self._max_time_ms)
+        async for document in self._cursor:
+            yield document
+
+    def __aiter__(self):
+        return self._iterate()
+
+
+class SlowCollection:
+    """
+    A mongomock collection that takes `latency_ms` to answer each read and, like a server,
+    aborts reads whose maxTimeMS is shorter than that. Every read is logged with the
+    read preference of the collection it went through.
+    """
+
+    def __init__(self, database, collection, read_preference):
+        self._database = database
+        self._collection = collection
+        self.read_preference = read_preference
+
+    async def serve(self, method, max_time_ms):
+        name = self._collection.name
+        self._database.reads.append((name, method, self.read_preference))
+        latency_ms = self._database.latency_ms.get(name, 0)
+        # Scaled down so the suite stays fast; the deadline check uses the simulated latency
+        await asyncio.sleep(latency_ms / 100000)
+        if max_time_ms and latency_ms > max_time_ms:
+            raise ExecutionTimeout("operation exceeded time limit", 50)
+
+    def __getattr__(self, attr):
+        return getattr(self._collection, attr)
+
+    def find(self, *args, **kwargs):
+        return SlowCursor(self, self._collection.find(*args, **kwargs))
+
+    async def find_one(self, *args, max_time_ms=None, **kwargs):
+        await self.serve("find_one", max_time_ms)
+        return await self._collection.find_one(*args, **kwargs)
+
+
+class ReplicaSet:
+    """
+    A primary and a lagging secondary: writes land on the primary only, and reads with a
+    secondary read preference are served from a snapshot that has not caught up yet
+    """
+
+    def __init__(self):
+        self.primary = AsyncMongoMockClient()[f"primary_{uuid.uuid4().hex}"]
+        self.secondary = AsyncMongoMockClient()[f"secondary_{uuid.uuid4().hex}"]
+        self.latency_ms = {}
+        self.reads = []
+
+    def __getitem__(self, name):
+        return SlowCollection(self, self.primary[name], "primary")
+
+    def get_collection(self, name, read_preference=None):
+        if read_preference is not None and read_preference.mongos_mode != "primary":
+            return SlowCollection(self, self.secondary[name], read_preference.mongos_mode)
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+@pytest.fixture
+def replica_set():
+    database = ReplicaSet()
+    server.bind_database(Database(database))
+    return database
+
+
+async def login(database, user_id="user_test"):
+    """
+    A user and session written to the primary only, as right after /auth/session
+    """
+    token = uuid.uuid4().hex
+    now = datetime.now(timezone.utc)
+    await database.primary.users.insert_one({
+        "user_id": user_id, "email": f"{user_id}@example.com", "name": "Test", "picture": None, "created_at": now.isoformat(),
+    })
+    await database.primary.user_sessions.insert_one({
+        "user_id": user_id, "session_token": token, "expires_at": (now + timedelta(days=7)).isoformat(), "created_at": now.isoformat(),
+    })
+    return {"Cookie": f"session_token={token}"}
+
+
+async def request(method, path, headers, **kwargs):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, headers=headers, **kwargs)
+
+
+def test_list_reads_go_to_secondary_but_auth_reads_stay_on_primary(replica_set):
+    async def run():
+        headers = await login(replica_set)
+        await replica_set.primary.jobs.insert_one({"job_id": "job_1", "user_id": "user_test", "title": "Engineer", "company": "Acme", "status": "saved"})
+        return await request("GET", "/api/jobs", headers)
+
+    response = asyncio.run(run())
+    # The fresh session is found although the secondary has not replicated it
+    assert response.status_code == 200
+    # ...while the list itself came from the lagging secondary
+    assert response.json() == []
+    routes = {(name, method): preference for name, method, preference in replica_set.reads}
+    assert routes[("user_sessions", "find_one")] == "primary"
+    assert routes[("users", "find_one")] == "primary"
+    assert routes[("jobs", "find")] == "secondaryPreferred"
+
+
+def test_default_policy_reads_use_primary(replica_set):
+    async def run():
+        headers = await login(replica_set)
+        await replica_set.primary.jobs.insert_one({"job_id": "job_1", "user_id": "user_test", "title": "Engineer", "company": "Acme", "status": "saved"})
+        return await request("GET", "/api/jobs/job_1", headers)
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert {preference for _, _, preference in replica_set.reads} == {"primary"}
+
+
+def test_list_deadline_exceeded_returns_503(replica_set):
+    list_deadline = server.QUERY_POLICIES["list"].max_time_ms
+    replica_set.latency_ms["jobs"] = list_deadline + 500
+
+    async def run():
+        headers = await login(replica_set)
+        return await request("GET", "/api/jobs", headers)
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.json()["detail"] == "Database is busy, please retry"
+
+
+def test_deadlines_are_per_route(replica_set):
+    # Slower than the default deadline, within the list deadline
+    default_deadline = server.QUERY_POLICIES["default"].max_time_ms
+    assert server.QUERY_POLICIES["list"].max_time_ms > default_deadline + 100
+    replica_set.latency_ms["jobs"] = default_deadline + 100
+
+    async def run():
+        headers = await login(replica_set)
+        await replica_set.primary.jobs.insert_one({"job_id": "job_1", "user_id": "user_test", "title": "Engineer", "company": "Acme", "status": "saved"})
+        return await request("GET", "/api/jobs", headers), await request("GET", "/api/jobs/job_1", headers)
+
+    listed, single = asyncio.run(run())
+    assert listed.status_code == 200
+    assert single.status_code == 503
+
+
+def test_batch_reports_deadline_per_sub_read(replica_set):
+    replica_set.latency_ms["daily_tasks"] = server.QUERY_POLICIES["list"].max_time_ms + 500
+
+    async def run():
+        headers = await login(replica_set)
+        return await request("POST", "/api/batch", headers, json={"requests": [
+            {"id": "jobs", "path": "/jobs"},
+            {"id": "tasks", "path": "/tasks"},
+        ]})
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results["jobs"]["status"] == 200
+    assert results["tasks"] == {"status": 503, "detail": "Database is busy, please retry"}
+
+
+def test_import_runs_without_a_deadline_and_leaves_rollups_to_the_next_summary(replica_set):
+    replica_set.latency_ms["jobs"] = server.QUERY_POLICIES["default"].max_time_ms + 500
+    body = "\n".join(json.dumps({"type": "job", "data": {"job_id": f"job_{n}", "title": "Engineer", "company": "Acme"}}) for n in range(3))
+
+    async def run():
+        headers = await login(replica_set)
+        response = await request("POST", "/api/import", headers, content=body.encode())
+        return response, await replica_set.primary.job_daily_rollups.count_documents({})
+
+    response, rollups = asyncio.run(run())
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"]["jobs"] == 3
+    assert ("jobs", "find", "primary") in replica_set.reads
+    # No full rebuild inside the request
+    assert rollups == 0
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import uuid
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from data_transfer import DataImporter
+
+
+class RecordingDatabase:
+    """
+    A mongomock database that logs which collection each bulk_write went to, in order
+    """
+
+    def __init__(self):
+        self.db = AsyncMongoMockClient()[f"import_{uuid.uuid4().hex}"]
+        self.writes = []
+
+    def __getitem__(self, name):
+        collection = self.db[name]
+        writes = self.writes
+
+        class Recording:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def bulk_write(self, operations, **kwargs):
+                writes.append(name)
+                return await collection.bulk_write(operations, **kwargs)
+
+        return Recording()
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def job_record(number, title=None):
+    return {"job_id": f"job_{number}", "title": title or f"Engineer {number}", "company": "Acme", "description": f"Role number {number}"}
+
+
+async def records(items):
+    for line_number, data in enumerate(items, 1):
+        yield line_number, "job", data
+
+
+def test_job_texts_are_written_before_job_rows():
+    database = RecordingDatabase()
+    importer = DataImporter(database, "user_1", server.IMPORT_NORMALIZERS)
+    summary = asyncio.run(importer.run(records([job_record(1), job_record(2)])))
+    assert summary["imported"]["jobs"] == 2
+    assert database.writes == ["job_texts", "jobs"]
+
+
+def test_texts_of_rejected_job_rows_are_removed():
+    database = RecordingDatabase()
+
+    async def run():
+        # Stands in for any write error on the row insert
+        await database.db.jobs.create_index("title", unique=True)
+        await database.db.jobs.insert_one({"job_id": "job_other", "user_id": "user_2", "title": "Taken"})
+        importer = DataImporter(database, "user_1", server.IMPORT_NORMALIZERS)
+        summary = await importer.run(records([job_record(1), job_record(2, title="Taken")]))
+        texts = [doc["job_id"] async for doc in database.db.job_texts.find({}, {"_id": 0, "job_id": 1})]
+        return summary, texts
+
+    summary, texts = asyncio.run(run())
+    assert summary["imported"]["jobs"] == 1
+    assert texts == ["job_1"]
+
+
+def test_import_size_is_checked_before_reading(api, api_db, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_MAX_BYTES", 100)
+    body = "\n".join(json.dumps({"type": "job", "data": job_record(n)}) for n in range(5)).encode()
+
+    async def chunked():
+        yield body
+
+    assert api("POST", "/api/import", content=body).status_code == 413
+    assert api("POST", "/api/import", content=chunked()).status_code == 411
+    assert asyncio.run(api_db.jobs.count_documents({})) == 0
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import server
+from event_bus import ChangeStreamRelay, EventBus
+
+
+class FakeDatabase:
+    def __init__(self, hello):
+        self.hello = hello
+
+    async def command(self, name):
+        assert name == "hello"
+        return self.hello
+
+
+@pytest.mark.parametrize("source, workers, similarity", [
+    ("local", 4, True),
+    ("off", 1, True),
+    ("redis", 1, False),
+])
+def test_event_source_misconfiguration_fails_startup(monkeypatch, source, workers, similarity):
+    monkeypatch.setattr(server, "EVENT_SOURCE", source)
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", workers)
+    monkeypatch.setattr(server, "SIMILARITY_INDEX_ENABLED", similarity)
+    with pytest.raises(RuntimeError):
+        server.check_event_source()
+
+
+@pytest.mark.parametrize("source, workers", [("local", 1), ("changestream", 4)])
+def test_event_source_accepted(monkeypatch, source, workers):
+    monkeypatch.setattr(server, "EVENT_SOURCE", source)
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", workers)
+    server.check_event_source()
+
+
+def test_local_publishing_is_off_unless_events_are_local(monkeypatch):
+    published = []
+    monkeypatch.setattr(server.event_bus, "publish", lambda *args: published.append(args))
+    for source in ("changestream", "off", "local"):
+        monkeypatch.setattr(server, "EVENT_SOURCE", source)
+        server.publish_change("user_1", "job.deleted", {"job_id": "job_1"})
+    assert published == [("user_1", "job.deleted", {"job_id": "job_1"})]
+
+
+def test_change_stream_relay_refuses_standalone_server():
+    relay = ChangeStreamRelay(FakeDatabase({"isWritablePrimary": True}), EventBus())
+    with pytest.raises(RuntimeError, match="replica set"):
+        asyncio.run(relay.start())
+
+
+def test_reminder_update_publishes_the_whole_reminder(api, api_db, monkeypatch):
+    published = []
+    monkeypatch.setattr(server, "EVENT_SOURCE", "local")
+    monkeypatch.setattr(server.event_bus, "publish", lambda *args: published.append(args))
+    reminder = {"reminder_id": "rem_1", "user_id": "user_1", "message": "Follow up", "reminder_date": "2026-03-02T10:00:00+00:00", "completed": True}
+    asyncio.run(api_db.reminders.insert_one(dict(reminder)))
+
+    assert api("PATCH", "/api/reminders/rem_1", params={"completed": "false"}).status_code == 200
+    # Marked incomplete again: the dashboard needs the message and date to list it
+    assert published == [("user_1", "reminder.updated", {**reminder, "completed": False})]
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from email.utils import formatdate
+
+import pytest
+
+from http_fetch import FixtureMissing, FixtureStore, HttpFetcher, ResponseCache, freshness_lifetime, is_storable
+from job_scraper import JobScraper
+
+# Recorded search for "python": RemoteOK, We Work Remotely and Indeed
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "http")
+NOW = 1_772_000_000
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+
+class FakeServer:
+    """
+    Answers each GET with the next queued (status, headers, body) and records the request headers
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    @asynccontextmanager
+    async def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers)
+        yield FakeResponse(*self.responses.pop(0))
+
+    @asynccontextmanager
+    async def session(self, url):
+        yield self
+
+
+def no_network(url):
+    raise AssertionError(f"replay mode opened a connection to {url}")
+
+
+def http_date(timestamp):
+    return formatdate(timestamp, usegmt=True)
+
+
+def cache_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def test_concurrent_stores_keep_the_cache_within_its_budget(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=50_000)
+
+    def store(worker):
+        for n in range(200):
+            key = f"{(worker * 1000 + n) % 600:040x}"
+            cache.store(key, 200, {"content-type": "text/html"}, b"x" * 500, {})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        # Raises here if eviction iterates the size map while another thread writes to it,
+        # or a store looks for a file another thread just evicted
+        list(pool.map(store, range(8)))
+
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+    assert cache_bytes(tmp_path) <= 50_000
+
+
+def test_search_jobs_replays_recorded_responses(monkeypatch):
+    monkeypatch.setenv("SCRAPER_HTTP_MODE", "replay")
+    monkeypatch.setenv("SCRAPER_FIXTURES_DIR", FIXTURES)
+    scraper = JobScraper()
+    monkeypatch.setattr(scraper, "_client_session", no_network)
+    jobs = asyncio.run(scraper.search_jobs("python", max_results=9))
+    assert [(job.title, job.company, job.source) for job in jobs] == [
+        ("Senior Python Engineer", "Acme", "RemoteOK"),
+        ("Data Engineer", "Initech", "RemoteOK"),
+        ("Backend Python Developer", "Hooli", "We Work Remotely"),
+        # Indeed's "Senior Python Engineer" at ACME is the RemoteOK job again
+        ("Python Developer", "Umbrella", "Indeed"),
+    ]
+    assert jobs[0].salary_range == "150000" and jobs[0].tags == ("python", "aws")
+    assert jobs[2].job_url == "https://weworkremotely.com/remote-jobs/hooli-backend-python-developer"
+    assert (jobs[3].location, jobs[3].is_remote) == ("Austin, TX", False)
+
+
+def test_replay_without_a_recording_raises(tmp_path):
+    fetcher = HttpFetcher("replay", fixtures=FixtureStore(str(tmp_path)))
+    with pytest.raises(FixtureMissing):
+        asyncio.run(fetcher.get(no_network, "https://remoteok.com/api"))
+
+
+@pytest.mark.parametrize("headers, lifetime", [
+    ({"cache-control": "max-age=60", "expires": http_date(NOW + 600), "date": http_date(NOW)}, 60),
+    ({"cache-control": "max-age=60, s-maxage=30"}, 30),
+    ({"cache-control": "max-age=-5"}, 0),
+    ({"expires": http_date(NOW + 600), "date": http_date(NOW)}, 600),
+    ({"expires": http_date(NOW - 600), "date": http_date(NOW)}, 0),
+    ({"expires": "0", "date": http_date(NOW)}, 0),
+    # Last-Modified heuristic: a tenth of the time since the change, at most a day
+    ({"last-modified": http_date(NOW - 1000), "date": http_date(NOW)}, 100),
+    ({"last-modified": http_date(NOW - 365 * 86400), "date": http_date(NOW)}, 86400),
+    ({}, 5),
+])
+def test_freshness_lifetime(headers, lifetime):
+    assert freshness_lifetime(headers, heuristic_ttl=5) == lifetime
+
+
+@pytest.mark.parametrize("status, headers, storable", [
+    (200, {}, True),
+    (404, {"vary": "Accept-Language"}, True),
+    (200, {"cache-control": "no-store"}, False),
+    (200, {"cache-control": "private, max-age=60"}, False),
+    (200, {"vary": "*"}, False),
+    (302, {}, False),
+    (302, {"cache-control": "max-age=60"}, True),
+    (302, {"expires": http_date(NOW)}, True),
+    (500, {"cache-control": "public"}, True),
+])
+def test_is_storable(status, headers, storable):
+    assert is_storable(status, headers) is storable
+
+
+def test_stored_response_is_only_reused_for_matching_vary_headers(tmp_path):
+    server = FakeServer(
+        (200, {"cache-control": "max-age=600", "vary": "Accept-Language"}, b"english"),
+        (200, {"cache-control": "max-age=600", "vary": "Accept-Language"}, b"deutsch"),
+    )
+    fetcher = HttpFetcher(cache=ResponseCache(str(tmp_path)))
+
+    def get(language):
+        return asyncio.run(fetcher.get(server.session, "https://example.com/jobs", headers={"Accept-Language": language}))
+
+    assert get("en").body == b"english"
+    cached = get("en")
+    assert (cached.body, cached.from_cache) == (b"english", "hit")
+    assert get("de").body == b"deutsch"
+    assert len(server.requests) == 2
+
+
+def test_not_modified_refreshes_the_stored_headers(tmp_path):
+    stored_at = time.time()
+    server = FakeServer(
+        (200, {"cache-control": "max-age=0", "etag": '"v1"', "content-length": "4", "x-version": "1"}, b"jobs"),
+        (304, {"cache-control": "max-age=600", "date": http_date(stored_at), "content-length": "0"}, b""),
+    )
+    fetcher = HttpFetcher(cache=ResponseCache(str(tmp_path)))
+
+    def get():
+        return asyncio.run(fetcher.get(server.session, "https://example.com/jobs"))
+
+    assert get().from_cache == ""
+    revalidated = get()
+    assert server.requests[1]["if-none-match"] == '"v1"'
+    assert (revalidated.status, revalidated.body, revalidated.from_cache) == (200, b"jobs", "revalidated")
+
+    # Fresh again under the 304's max-age, so no third request
+    hit = get()
+    assert (hit.body, hit.from_cache) == (b"jobs", "hit")
+    assert len(server.requests) == 2
+    assert hit.headers["cache-control"] == "max-age=600"
+    # Headers the 304 did not send are kept, and its empty body's length is not
+    assert (hit.headers["x-version"], hit.headers["etag"], hit.headers["content-length"]) == ("1", '"v1"', "4")
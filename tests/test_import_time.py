@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import LAZY_MODULES, eager_imports, import_ms, import_profile
+
+# Wall-clock time depends on the machine, so the budget is only checked when set, as in CI
+IMPORT_BUDGET_MS = os.environ.get("IMPORT_BUDGET_MS")
+
+
+def test_server_import_loads_no_lazy_modules():
+    rows = import_profile("server")
+    assert "server" in {name for name, _, _, _ in rows}
+    assert eager_imports(rows) == []
+
+
+def test_eager_imports_counts_submodules():
+    rows = [("server", 10, 100, 0), ("bs4.element", 1, 1, 2), ("aiohttp_retry", 1, 1, 1)]
+    assert eager_imports(rows) == ["bs4"]
+    assert set(eager_imports([(name, 1, 1, 1) for name in LAZY_MODULES])) == set(LAZY_MODULES)
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="set IMPORT_BUDGET_MS to check the server import time")
+def test_server_import_is_within_budget():
+    # Best of three, so bytecode compilation on the first run does not count
+    assert min(import_ms(import_profile("server"), "server") for _ in range(3)) <= float(IMPORT_BUDGET_MS)
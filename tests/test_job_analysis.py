@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from job_analysis import AnalysisParseError, _repair_json, parse_analysis
+
+ANALYSIS = {"match_score": 82, "keywords": ["Python", "FastAPI", "MongoDB", "AWS", "Docker"], "summary": ["Builds APIs", "Owns the data layer", "Remote"]}
+REPLY = json.dumps(ANALYSIS)
+
+
+@pytest.mark.parametrize("candidate, repaired", [
+    ('{"keywords": ["a", "b",], "summary": ["c"],}', '{"keywords": ["a", "b"], "summary": ["c"]}'),
+    ('{"keywords": ["a",\n  ]\n}', '{"keywords": ["a"]\n}'),
+    ("{“match_score”: 70}", '{"match_score": 70}'),
+    ("{'match_score': 70, 'keywords': ['a']}", '{"match_score": 70, "keywords": ["a"]}'),
+    # Single quotes inside double-quoted strings are apostrophes, not string delimiters
+    ('{"summary": ["Team’s lead", "It\'s remote"]}', '{"summary": ["Team\'s lead", "It\'s remote"]}'),
+])
+def test_repair_json(candidate, repaired):
+    assert _repair_json(candidate) == repaired
+    json.loads(repaired)
+
+
+@pytest.mark.parametrize("reply", [
+    REPLY,
+    f"```json\n{REPLY}\n```",
+    f"Here is the analysis:\n```\n{REPLY}\n```\nLet me know if you need more.",
+    f"Sure! {REPLY} Hope this helps.",
+    REPLY.replace('"Docker"]', '"Docker",]').replace('"Remote"]', '"Remote",],'),
+])
+def test_parse_analysis_accepts_wrapped_and_sloppy_json(reply):
+    assert parse_analysis(reply).model_dump() == ANALYSIS
+
+
+def test_parse_analysis_normalises_values():
+    analysis = parse_analysis(json.dumps({
+        "match_score": "104.6",
+        "keywords": "Python, SQL , ,AWS",
+        "summary": [" One ", "", "Two", "Three", "Four", "Five", "Six"],
+    }))
+    assert analysis.match_score == 100
+    assert analysis.keywords == ["Python", "SQL", "AWS"]
+    assert analysis.summary == ["One", "Two", "Three", "Four", "Five"]
+
+
+def test_parse_analysis_falls_back_to_the_line_format():
+    reply = "MATCH_SCORE: 65/100\nKEYWORDS: Python, Kubernetes\nSUMMARY:\n- Runs the platform team\n* On call one week a month\nThanks!"
+    analysis = parse_analysis(reply)
+    assert (analysis.match_score, analysis.keywords) == (65, ["Python", "Kubernetes"])
+    assert analysis.summary == ["Runs the platform team", "On call one week a month"]
+
+
+@pytest.mark.parametrize("reply", [
+    # Cut off at the token limit
+    REPLY[:-20],
+    f"```json\n{REPLY[:40]}",
+    "I can't analyze this job description.",
+    "",
+    json.dumps({**ANALYSIS, "match_score": "high"}),
+    json.dumps({**ANALYSIS, "keywords": []}),
+    json.dumps({"match_score": 50}),
+])
+def test_parse_analysis_rejects_unusable_replies(reply):
+    with pytest.raises(AnalysisParseError):
+        parse_analysis(reply)
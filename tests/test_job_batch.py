@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def db(api_db, insert_jobs):
+    insert_jobs("job_1", "job_2")
+    insert_jobs("job_3", status="applied", applied_date="2026-03-01T00:00:00+00:00")
+    return api_db
+
+
+@pytest.fixture
+def call(api):
+    def request(method, path, **kwargs):
+        response = api(method, f"/api{path}", **kwargs)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return request
+
+
+@pytest.fixture
+def batch(call):
+    return lambda operations: call("POST", "/jobs/batch", json={"operations": operations})
+
+
+def find(db, collection, job_id):
+    return asyncio.run(db[collection].find_one({"job_id": job_id}, {"_id": 0}))
+
+
+def test_update_after_delete_of_the_same_job_is_not_found(db, batch):
+    response = batch([
+        {"op": "delete", "job_id": "job_1"},
+        {"op": "update", "job_id": "job_1", "fields": {"description": "Recreated?"}},
+        {"op": "set_status", "job_id": "job_1", "status": "applied"},
+    ])
+    assert [(r["ok"], r.get("error")) for r in response["results"]] == [(True, None), (False, "Job not found"), (False, "Job not found")]
+    assert find(db, "jobs", "job_1") is None
+    # No orphan text left for the deleted job
+    assert find(db, "job_texts", "job_1") is None
+
+
+def test_update_before_delete_of_the_same_job_succeeds(db, batch):
+    response = batch([
+        {"op": "update", "job_id": "job_1", "fields": {"notes": "Call back"}},
+        {"op": "delete", "job_id": "job_1"},
+    ])
+    assert [r["ok"] for r in response["results"]] == [True, True]
+    assert find(db, "jobs", "job_1") is None
+    assert find(db, "job_texts", "job_1") is None
+
+
+def test_unknown_job_is_not_found_and_others_apply(db, batch):
+    response = batch([
+        {"op": "update", "job_id": "job_missing", "fields": {"description": "Nothing here"}},
+        {"op": "update", "job_id": "job_2", "fields": {"description": "Build things", "company": "Globex"}},
+    ])
+    assert [r["ok"] for r in response["results"]] == [False, True]
+    assert find(db, "jobs", "job_2")["company"] == "Globex"
+    assert find(db, "job_texts", "job_2")["description"] == "Build things"
+    assert find(db, "job_texts", "job_missing") is None
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "update", "fields": {"status": "applied"}},
+    {"op": "set_status", "status": "applied"},
+])
+def test_moving_to_applied_stamps_applied_date(db, batch, operation):
+    response = batch([{**operation, "job_id": "job_1"}, {**operation, "job_id": "job_3"}])
+    assert all(r["ok"] for r in response["results"])
+    assert find(db, "jobs", "job_1")["applied_date"].startswith("20")
+    # A job that already has one keeps it
+    assert find(db, "jobs", "job_3")["applied_date"] == "2026-03-01T00:00:00+00:00"
+
+
+def test_single_job_patch_stamps_applied_date(db, call):
+    job = call("PATCH", "/jobs/job_2", json={"status": "applied"})
+    assert job["applied_date"] is not None
+    assert find(db, "jobs", "job_2")["applied_date"] is not None
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import socket
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from mongomock_motor import AsyncMongoMockClient
+
+import job_extract
+from http_fetch import HttpFetcher
+from job_extract import ExtractionError, JobExtractor, ensure_public_host, extract_job
+from job_scraper import JobScraper, PinnedResolver
+
+PUBLIC_IP = "93.184.216.34"
+DNS = {
+    "jobs.example.com": [PUBLIC_IP],
+    "internal.example.com": ["10.0.0.5"],
+    "mixed.example.com": [PUBLIC_IP, "127.0.0.1"],
+}
+PAGE = b"<html><head><title>Senior Python Engineer</title></head><body>Build things</body></html>"
+
+
+@pytest.fixture(autouse=True)
+def fake_dns(monkeypatch):
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host in DNS:
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port or 0)) for address in DNS[host]]
+        if host.replace(".", "").isdigit():
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        raise socket.gaierror(f"unknown host {host}")
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.content = FakeContent(body)
+
+    async def read(self):
+        return self.content.body
+
+
+class FakeNetwork:
+    """
+    Canned responses by URL, and a record of every connection the fetcher made
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+        self.pinned = []
+
+    @asynccontextmanager
+    async def pinned_session(self, host, addresses):
+        self.pinned.append((host, addresses))
+        yield self
+
+    @asynccontextmanager
+    async def get(self, url, headers=None, timeout=None, allow_redirects=True):
+        assert allow_redirects is False
+        self.requested.append(url)
+        status, response_headers, body = self.responses[url]
+        yield FakeResponse(status, response_headers, body)
+
+
+def extractor_and_scraper(responses):
+    network = FakeNetwork(responses)
+    scraper = JobScraper()
+    scraper.fetcher = HttpFetcher("live")
+    scraper.pinned_session = network.pinned_session
+    return JobExtractor(AsyncMongoMockClient()["test"]), scraper, network
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/admin",
+    "http://169.254.169.254/latest/meta-data",
+    "http://internal.example.com/",
+    "http://mixed.example.com/",
+    "file:///etc/passwd",
+])
+def test_ensure_public_host_refuses_internal_targets(url):
+    with pytest.raises(ExtractionError) as error:
+        asyncio.run(ensure_public_host(url))
+    assert error.value.status_code == 400
+
+
+def test_ensure_public_host_returns_vetted_addresses():
+    assert asyncio.run(ensure_public_host("https://jobs.example.com/p/1")) == [PUBLIC_IP]
+
+
+def test_extract_follows_public_redirects_and_pins_each_hop():
+    extractor, scraper, network = extractor_and_scraper({
+        "https://jobs.example.com/p/1": (302, {"location": "/postings/1"}, b""),
+        "https://jobs.example.com/postings/1": (200, {"content-type": "text/html"}, PAGE),
+    })
+    fields, cached = asyncio.run(extractor.extract("https://jobs.example.com/p/1", scraper))
+    assert fields["title"] == "Senior Python Engineer"
+    assert not cached
+    assert network.pinned == [("jobs.example.com", [PUBLIC_IP]), ("jobs.example.com", [PUBLIC_IP])]
+
+
+@pytest.mark.parametrize("location", [
+    "http://169.254.169.254/latest/meta-data/",
+    "http://localhost:8001/admin",
+    "http://internal.example.com/",
+])
+def test_extract_refuses_redirect_to_internal_host(location):
+    extractor, scraper, network = extractor_and_scraper({
+        "https://jobs.example.com/p/1": (302, {"location": location}, b""),
+    })
+    with pytest.raises(ExtractionError) as error:
+        asyncio.run(extractor.extract("https://jobs.example.com/p/1", scraper))
+    assert error.value.status_code == 400
+    assert network.requested == ["https://jobs.example.com/p/1"]
+
+
+def test_extract_aborts_oversized_pages(monkeypatch):
+    monkeypatch.setattr(job_extract, "MAX_PAGE_BYTES", 1000)
+    extractor, scraper, _ = extractor_and_scraper({
+        "https://jobs.example.com/big": (200, {"content-type": "text/html"}, PAGE + b" " * 2000),
+        "https://jobs.example.com/declared": (200, {"content-type": "text/html", "content-length": "999999999"}, PAGE),
+    })
+    for url in ("https://jobs.example.com/big", "https://jobs.example.com/declared"):
+        with pytest.raises(ExtractionError, match="too large"):
+            asyncio.run(extractor.extract(url, scraper))
+
+
+def test_pinned_resolver_only_answers_for_vetted_host():
+    resolver = PinnedResolver("jobs.example.com", [PUBLIC_IP])
+    assert [r["host"] for r in asyncio.run(resolver.resolve("jobs.example.com", 443))] == [PUBLIC_IP]
+    with pytest.raises(OSError):
+        asyncio.run(resolver.resolve("internal.example.com", 443))
+
+
+def test_pinned_session_connects_to_vetted_address_not_dns():
+    async def echo_host(request):
+        return web.Response(text=request.host)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", echo_host)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            # DNS says 93.184.216.34; the connection still goes to the address vetted earlier
+            async with JobScraper().pinned_session("jobs.example.com", ["127.0.0.1"]) as session:
+                async with session.get(f"http://jobs.example.com:{port}/") as response:
+                    return await response.text(), port
+        finally:
+            await runner.cleanup()
+
+    host, port = asyncio.run(run())
+    assert host == f"jobs.example.com:{port}"
+
+
+def json_ld_page(graph, site_name="Example Jobs"):
+    return (
+        f'<html><head><meta property="og:site_name" content="{site_name}">'
+        f'<script type="application/ld+json">{json.dumps({"@context": "https://schema.org", "@graph": graph})}</script>'
+        "</head><body></body></html>"
+    )
+
+
+def test_json_ld_references_are_resolved_against_the_graph():
+    html = json_ld_page([
+        {"@type": "Organization", "@id": "#org", "name": "Acme Robotics"},
+        {"@type": "Place", "@id": "#office", "address": {"addressLocality": "Berlin", "addressCountry": "DE"}},
+        {"@type": "JobPosting", "title": "Firmware Engineer", "hiringOrganization": {"@id": "#org"}, "jobLocation": [{"@id": "#office"}]},
+    ])
+    fields = extract_job(html, "https://jobs.example.com/p/1")
+    assert fields["company"] == "Acme Robotics"
+    assert fields["location"] == "Berlin, DE"
+
+
+def test_unresolved_json_ld_reference_falls_back_to_meta():
+    html = json_ld_page([{"@type": "JobPosting", "title": "Firmware Engineer", "hiringOrganization": {"@id": "#missing"}}])
+    assert extract_job(html, "https://jobs.example.com/p/1")["company"] == "Example Jobs"
@@ -0,0 +1,41 @@
+import pytest
+
+from job_matching import matches_experience, query_matcher
+from job_posting import JobPosting
+
+
+def job(title, description=""):
+    return JobPosting(title=title, company="Acme", description=description)
+
+
+@pytest.mark.parametrize("title, description", [
+    ("Software Engineering Internship", ""),
+    ("Summer Internships 2026", ""),
+    ("Engineer", "Open to recent graduates"),
+    ("Software Engineer, New Grad", ""),
+    ("Backend Engineer", "We hire new grads every spring"),
+    ("Data Intern", ""),
+    ("Entry-Level Analyst", ""),
+    ("Junior Developer", ""),
+])
+def test_entry_level_matches_inflected_forms(title, description):
+    assert matches_experience(job(title, description), "entry")
+
+
+@pytest.mark.parametrize("title, description, level", [
+    ("International Sales Engineer", "", "entry"),
+    ("Engineer", "Undergraduate degree required", "entry"),
+    ("Backend Engineer", "Work on middleware", "mid"),
+    ("Engineer", "Misleading benchmarks", "senior"),
+])
+def test_levels_match_whole_words_only(title, description, level):
+    assert not matches_experience(job(title, description), level)
+
+
+def test_unknown_level_matches_everything():
+    assert matches_experience(job("Engineer"), "executive")
+
+
+def test_query_matches_substrings():
+    assert query_matcher("python").search("Senior Pythonista", None)
+    assert not query_matcher("python").search("Go Developer", "")
@@ -0,0 +1,96 @@
+import pytest
+
+from job_posting import FIELDS, JobPosting, postings_to_dicts
+from job_scraper import JobScraper
+from server import Job
+
+FEED_ITEM = {
+    "position": "Senior Python Engineer",
+    "company": "Acme",
+    "description": "x" * 600,
+    "date": "2026-03-02",
+    "url": "https://remoteok.com/remote-jobs/1",
+    "company_logo": "https://remoteok.com/logo.png",
+    "salary_max": 150000,
+    "tags": ["python", "django", "aws", "postgres", "docker", "k8s"],
+}
+
+
+def posting(title="Python Engineer", company="Acme", **fields):
+    return JobPosting(title=title, company=company, **fields)
+
+
+def test_to_dict_has_the_legacy_shape():
+    scraper = JobScraper()
+    parsed = scraper.parse_remoteok_item(FEED_ITEM)
+    # The dict the scraper built for this item before JobPosting
+    legacy = {
+        "title": "Senior Python Engineer",
+        "company": "Acme",
+        "location": "Remote",
+        "description": "x" * 500 + "...",
+        "posted_date": scraper._parse_date("2026-03-02"),
+        "job_url": "https://remoteok.com/remote-jobs/1",
+        "company_url": "https://remoteok.com/logo.png",
+        "salary_range": "150000",
+        "is_remote": True,
+        "source": "RemoteOK",
+        "tags": ["python", "django", "aws", "postgres", "docker"],
+    }
+    assert list(parsed.to_dict()) == list(legacy) == list(FIELDS)
+    assert parsed.to_dict() == legacy
+
+
+@pytest.mark.parametrize("salary, expected", [(150000, "150000"), ("", ""), (None, ""), (0, "")])
+def test_remoteok_parser_normalises_salary(salary, expected):
+    assert JobScraper().parse_remoteok_item({**FEED_ITEM, "salary_max": salary}).salary_range == expected
+
+
+def test_remoteok_parser_keeps_short_descriptions_and_missing_fields():
+    parsed = JobScraper().parse_remoteok_item({"description": "Short"})
+    assert parsed.description == "Short"
+    assert (parsed.title, parsed.company, parsed.job_url, parsed.tags) == ("", "Unknown", "", ())
+
+
+def test_equality_and_dict_round_trip():
+    original = posting(location="Remote", tags=["python"], is_remote=True)
+    assert original == posting(location="Remote", tags=("python",), is_remote=True)
+    assert original != posting(location="Berlin", tags=["python"], is_remote=True)
+    assert JobPosting.from_dict({**original.to_dict(), "unknown": 1}) == original
+    assert postings_to_dicts([original]) == [original.to_dict()]
+
+
+def test_dedupe_by_title_and_company_across_sources():
+    scraper = JobScraper()
+    seen = set()
+    first = scraper._filter_and_dedupe([
+        posting(source="RemoteOK"),
+        posting(title="PYTHON ENGINEER", company="acme", source="Indeed"),
+        posting(title="", source="Indeed"),
+        posting(title="Data Engineer"),
+    ], remote_only=False, experience_level=None, seen=seen)
+    assert [(p.title, p.source) for p in first] == [("Python Engineer", "RemoteOK"), ("Data Engineer", "")]
+    # Later batches of the same search skip what earlier ones returned
+    assert scraper._filter_and_dedupe([posting(source="We Work Remotely")], False, None, seen) == []
+
+
+def test_remote_only_filter():
+    kept = JobScraper()._filter_and_dedupe([posting(is_remote=True), posting(title="Onsite Engineer")], True, None, set())
+    assert [p.title for p in kept] == ["Python Engineer"]
+
+
+def test_job_from_posting():
+    job = Job.from_posting("user_1", posting(location="", salary_range="150000", tags=["python"]))
+    assert (job.title, job.company, job.location, job.salary_range, job.tags) == ("Python Engineer", "Acme", None, "150000", ["python"])
+    assert Job.from_posting("user_1", posting()).tags is None
+
+
+def test_bulk_save_takes_search_results(api, api_db):
+    results = [posting(tags=["python", "aws"], job_url="https://example.com/1").to_dict(), {"title": "Data Engineer", "company": "Globex", "salary_range": None}]
+    response = api("POST", "/api/jobs/bulk-save", json=results)
+    assert response.status_code == 200, response.text
+    saved = {job["title"]: job for job in api("GET", "/api/jobs").json()}
+    assert saved["Python Engineer"]["tags"] == ["python", "aws"]
+    assert saved["Python Engineer"]["job_url"] == "https://example.com/1"
+    assert saved["Data Engineer"]["tags"] is None
+    assert api("POST", "/api/jobs/bulk-save", json=[{"title": "No company"}]).status_code == 422
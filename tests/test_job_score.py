@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def db(api_db, insert_jobs, monkeypatch):
+    monkeypatch.setattr(server, "SCORE_PAGE_SIZE", 2)
+    insert_jobs("job_1", "job_3", "job_4", "job_5", title="Python Engineer")
+    insert_jobs("job_2", title="Python Engineer", ai_match_score=90, ai_score_source="llm")
+    return api_db
+
+
+@pytest.fixture
+def score(api):
+    def request(**body):
+        response = api("POST", "/api/jobs/score", json=body)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return request
+
+
+def test_scores_every_page(db, score):
+    response = score(user_resume="Python developer")
+    # More jobs than one page, minus the LLM-scored job that is kept; a whole-inbox run returns counts only
+    assert response == {"scored": 4}
+    stored = asyncio.run(db.jobs.find({"ai_score_source": "local"}, {"_id": 0, "job_id": 1}).to_list(10))
+    assert sorted(job["job_id"] for job in stored) == ["job_1", "job_3", "job_4", "job_5"]
+
+
+def test_scores_only_the_requested_jobs(db, score):
+    response = score(user_resume="Python developer", job_ids=["job_5", "job_3", "job_4"])
+    assert sorted(job["job_id"] for job in response["jobs"]) == ["job_3", "job_4", "job_5"]
+    untouched = asyncio.run(db.jobs.find_one({"job_id": "job_1"}))
+    assert "ai_score_source" not in untouched
+
+
+def test_overwrite_rescores_llm_scores(db, score):
+    assert score(user_resume="Python developer", overwrite=True)["scored"] == 5
+
+
+def test_score_does_not_depend_on_the_other_jobs_requested(db, score, insert_jobs):
+    insert_jobs("job_6", title="Python Engineer", description="Django and PostgreSQL services on AWS")
+    insert_jobs("job_7", title="Frontend Engineer", description="React and TypeScript")
+    insert_jobs("job_8", title="Data Engineer", description="Airflow, Spark and Python pipelines")
+    resume = "Python developer with Django, React and Spark"
+    alone = score(user_resume=resume, job_ids=["job_6"])["jobs"]
+    together = score(user_resume=resume, job_ids=["job_6", "job_7", "job_8"])["jobs"]
+    assert alone[0] == together[0]
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from bson import Binary
+
+import job_text
+from job_text import JobTextStore, decode_text, encode_text, split_text
+
+LONG_DESCRIPTION = "Build and operate Python services on AWS. " * 40
+
+
+@pytest.mark.parametrize("value", [
+    "Short note",
+    LONG_DESCRIPTION,
+    ["Strong Python match", "Missing Kubernetes"],
+    ["Summary point about the role and the team. " * 5] * 10,
+    {"nested": LONG_DESCRIPTION},
+])
+def test_encode_decode_round_trip(value):
+    assert decode_text(encode_text(value)) == value
+
+
+def test_only_large_compressible_values_are_compressed():
+    assert encode_text("Short note") == "Short note"
+    assert isinstance(encode_text(LONG_DESCRIPTION), Binary)
+    assert isinstance(encode_text([LONG_DESCRIPTION]), Binary)
+    # The threshold is on the JSON encoding, quotes included
+    below = "x" * (job_text.COMPRESS_MIN_BYTES - 3)
+    assert encode_text(below) == below
+    assert isinstance(encode_text(below + "x"), Binary)
+
+
+def test_split_text_drops_empty_text_fields():
+    row, texts = split_text({"job_id": "job_1", "title": "Engineer", "description": "Build", "notes": None})
+    assert row == {"job_id": "job_1", "title": "Engineer"}
+    assert texts == {"description": "Build"}
+
+
+def test_job_list_omits_texts_and_single_job_merges_them(api, api_db, insert_jobs):
+    insert_jobs("job_1")
+    asyncio.run(JobTextStore(api_db).save("user_1", "job_1", {"description": LONG_DESCRIPTION, "ai_summary": ["Good fit"]}))
+
+    [listed] = api("GET", "/api/jobs").json()
+    assert listed["description"] is None and listed["ai_summary"] is None
+    job = api("GET", "/api/jobs/job_1").json()
+    assert job["description"] == LONG_DESCRIPTION
+    assert job["ai_summary"] == ["Good fit"]
+
+
+class RacingTexts:
+    """
+    job_texts whose next bulk_write is preceded by a PATCH-like write of `texts`
+    """
+
+    def __init__(self, collection, job_id, texts):
+        self._collection = collection
+        self._race = (job_id, texts)
+
+    def __getattr__(self, attr):
+        return getattr(self._collection, attr)
+
+    async def bulk_write(self, operations, **kwargs):
+        if self._race:
+            job_id, texts = self._race
+            self._race = None
+            await self._collection.update_one({"job_id": job_id}, {"$set": texts, "$setOnInsert": {"user_id": "user_1"}}, upsert=True)
+        return await self._collection.bulk_write(operations, **kwargs)
+
+
+class RacingDatabase:
+    def __init__(self, db, job_id, texts):
+        self.jobs = db.jobs
+        self.job_texts = RacingTexts(db.job_texts, job_id, texts)
+
+
+@pytest.fixture
+def inline_jobs(api_db, insert_jobs):
+    insert_jobs("job_1", description="Old inline description", notes="Old inline notes")
+    insert_jobs("job_2", description=LONG_DESCRIPTION, ai_summary=["Inline summary"])
+    insert_jobs("job_3")
+    return JobTextStore(api_db)
+
+
+def test_migrate_moves_inline_texts_and_is_idempotent(inline_jobs, api_db):
+    first = asyncio.run(inline_jobs.migrate(batch_size=2))
+    assert first == {"jobs": 2, "fields_moved": 4}
+    assert asyncio.run(api_db.jobs.count_documents({"description": {"$exists": True}})) == 0
+    texts = asyncio.run(inline_jobs.load_many("user_1", ["job_1", "job_2"]))
+    assert texts["job_1"] == {"description": "Old inline description", "notes": "Old inline notes"}
+    assert texts["job_2"] == {"description": LONG_DESCRIPTION, "ai_summary": ["Inline summary"]}
+
+    assert asyncio.run(inline_jobs.migrate()) == {"jobs": 0, "fields_moved": 0}
+    assert asyncio.run(inline_jobs.load_many("user_1", ["job_1", "job_2"])) == texts
+
+
+def test_migrate_keeps_values_already_in_the_side_collection(inline_jobs):
+    asyncio.run(inline_jobs.save("user_1", "job_1", {"description": "Edited after the split"}))
+    asyncio.run(inline_jobs.migrate())
+    texts = asyncio.run(inline_jobs.load("user_1", "job_1"))
+    assert texts == {"description": "Edited after the split", "notes": "Old inline notes"}
+
+
+def test_migrate_keeps_a_value_written_while_it_runs(inline_jobs, api_db):
+    inline_jobs.db = RacingDatabase(api_db, "job_1", {"notes": "Written by a PATCH"})
+    asyncio.run(inline_jobs.migrate())
+    texts = asyncio.run(JobTextStore(api_db).load("user_1", "job_1"))
+    assert texts == {"description": "Old inline description", "notes": "Written by a PATCH"}
@@ -0,0 +1,127 @@
+import asyncio
+import uuid
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, route_class
+
+LIMITS = {"search": (3, 60), "ai": (3, 60), "bulk": (3, 60), "default": (100, 6000)}
+SESSIONS = {"token_alice": "user_alice", "token_alice_phone": "user_alice", "token_bob": "user_bob"}
+
+
+class Lookups:
+    def __init__(self, sessions=SESSIONS, fail=False):
+        self.sessions = dict(sessions)
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, token):
+        self.calls.append(token)
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self.sessions.get(token)
+
+
+def scope(token=None, path="/api/jobs/search", method="POST", client="203.0.113.7"):
+    headers = [(b"host", b"api.example.com")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {"type": "http", "method": method, "path": path, "headers": headers, "client": (client, 50000)}
+
+
+def statuses(limiter, scopes):
+    async def run():
+        return [(await limiter.check(s))[1] == 0 for s in scopes]
+
+    return asyncio.run(run())
+
+
+def test_route_classes():
+    assert route_class("POST", "/api/jobs/search") == "search"
+    assert route_class("POST", "/api/ai/analyze-job") == "ai"
+    assert route_class("POST", "/api/jobs/bulk-save") == "bulk"
+    assert route_class("GET", "/api/jobs") == "default"
+    assert route_class("GET", "/api/events") is None
+    assert route_class("GET", "/healthz") is None
+
+
+def test_random_tokens_share_the_client_bucket_and_bound_lookups():
+    lookups = Lookups()
+    limiter = RateLimiter(LIMITS, session_lookup=lookups)
+    allowed = statuses(limiter, [scope(uuid.uuid4().hex) for _ in range(10)])
+    assert allowed == [True] * 3 + [False] * 7
+    # Only requests the client's bucket allowed paid for a lookup
+    assert len(lookups.calls) == 3
+
+
+def test_unknown_token_is_looked_up_once():
+    lookups = Lookups()
+    limiter = RateLimiter({**LIMITS, "search": (100, 6000)}, session_lookup=lookups)
+    statuses(limiter, [scope("forged")] * 20)
+    assert lookups.calls == ["forged"]
+
+
+def test_unknown_tokens_count_against_anonymous_traffic_from_the_same_address():
+    limiter = RateLimiter(LIMITS, session_lookup=Lookups())
+    assert statuses(limiter, [scope(), scope("forged"), scope(), scope("forged-2")]) == [True, True, True, False]
+
+
+def test_sessions_of_one_user_share_a_bucket():
+    lookups = Lookups()
+    limiter = RateLimiter(LIMITS, session_lookup=lookups)
+    allowed = statuses(limiter, [scope("token_alice"), scope("token_alice_phone"), scope("token_alice"), scope("token_alice_phone")])
+    assert allowed == [True, True, True, False]
+    # Another user from the same address is unaffected by alice's bucket
+    assert statuses(limiter, [scope("token_bob", client="203.0.113.8")]) == [True]
+    assert lookups.calls.count("token_alice") == 1
+
+
+def test_known_session_is_not_limited_by_its_address():
+    limiter = RateLimiter(LIMITS, session_lookup=Lookups())
+    statuses(limiter, [scope("token_alice", client="198.51.100.1")])
+    # Anonymous traffic exhausts the shared address's bucket; alice's own bucket still has tokens
+    statuses(limiter, [scope(client="198.51.100.1")] * 5)
+    assert statuses(limiter, [scope("token_alice", client="198.51.100.1")]) == [True]
+
+
+def test_logout_forgets_the_session():
+    lookups = Lookups()
+    limiter = RateLimiter(LIMITS, session_lookup=lookups)
+    statuses(limiter, [scope("token_bob")])
+    limiter.forget_session("token_bob")
+    del lookups.sessions["token_bob"]
+    assert limiter.cached_user("token_bob") == (False, None)
+    statuses(limiter, [scope("token_bob")])
+    assert lookups.calls == ["token_bob", "token_bob"]
+    assert limiter.cached_user("token_bob") == (True, None)
+
+
+def test_cached_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    lookups = Lookups()
+    limiter = RateLimiter({**LIMITS, "search": (100, 6000)}, session_lookup=lookups)
+    statuses(limiter, [scope("token_alice"), scope("forged")])
+    now[0] += rate_limit.UNKNOWN_SESSION_CACHE_SECONDS + 1
+    statuses(limiter, [scope("token_alice"), scope("forged")])
+    assert lookups.calls == ["token_alice", "forged", "forged"]
+    now[0] += rate_limit.SESSION_CACHE_SECONDS
+    statuses(limiter, [scope("token_alice")])
+    assert lookups.calls[-1] == "token_alice"
+
+
+def test_failed_lookup_fails_open_and_is_retried():
+    lookups = Lookups(fail=True)
+    limiter = RateLimiter({**LIMITS, "search": (100, 6000)}, session_lookup=lookups)
+    assert statuses(limiter, [scope("token_alice"), scope("token_alice")]) == [True, True]
+    assert lookups.calls == ["token_alice", "token_alice"]
+
+
+@pytest.mark.parametrize("cookie, expected", [
+    (b"session_token=abc", "abc"),
+    (b"theme=dark; session_token=abc; other=1", "abc"),
+    (b"not_session_token=abc", None),
+])
+def test_session_token_from_cookie(cookie, expected):
+    assert RateLimiter.session_token({"headers": [(b"cookie", cookie)]}) == expected
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from reminder_scheduler import ReminderScheduler
+
+STORED = {
+    "utc": "2026-03-02T09:00:00+00:00",
+    "offset": "2026-03-02T12:30:00+02:00",
+    "naive": "2026-03-02T10:00:00",
+    "zulu": "2026-03-02T11:00:00Z",
+    "bson": datetime(2026, 3, 2, 8, 0),
+}
+
+
+def scheduler():
+    async def on_due(reminder):
+        pass
+
+    return ReminderScheduler(AsyncMongoMockClient()["reminders_test"], on_due=on_due)
+
+
+def test_normalize_dates_rewrites_every_reminder_date_as_utc():
+    reminders = scheduler()
+
+    async def run():
+        await reminders.db.reminders.insert_many([
+            {"reminder_id": name, "reminder_date": value, "completed": False, "notified_at": None} for name, value in STORED.items()
+        ])
+        await reminders.normalize_dates()
+        return {doc["reminder_id"]: doc["reminder_date"] async for doc in reminders.db.reminders.find({}, {"_id": 0})}
+
+    assert asyncio.run(run()) == {
+        "utc": "2026-03-02T09:00:00+00:00",
+        "offset": "2026-03-02T10:30:00+00:00",
+        "naive": "2026-03-02T10:00:00+00:00",
+        "zulu": "2026-03-02T11:00:00+00:00",
+        "bson": "2026-03-02T08:00:00+00:00",
+    }
+
+
+def test_normalize_dates_runs_once():
+    reminders = scheduler()
+
+    async def run():
+        await reminders.normalize_dates()
+        await reminders.db.reminders.insert_one({"reminder_id": "late", "reminder_date": "2026-03-02T10:00:00"})
+        await reminders.normalize_dates()
+        return await reminders.db.reminders.find_one({"reminder_id": "late"})
+
+    assert asyncio.run(run())["reminder_date"] == "2026-03-02T10:00:00"
+
+
+def test_window_after_migration_loads_reminders_by_instant():
+    reminders = scheduler()
+    now = datetime(2026, 3, 2, 10, 15, tzinfo=timezone.utc)
+    reminders.horizon = timedelta(minutes=30)
+
+    async def run():
+        await reminders.db.reminders.insert_many([
+            {"reminder_id": name, "reminder_date": value, "completed": False, "notified_at": None} for name, value in STORED.items()
+        ])
+        await reminders.normalize_dates()
+        await reminders._load_window(now)
+        return sorted(reminders._heap)
+
+    # "offset" is 10:30 UTC: within the horizon, although its stored string read 12:30 before the migration
+    assert [reminder_id for _, reminder_id in asyncio.run(run())] == ["bson", "utc", "naive", "offset"]
+
+
+def test_reminders_are_stored_in_utc_however_they_arrive():
+    reminder = server.Reminder(user_id="user_1", job_id="job_1", message="Follow up", reminder_date="2026-03-02T12:30:00+02:00")
+    assert server.stored_document(reminder)["reminder_date"] == "2026-03-02T10:30:00+00:00"
@@ -0,0 +1,203 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import similarity_index
+from job_text import JobTextStore
+from similarity_index import SimilarityIndex
+
+JOBS = [
+    ("job_1", "Senior Python Engineer", "Build data pipelines in Python and PostgreSQL"),
+    ("job_2", "Frontend Developer", "React, TypeScript and design systems"),
+]
+
+
+async def seed(db, jobs=JOBS, user_id="user_1"):
+    for job_id, title, description in jobs:
+        await db.jobs.insert_one({"job_id": job_id, "user_id": user_id, "title": title, "status": "saved"})
+        await JobTextStore(db).save(user_id, job_id, {"description": description})
+
+
+def expected_vector(index, title, description):
+    return index.vectorizer.transform([{"title": title, "description": description}])[0]
+
+
+async def settle(index):
+    while index._refresher is not None:
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["similarity_test"]
+
+
+def test_event_for_unseen_job_without_description_loads_it(db):
+    index = SimilarityIndex(None, dim=64)
+
+    async def run():
+        await seed(db)
+        index._db = db
+        # As relayed from a change stream: the job document, without its texts
+        index.on_event("user_1", "job.updated", {"job_id": "job_1", "title": "Senior Python Engineer", "status": "applied"})
+        await settle(index)
+
+    asyncio.run(run())
+    np.testing.assert_allclose(index.vector("job_1"), expected_vector(index, *JOBS[0][1:]))
+
+
+def test_status_update_of_indexed_job_is_not_refetched(db):
+    index = SimilarityIndex(None, dim=64)
+    index.add_jobs([{"job_id": "job_1", "user_id": "user_1", "title": JOBS[0][1], "description": JOBS[0][2]}])
+    index._db = db
+
+    async def run():
+        index.on_event("user_1", "job.updated", {"job_id": "job_1", "title": JOBS[0][1], "status": "applied"})
+        assert index._refresher is None
+
+    asyncio.run(run())
+
+
+def test_retitled_and_rewritten_jobs_are_refetched(db):
+    index = SimilarityIndex(None, dim=64)
+
+    async def run():
+        await seed(db)
+        index._db = db
+        await index.refresh(db, ["job_1", "job_2"])
+        await db.jobs.update_one({"job_id": "job_1"}, {"$set": {"title": "Staff Python Engineer"}})
+        await JobTextStore(db).save("user_1", "job_2", {"description": "Vue and accessibility"})
+        index.on_event("user_1", "job.updated", {"job_id": "job_1", "title": "Staff Python Engineer"})
+        index.on_event("user_1", "job.text_updated", {"job_id": "job_2"})
+        await settle(index)
+
+    asyncio.run(run())
+    np.testing.assert_allclose(index.vector("job_1"), expected_vector(index, "Staff Python Engineer", JOBS[0][2]))
+    np.testing.assert_allclose(index.vector("job_2"), expected_vector(index, JOBS[1][1], "Vue and accessibility"))
+
+
+def test_refresh_drops_deleted_jobs(db):
+    index = SimilarityIndex(None, dim=64)
+
+    async def run():
+        await seed(db)
+        await index.refresh(db, ["job_1", "job_2"])
+        await db.jobs.delete_one({"job_id": "job_2"})
+        await index.refresh(db, ["job_2"])
+
+    asyncio.run(run())
+    assert index.vector("job_2") is None
+    assert len(index) == 1
+
+
+def test_sync_after_clean_shutdown_only_adds_new_jobs(db, tmp_path, monkeypatch):
+    async def run():
+        await seed(db, JOBS[:1])
+        first = SimilarityIndex(str(tmp_path), dim=64)
+        await first.sync(db)
+        first.save()
+        await seed(db, JOBS[1:])
+
+        restarted = SimilarityIndex(str(tmp_path), dim=64)
+        assert restarted.load()
+
+        async def rescan(db):
+            raise AssertionError("a clean snapshot should not need a full rescan")
+
+        monkeypatch.setattr(restarted, "_rescan", rescan)
+        await restarted.sync(db)
+        return restarted
+
+    restarted = asyncio.run(run())
+    assert len(restarted) == 2
+    np.testing.assert_allclose(restarted.vector("job_2"), expected_vector(restarted, *JOBS[1][1:]))
+
+
+@pytest.mark.parametrize("clean, change_streams", [(False, False), (True, True)])
+def test_sync_rescans_when_it_cannot_catch_up(db, tmp_path, clean, change_streams):
+    async def run():
+        await seed(db)
+        first = SimilarityIndex(str(tmp_path), dim=64)
+        await first.sync(db)
+        first.write_snapshot(*first.snapshot(clean=clean))
+        # Deleted while no worker was running: only a rescan (or a change stream replay) notices
+        await db.jobs.delete_one({"job_id": "job_1"})
+
+        restarted = SimilarityIndex(str(tmp_path), dim=64)
+        assert restarted.load()
+        # mongomock has no change streams, like a replay past the oplog window
+        await restarted.sync(db, change_streams=change_streams)
+        return restarted
+
+    restarted = asyncio.run(run())
+    assert restarted.vector("job_1") is None
+    assert len(restarted) == 1
+
+
+def test_snapshot_keeps_title_hashes(tmp_path):
+    index = SimilarityIndex(str(tmp_path), dim=64)
+    index.add_jobs([{"job_id": "job_1", "user_id": "user_1", "title": JOBS[0][1], "description": JOBS[0][2]}])
+    index.save()
+    restarted = SimilarityIndex(str(tmp_path), dim=64)
+    assert restarted.load()
+    assert restarted._title_hashes[0] == similarity_index._title_hash(JOBS[0][1])
+
+
+def two_workers(tmp_path):
+    """
+    Two indexes over the same path holding the same jobs in a different row order
+    """
+    jobs = [{"job_id": job_id, "user_id": "user_1", "title": title, "description": description} for job_id, title, description in JOBS]
+    first = SimilarityIndex(str(tmp_path), dim=64)
+    second = SimilarityIndex(str(tmp_path), dim=64)
+    first.add_jobs(jobs)
+    second.add_jobs(jobs[::-1])
+    return first, second
+
+
+def assert_rows_match_vectors(index):
+    for job_id, title, description in JOBS:
+        np.testing.assert_allclose(index.vector(job_id), expected_vector(index, title, description))
+
+
+def test_only_one_worker_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity_index, "SNAPSHOT_GRACE_SECONDS", -1)
+    first, second = two_workers(tmp_path)
+    assert first.claim_writer()
+    assert not second.claim_writer()
+    second.save()
+    assert not (tmp_path / "CURRENT").exists()
+    first.save()
+    first.save()
+    # The replaced snapshot is removed
+    snapshots = [p.name for p in tmp_path.iterdir() if p.name.startswith("snapshot-")]
+    assert len(snapshots) == 1 and str(os.getpid()) in snapshots[0]
+
+
+def test_concurrent_snapshots_never_mix_rows_and_vectors(tmp_path):
+    first, second = two_workers(tmp_path)
+
+    def write(index):
+        for _ in range(20):
+            index.write_snapshot(*index.snapshot())
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(write, [first, second]))
+    restarted = SimilarityIndex(str(tmp_path), dim=64)
+    assert restarted.load()
+    assert_rows_match_vectors(restarted)
+
+
+def test_snapshot_is_not_clean_while_another_worker_is_attached(tmp_path):
+    first, second = two_workers(tmp_path)
+    first.attach()
+    second.attach()
+    first.save()
+    restarted = SimilarityIndex(str(tmp_path), dim=64)
+    assert restarted.load()
+    assert not restarted._clean
+    assert_rows_match_vectors(restarted)
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import OperationFailure
+
+from task_generator import DailyTaskGenerator
+
+DATE = "2026-03-02"
+USERS = ["user_a", "user_b", "user_c"]
+
+
+class Generator(DailyTaskGenerator):
+    """
+    `fail` injects errors by step
+    """
+
+    def __init__(self, db, **kwargs):
+        # mongomock has no $topN, so pending jobs come from the $slice pipeline
+        super().__init__(db, default_goals={"applications_per_day": 2, "networking_per_day": 1, "skills_per_day": 0}, top_n=False, **kwargs)
+        self.fail = {}
+
+    async def _load_goals(self, user_ids):
+        if self.fail.get("goals"):
+            raise ConnectionError("goals unavailable")
+        return await super()._load_goals(user_ids)
+
+    def build_tasks(self, user_id, date, goals, pending_jobs):
+        tasks = super().build_tasks(user_id, date, goals, pending_jobs)
+        if user_id in self.fail.get("insert", ()):
+            # Collides with the unique task_id index on its second task only, so the user's first task is written
+            tasks[1]["task_id"] = "task_taken"
+        return tasks
+
+
+@pytest.fixture
+def generator():
+    db = AsyncMongoMockClient()["tasks_test"]
+
+    async def setup():
+        await db.task_generation_runs.create_index([("user_id", 1), ("date", 1)], unique=True)
+        await db.daily_tasks.create_index("task_id", unique=True)
+        await db.daily_tasks.insert_one({"task_id": "task_taken", "user_id": "someone_else", "date": DATE})
+        await db.users.insert_many([{"user_id": user_id} for user_id in USERS])
+        await db.jobs.insert_many([
+            {"job_id": f"job_{user_id}", "user_id": user_id, "title": "Engineer", "company": "Acme", "status": "saved", "date_added": "2026-03-01"}
+            for user_id in USERS
+        ])
+
+    asyncio.run(setup())
+    return Generator(db)
+
+
+def tasks_by_user(generator):
+    async def load():
+        counts = {}
+        async for task in generator.db.daily_tasks.find({"date": DATE, "generated": True}):
+            counts[task["user_id"]] = counts.get(task["user_id"], 0) + 1
+        return counts
+
+    return asyncio.run(load())
+
+
+def test_generation_is_idempotent_per_user_and_date(generator):
+    first = asyncio.run(generator.generate_for_users(USERS, DATE))
+    second = asyncio.run(generator.generate_for_users(USERS, DATE))
+    assert first == {"users": 3, "skipped": 0, "tasks": 9}
+    assert second == {"users": 0, "skipped": 3, "tasks": 0}
+    assert tasks_by_user(generator) == {user_id: 3 for user_id in USERS}
+
+
+def test_failure_before_insert_releases_claims(generator):
+    generator.fail["goals"] = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(generator.generate_for_users(USERS, DATE))
+    generator.fail.clear()
+    assert asyncio.run(generator.generate_for_users(USERS, DATE))["users"] == 3
+
+
+def test_partial_insert_releases_only_failed_users_without_duplicates(generator):
+    generator.fail["insert"] = {"user_b"}
+    with pytest.raises(Exception):
+        asyncio.run(generator.generate_for_users(USERS, DATE))
+    # user_b's task that did get written is gone again, the others keep theirs
+    assert tasks_by_user(generator) == {"user_a": 3, "user_c": 3}
+
+    generator.fail.clear()
+    rerun = asyncio.run(generator.generate_for_users(USERS, DATE))
+    assert rerun == {"users": 1, "skipped": 2, "tasks": 3}
+    assert tasks_by_user(generator) == {user_id: 3 for user_id in USERS}
+
+
+def test_only_one_process_sweeps_a_date(generator):
+    other_worker = Generator(generator.db)
+
+    async def run():
+        return await asyncio.gather(generator.sweep(DATE), other_worker.sweep(DATE))
+
+    results = asyncio.run(run())
+    assert sorted(result is None for result in results) == [False, True]
+    assert tasks_by_user(generator) == {user_id: 3 for user_id in USERS}
+
+
+def test_stale_sweep_is_taken_over(generator):
+    async def run():
+        assert await generator.claim_sweep(DATE)
+        # The first runner died mid-sweep; another worker may take over once it has gone quiet long enough
+        waiting = Generator(generator.db)
+        assert not await waiting.claim_sweep(DATE)
+        waiting.sweep_timeout = timedelta(0)
+        return await waiting.sweep(DATE)
+
+    assert asyncio.run(run())["users"] == 3
+
+
+def test_generate_endpoint_validates_date(api):
+    assert api("POST", "/api/tasks/generate", params={"date": "tomorrow"}).status_code == 400
+
+
+def test_pending_jobs_are_the_oldest_saved_per_user(generator):
+    async def run():
+        await generator.db.jobs.insert_many([
+            {"job_id": "job_new", "user_id": "user_a", "title": "Newer", "company": "Acme", "status": "to-apply", "date_added": "2026-03-02"},
+            {"job_id": "job_old", "user_id": "user_a", "title": "Older", "company": "Acme", "status": "saved", "date_added": "2026-02-01"},
+            {"job_id": "job_applied", "user_id": "user_a", "title": "Applied", "company": "Acme", "status": "applied", "date_added": "2026-01-01"},
+        ])
+        return await generator._load_pending_jobs(["user_a", "user_b"], 2)
+
+    pending = asyncio.run(run())
+    assert [job["job_id"] for job in pending["user_a"]] == ["job_old", "job_user_a"]
+    assert pending["user_a"][0] == {"job_id": "job_old", "title": "Older", "company": "Acme"}
+    assert [job["job_id"] for job in pending["user_b"]] == ["job_user_b"]
+
+
+def test_server_without_top_n_falls_back_to_slice(generator):
+    class OldServerJobs:
+        def __init__(self, jobs):
+            self.jobs = jobs
+            self.pipelines = []
+
+        def aggregate(self, pipeline, **kwargs):
+            self.pipelines.append(pipeline)
+            if "$topN" in str(pipeline):
+                raise OperationFailure("unknown group operator '$topN'", code=15952)
+            return self.jobs.aggregate(pipeline, **kwargs)
+
+    class OldServer:
+        def __init__(self, db):
+            self.db = db
+            self.jobs = OldServerJobs(db.jobs)
+
+        def __getattr__(self, name):
+            return getattr(self.db, name)
+
+    old_server = OldServer(generator.db)
+    generator = DailyTaskGenerator(old_server)
+    assert asyncio.run(generator._load_pending_jobs(USERS, 2))["user_a"][0]["job_id"] == "job_user_a"
+    assert asyncio.run(generator._load_pending_jobs(USERS, 2)).keys() == set(USERS)
+    # Only the first call tries $topN
+    assert len(old_server.jobs.pipelines) == 3
+    assert not generator.top_n